@@ -17,7 +17,7 @@ Correctif principal (bug "ghost non retiré") :
   - et ce nettoyage se fait même en cas d'exception ou fermeture inattendue grâce à `try/finally`
 
 Remarque :
-- Le commit "undoable" se fait via AddItemCommand(already_in_scene=True) puisque les items
+- Le commit "undoable" se fait via scene.add_items(already_in_scene=True) puisque les items
   sont déjà dans la scène en tant que ghost.
 """
 
@@ -26,10 +26,9 @@ from pathlib import Path
 
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QPixmap
-from PySide6.QtWidgets import QGraphicsEllipseItem, QGraphicsRectItem
 
 from assistant import wizard
-from drawing.commands import AddItemCommand
+from drawing.serialization import item_type_name
 from ui.suggestion_dialog import SuggestionDialog
 
 
@@ -39,6 +38,11 @@ ASSISTANT_TAG_ROLE = int(Qt.UserRole)
 TAG_CAT_EAR = "assistant:cat_ear"
 TAG_ROOF_TRIANGLE = "assistant:roof_triangle"
 
+# ---- Fenêtres des signaux comportementaux (logger.recent, voir logs/ring.py) ----
+UNDO_WINDOW_S = 10.0
+REJECT_WINDOW_S = 60.0
+REJECT_EVENTS = ("autosuggest_reject", "assistant_reject")
+
 
 class AssistantController:
     """
@@ -87,7 +91,7 @@ class AssistantController:
         """
         self.auto_enabled = enabled
         if self.logger:
-            self.logger.log("assistant_auto_toggle", notes=str(enabled))
+            self.logger.log("assistant_auto_toggle", enabled=enabled)
 
     def set_floating_visible(self, visible: bool):
         """
@@ -96,7 +100,7 @@ class AssistantController:
         self.floating_visible = visible
         self.editor.assistant_btn.setVisible(visible)
         if self.logger:
-            self.logger.log("assistant_floating_toggle", notes=str(visible))
+            self.logger.log("assistant_floating_toggle", enabled=visible)
 
     # ---------------------------------------------------------------------
     # Construction du contexte minimal pour le wizard
@@ -108,25 +112,30 @@ class AssistantController:
         - trigger : "manual" ou "auto"
         - created_item : l'item nouvellement créé (si auto), sinon None
         """
-        items = self.scene.items()
+        # Index par type / tag tenu à jour par la scène : O(1), sans parcours
+        features = self.scene.features
 
         # Détecte la présence de formes de base
-        has_ellipse = any(isinstance(it, QGraphicsEllipseItem) for it in items)
-        has_rect = any(isinstance(it, QGraphicsRectItem) for it in items)
+        has_ellipse = features.has_type("QGraphicsEllipseItem")
+        has_rect = features.has_type("QGraphicsRectItem")
 
         # Détecte si les items assistant ont déjà été ajoutés (via tags)
-        has_cat_ears = any(
-            getattr(it, "data", lambda *_: None)(ASSISTANT_TAG_ROLE) == TAG_CAT_EAR
-            for it in items
-        )
-        has_roof_triangle = any(
-            getattr(it, "data", lambda *_: None)(ASSISTANT_TAG_ROLE)
-            == TAG_ROOF_TRIANGLE
-            for it in items
-        )
+        has_cat_ears = features.has_tag(TAG_CAT_EAR)
+        has_roof_triangle = features.has_tag(TAG_ROOF_TRIANGLE)
 
         # Type de l'item récemment créé (utile pour certaines heuristiques)
-        created_kind = type(created_item).__name__ if created_item is not None else None
+        created_kind = (
+            item_type_name(created_item) if created_item is not None else None
+        )
+
+        # Signaux comportementaux récents (mémoire courte du logger, sans I/O)
+        recent = self.logger.recent if self.logger else None
+        if recent is not None:
+            recent_undos = recent.count(("undo", "redo"), window_s=UNDO_WINDOW_S)
+            recent_rejects = recent.count(REJECT_EVENTS, window_s=REJECT_WINDOW_S)
+            undos_in_trial = recent.count_since("trial_start", "undo")
+        else:
+            recent_undos = recent_rejects = undos_in_trial = 0
 
         return {
             "trigger": trigger,
@@ -136,6 +145,9 @@ class AssistantController:
             "has_roof_triangle": has_roof_triangle,
             "created_kind": created_kind,
             "auto_suppressed": set(self._auto_suppressed),
+            "recent_undos": recent_undos,
+            "recent_rejects": recent_rejects,
+            "undos_in_trial": undos_in_trial,
         }
 
     # ---------------------------------------------------------------------
@@ -163,10 +175,10 @@ class AssistantController:
     ):
         if not self.logger:
             return
-        extra = f";ms={decision_ms}" if decision_ms is not None else ""
-        self.logger.log(
-            event_type, tool="ASSISTANT", notes=f"trigger={trigger};sid={sid}{extra}"
-        )
+        fields = {"trigger": trigger, "sid": sid}
+        if decision_ms is not None:
+            fields["decision_ms"] = decision_ms
+        self.logger.log(event_type, tool="ASSISTANT", **fields)
 
     # ---------------------------------------------------------------------
     # Flux principal de suggestion
@@ -184,7 +196,7 @@ class AssistantController:
            - en manuel : info "pas de suggestion"
         """
         ctx = self._build_context(trigger, created_item=created_item)
-        t0 = time.time()
+        t0 = time.perf_counter_ns()
 
         proposal = wizard.propose_suggestion(ctx)
 
@@ -193,7 +205,7 @@ class AssistantController:
         # ---------------------------------------------------------------
         if proposal is None:
             if self.logger:
-                self.logger.log("ai_output", tool="ASSISTANT", notes=f"none:{trigger}")
+                self.logger.log("ai_output", tool="ASSISTANT", trigger=trigger)
 
             # En manuel, on informe l'utilisateur
             if trigger == "manual":
@@ -256,7 +268,7 @@ class AssistantController:
         try:
             dlg.exec()
 
-            decision_ms = int((time.time() - t0) * 1000)
+            decision_ms = (time.perf_counter_ns() - t0) // 1_000_000
 
             # Fermeture fenêtre = cancel (au lieu de ignore implicite)
             choice = dlg.choice or "cancel"
@@ -266,7 +278,10 @@ class AssistantController:
                 self.logger.log(
                     "user_action",
                     tool="ASSISTANT",
-                    notes=f"{choice}:{trigger}:{sid}:ms={decision_ms}",
+                    choice=choice,
+                    trigger=trigger,
+                    sid=sid,
+                    decision_ms=decision_ms,
                 )
 
                 if choice == "accept":
@@ -305,13 +320,6 @@ class AssistantController:
             # Si l'utilisateur accepte -> commit (items deviennent "réels")
             # -----------------------------------------------------------
             if choice == "accept":
-                # On rend undoable l'ajout :
-                # - les items sont déjà dans la scène => already_in_scene=True
-                # - macro => un seul Ctrl+Z pour tout le pack
-                self.scene.undo_stack.beginMacro(
-                    f"Assistant: {proposal.get('suggestion_id', 'suggestion')}"
-                )
-
                 for it in self._ghost_items:
                     # Retire l'effet ghost
                     it.setOpacity(1.0)
@@ -319,17 +327,14 @@ class AssistantController:
                     it.setFlag(it.GraphicsItemFlag.ItemIsSelectable, True)
                     it.setFlag(it.GraphicsItemFlag.ItemIsMovable, True)
 
-                    # Ajout à la pile undo (l'item est déjà dans la scène)
-                    self.scene.undo_stack.push(
-                        AddItemCommand(
-                            self.scene,
-                            it,
-                            text="Assistant suggestion",
-                            already_in_scene=True,
-                        )
-                    )
-
-                self.scene.undo_stack.endMacro()
+                # On rend undoable l'ajout :
+                # - les items sont déjà dans la scène => already_in_scene=True
+                # - ajout groupé => un seul Ctrl+Z pour tout le pack
+                self.scene.add_items(
+                    self._ghost_items,
+                    text=f"Assistant: {proposal.get('suggestion_id', 'suggestion')}",
+                    already_in_scene=True,
+                )
 
                 # On vide la liste : ces items ne sont plus "ghost"
                 self._ghost_items = []
@@ -349,7 +354,7 @@ class AssistantController:
                         self._auto_suppressed.add(sid)
                         if self.logger:
                             self.logger.log(
-                                "assistant_suppress", tool="ASSISTANT", notes=f"{sid}"
+                                "assistant_suppress", tool="ASSISTANT", sid=sid
                             )
 
                 # Pas de commit : le `finally` va retirer le ghost
@@ -7,7 +7,7 @@ Responsabilité :
   (pour l'instant : placeholder)
 """
 
-from PySide6.QtWidgets import QGraphicsPolygonItem, QGraphicsRectItem
+from PySide6.QtWidgets import QGraphicsPolygonItem
 from PySide6.QtGui import QPolygonF, QPen, QBrush, QColor
 from PySide6.QtCore import QPointF, Qt
 
@@ -29,14 +29,14 @@ TAG_ROOF_TRIANGLE = "assistant:roof_triangle"
 
 
 def make_cat_ears_for_first_ellipse(scene):
-    # inchangé sauf ajout du tag
-    ellipse = None
-    for it in scene.items():
-        if it.__class__.__name__ == "QGraphicsEllipseItem":
-            ellipse = it
-            break
+    # Cible : l'ellipse que l'utilisateur vient de dessiner, sinon la plus
+    # haute dans l'empilement
+    ellipse = scene.last_created_item("QGraphicsEllipseItem")
     if ellipse is None:
-        return []
+        ellipses = scene.items_of_type("QGraphicsEllipseItem")
+        if not ellipses:
+            return []
+        ellipse = ellipses[0]
 
     rect = ellipse.sceneBoundingRect()
 
@@ -75,28 +75,25 @@ def make_cat_ears_for_first_ellipse(scene):
     return items
 
 
+def _is_black(color):
+    return color.rgb() & 0xFFFFFF == 0
+
+
 def make_roof_triangle_for_first_rect(scene):
     """
     Crée un triangle rouge (rempli) au-dessus d'un rectangle.
     Style : contour noir, remplissage rouge.
     """
-    target_rect = None
-
-    # 1) On cherche un rectangle (idéalement avec contour noir)
-    for it in scene.items():
-        if isinstance(it, QGraphicsRectItem):
-            # si possible, privilégier bordure noire
-            try:
-                if it.pen().color().name().lower() == "#000000":
-                    target_rect = it
-                    break
-            except Exception:
-                pass
-            if target_rect is None:
-                target_rect = it
-
+    # 1) Cible : le rectangle que l'utilisateur vient de dessiner, sinon le plus
+    #    haut dans l'empilement (idéalement avec contour noir)
+    target_rect = scene.last_created_item("QGraphicsRectItem")
     if target_rect is None:
-        return []
+        rects = scene.items_of_type("QGraphicsRectItem")
+        if not rects:
+            return []
+        target_rect = next(
+            (it for it in rects if _is_black(it.pen().color())), rects[0]
+        )
 
     r = target_rect.sceneBoundingRect()
 
@@ -3,12 +3,24 @@ from assistant.suggestions import CAT_EARS, ROOF_TRIANGLE
 SUGG_CAT_EARS_ID = "CAT_EARS"
 SUGG_ROOF_ID = "ROOF_TRIANGLE"
 
+# En auto, l'assistant se tait si l'utilisateur est en train de corriger
+# (undo/redo répétés) ou vient de refuser plusieurs suggestions.
+# Seuils appliqués aux signaux récents du contexte (recent_undos / recent_rejects).
+AUTO_QUIET_UNDOS = 3
+AUTO_QUIET_REJECTS = 2
+
 
 def propose_suggestion(context: dict):
     trigger = context.get("trigger", "manual")
     created_kind = context.get("created_kind")
     auto_suppressed = context.get("auto_suppressed", set())
 
+    if trigger == "auto" and (
+        context.get("recent_undos", 0) >= AUTO_QUIET_UNDOS
+        or context.get("recent_rejects", 0) >= AUTO_QUIET_REJECTS
+    ):
+        return None
+
     # --- Candidate 1 : oreilles ---
     has_ellipse = bool(context.get("has_ellipse", False))
     has_cat_ears = bool(context.get("has_cat_ears", False))
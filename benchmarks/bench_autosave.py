@@ -0,0 +1,124 @@
+"""
+benchmarks/bench_autosave.py
+
+Journal de récupération (drawing/autosave.py) : coût côté thread GUI par
+action, taille du journal / de l'instantané, temps de récupération.
+
+Session simulée : traits au stylo (événements souris), déplacements au
+clavier, annulations / rétablissements ; la même session est jouée sans puis
+avec journal. Le coût mesuré côté GUI est celui du handler command_applied
+(comparaison aux items connus + sérialisation des items ajoutés).
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.bench_autosave [--strokes 300] [--points 200]
+"""
+
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QPointF  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from benchmarks.bench_canvas import _mouse, _stats  # noqa: E402
+from drawing.autosave import Autosave, find_recoverable, recover  # noqa: E402
+from drawing.scene import DrawingScene  # noqa: E402
+from drawing.tools import Tool  # noqa: E402
+
+
+def _session(scene, n_strokes, n_points, rng):
+    """Joue la session ; retourne les durées (ms) de chaque action."""
+    samples = []
+
+    def timed(action):
+        t0 = time.perf_counter_ns()
+        action()
+        samples.append((time.perf_counter_ns() - t0) / 1e6)
+
+    for k in range(n_strokes):
+        scene.set_tool(Tool.PEN)
+        cx, cy = rng.uniform(0, 4000), rng.uniform(0, 4000)
+        pts = [
+            QPointF(cx + 0.3 * i * math.cos(i / 15), cy + 0.3 * i * math.sin(i / 15))
+            for i in range(n_points)
+        ]
+        _mouse(scene, "press", pts[0])
+        for p in pts[1:]:
+            _mouse(scene, "move", p)
+        timed(lambda: _mouse(scene, "release", pts[-1]))
+
+        if k % 10 == 9:
+            scene.clearSelection()
+            for it in rng.sample(scene.items(), 5):
+                it.setSelected(True)
+            timed(lambda: scene.nudge_selection(10, 0))
+            timed(scene.undo_stack.undo)
+            timed(scene.undo_stack.undo)
+            timed(scene.undo_stack.redo)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--strokes", type=int, default=300)
+    parser.add_argument("--points", type=int, default=200, help="points par trait")
+    args = parser.parse_args()
+
+    QApplication.instance() or QApplication([])
+
+    base = _session(
+        DrawingScene(infinite=True), args.strokes, args.points, random.Random(0)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scene = DrawingScene(infinite=True)
+        autosave = Autosave(scene, "bench", directory=tmp)
+
+        # Coût du handler seul, mesuré autour de command_applied
+        hook = []
+        on_command = autosave._on_command
+
+        def timed_hook(cmd, redo):
+            t0 = time.perf_counter_ns()
+            on_command(cmd, redo)
+            hook.append((time.perf_counter_ns() - t0) / 1e6)
+
+        scene.undo_stack.command_applied.disconnect(on_command)
+        scene.undo_stack.command_applied.connect(timed_hook)
+
+        with_journal = _session(scene, args.strokes, args.points, random.Random(0))
+        t0 = time.perf_counter()
+        autosave.flush(timeout=30)
+        t_flush = time.perf_counter() - t0
+        journal_kb = os.path.getsize(autosave.journal_path) / 1024
+        snapshot_kb = os.path.getsize(autosave.snapshot_path) / 1024
+
+        expected = len(scene.items())
+        scene.undo_stack.command_applied.disconnect(timed_hook)
+        scene.undo_stack.command_applied.connect(on_command)
+        # « Crash » : close() sans discard laisse les fichiers (verrou libéré)
+        autosave.close()
+
+        t0 = time.perf_counter()
+        session, *_ = find_recoverable(tmp)
+        target = DrawingScene(infinite=True)
+        n = recover(target, session.state)
+        t_recover = time.perf_counter() - t0
+        session.discard()
+
+    print(f"{args.strokes} traits de {args.points} points")
+    print(f"  action sans journal : {_stats(base)}")
+    print(f"  action avec journal : {_stats(with_journal)}")
+    print(f"  handler (thread GUI): {_stats(hook)}")
+    print(f"  vidage final        : {t_flush * 1000:7.1f} ms (thread d'écriture)")
+    print(f"  journal {journal_kb:.0f} Ko, instantané {snapshot_kb:.0f} Ko")
+    print(f"  récupération        : {t_recover * 1000:7.1f} ms ({n}/{expected} items)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+benchmarks/bench_canvas.py
+
+Canvas infini chargé (100k items par défaut) : dessin, pan et zoom restent-ils
+interactifs ?
+
+Construit une DrawingScene(infinite=True) de contenu synthétique (rectangles,
+ellipses, lignes, traits au stylo) réparti sur une grande zone, l'affiche dans
+une CanvasView 1280x720 (plateforme offscreen), puis mesure par image :
+- dessin : traits au stylo via les gestionnaires souris de la scène
+- pan : défilement de la vue par pas de 40 px
+- zoom : zoom arrière jusqu'à 10 %, puis retour à 100 %
+- clic : itemAt sous la souris
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.bench_canvas [--items 100000] [--extent 40000]
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEvent, QPointF, QRectF, Qt  # noqa: E402
+from PySide6.QtGui import QPainterPath, QPen, QTransform  # noqa: E402
+from PySide6.QtWidgets import (  # noqa: E402
+    QApplication,
+    QGraphicsEllipseItem,
+    QGraphicsLineItem,
+    QGraphicsRectItem,
+    QGraphicsSceneMouseEvent,
+)
+
+from drawing.scene import DrawingScene  # noqa: E402
+from drawing.stroke_item import StrokeItem  # noqa: E402
+from drawing.tools import Tool  # noqa: E402
+from ui.canvas_view import CanvasView  # noqa: E402
+
+
+def _content(n, extent, rng):
+    pen = QPen()
+    pen.setWidth(2)
+    items = []
+    for i in range(n):
+        x = rng.uniform(-extent / 2, extent / 2)
+        y = rng.uniform(-extent / 2, extent / 2)
+        kind = i % 4
+        if kind == 0:
+            it = QGraphicsRectItem(x, y, rng.uniform(10, 80), rng.uniform(10, 80))
+        elif kind == 1:
+            it = QGraphicsEllipseItem(x, y, rng.uniform(10, 80), rng.uniform(10, 80))
+        elif kind == 2:
+            dx, dy = rng.uniform(-60, 60), rng.uniform(-60, 60)
+            it = QGraphicsLineItem(x, y, x + dx, y + dy)
+        else:
+            path = QPainterPath(QPointF(x, y))
+            a = rng.uniform(0, 2 * math.pi)
+            for _ in range(16):
+                a += rng.uniform(-0.5, 0.5)
+                x, y = x + 4 * math.cos(a), y + 4 * math.sin(a)
+                path.lineTo(x, y)
+            it = StrokeItem(path)
+        it.setPen(pen)
+        it.setFlag(it.GraphicsItemFlag.ItemIsSelectable, True)
+        it.setFlag(it.GraphicsItemFlag.ItemIsMovable, True)
+        items.append(it)
+    return items
+
+
+def _mouse(scene, kind, p):
+    etype, handler = {
+        "press": (QEvent.Type.GraphicsSceneMousePress, scene.mousePressEvent),
+        "move": (QEvent.Type.GraphicsSceneMouseMove, scene.mouseMoveEvent),
+        "release": (QEvent.Type.GraphicsSceneMouseRelease, scene.mouseReleaseEvent),
+    }[kind]
+    e = QGraphicsSceneMouseEvent(etype)
+    e.setScenePos(p)
+    left, none = Qt.MouseButton.LeftButton, Qt.MouseButton.NoButton
+    e.setButton(left if kind != "move" else none)
+    e.setButtons(left if kind != "release" else none)
+    handler(e)
+
+
+def _frame(app, action):
+    t0 = time.perf_counter_ns()
+    action()
+    app.processEvents()
+    return (time.perf_counter_ns() - t0) / 1e6
+
+
+def _stats(samples):
+    s = sorted(samples)
+    return (
+        f"médiane {s[len(s) // 2]:7.2f} ms | p95 {s[int(len(s) * 0.95)]:7.2f} ms"
+        f" | max {s[-1]:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--extent", type=float, default=40_000, help="côté (px)")
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    rng = random.Random(0)
+
+    scene = DrawingScene(infinite=True)
+    t0 = time.perf_counter()
+    items = _content(args.items, args.extent, rng)
+    scene.add_items(items)
+    t_add = time.perf_counter() - t0
+
+    view = CanvasView(scene)
+    view.resize(1280, 720)
+    view.show()
+    t0 = time.perf_counter()
+    app.processEvents()  # premier affichage : construction de l'index BSP
+    t_first = time.perf_counter() - t0
+
+    r = scene.sceneRect()
+    print(
+        f"{args.items} items sur {args.extent:.0f} px de côté ; sceneRect"
+        f" {r.width():.0f} x {r.height():.0f}, profondeur BSP"
+        f" {scene.bspTreeDepth()}"
+    )
+    print(f"  insertion (add_items)    : {t_add:6.2f} s")
+    print(f"  premier affichage        : {t_first:6.2f} s")
+
+    # --- Dessin : traits au stylo dans la zone visible ---
+    scene.set_tool(Tool.PEN)
+    center = view.mapToScene(view.viewport().rect().center())
+    samples = []
+    for k in range(10):
+        base = QPointF(center.x() - 300, center.y() - 200 + 40 * k)
+        _mouse(scene, "press", base)
+        for i in range(1, 100):
+            p = QPointF(base.x() + 6 * i, base.y() + 15 * math.sin(i / 8))
+            samples.append(_frame(app, lambda p=p: _mouse(scene, "move", p)))
+        _mouse(scene, "release", p)
+    print(f"  dessin (par point)       : {_stats(samples)}")
+
+    # --- Pan : défilement horizontal puis vertical ---
+    hbar, vbar = view.horizontalScrollBar(), view.verticalScrollBar()
+    samples = []
+    for i in range(args.frames):
+        bar = hbar if i < args.frames // 2 else vbar
+        samples.append(_frame(app, lambda b=bar: b.setValue(b.value() + 40)))
+    print(f"  pan (par image)          : {_stats(samples)}")
+
+    # --- Zoom : arrière jusqu'à 10 % puis retour ---
+    steps = max(1, args.frames // 2)
+    factor = 0.1 ** (1 / steps)
+    samples = [_frame(app, lambda: view.zoom_by(factor)) for _ in range(steps)]
+    print(f"  zoom arrière (par image) : {_stats(samples)}")
+    samples = [_frame(app, lambda: view.zoom_by(1 / factor)) for _ in range(steps)]
+    print(f"  zoom avant (par image)   : {_stats(samples)}")
+
+    # --- Clic : itemAt sous la souris ---
+    visible = view.mapToScene(view.viewport().rect()).boundingRect()
+    samples = []
+    for _ in range(500):
+        p = QPointF(
+            rng.uniform(visible.left(), visible.right()),
+            rng.uniform(visible.top(), visible.bottom()),
+        )
+        t0 = time.perf_counter_ns()
+        scene.itemAt(p, QTransform())
+        samples.append((time.perf_counter_ns() - t0) / 1e6)
+    print(f"  clic (itemAt)            : {_stats(samples)}")
+
+    # Requête d'une zone hors contenu : le canvas s'étend à la demande
+    far = QRectF(args.extent * 2, args.extent * 2, 100, 100)
+    scene.include_rect(far)
+    covered = scene.sceneRect().contains(far)
+    print(f"  extension à {far.x():.0f} px   : zone couverte = {covered}")
+    view.close()
+
+
+if __name__ == "__main__":
+    main()
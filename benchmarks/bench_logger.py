@@ -0,0 +1,68 @@
+"""
+benchmarks/bench_logger.py
+
+Mesure le coût par événement de EventLogger.log() côté thread appelant (= thread GUI).
+
+Compare :
+- mode historique (écriture synchrone à chaque événement)
+- mode bufferisé (simple enqueue, écriture par un thread dédié)
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.bench_logger [--events 20000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from logs.logger import EventLogger
+
+
+def _run(n_events: int, buffered: bool):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.csv")
+        logger = EventLogger(path, buffered=buffered)
+        logger.set_context(condition="H_PLUS_IA", task_id="cat", trial_index=1)
+
+        samples = []
+        for i in range(n_events):
+            t0 = time.perf_counter_ns()
+            logger.log("erase", tool="ERASER", item_type="QGraphicsPathItem")
+            samples.append(time.perf_counter_ns() - t0)
+
+        t0 = time.perf_counter()
+        logger.close()
+        close_s = time.perf_counter() - t0
+
+        # Vérification : toutes les lignes sont bien sur disque
+        # (+ en-tête et événement session_start)
+        with open(path, encoding="utf-8") as f:
+            n_lines = sum(1 for _ in f)
+        assert n_lines == n_events + 2, (n_lines, n_events)
+
+    samples.sort()
+    return {
+        "mean_us": sum(samples) / len(samples) / 1000,
+        "p50_us": samples[len(samples) // 2] / 1000,
+        "p99_us": samples[int(len(samples) * 0.99)] / 1000,
+        "close_ms": close_s * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{args.events} événements 'erase'")
+    for label, buffered in (("synchrone", False), ("bufferisé", True)):
+        r = _run(args.events, buffered)
+        print(
+            f"{label:>10} : moyenne {r['mean_us']:7.2f} µs | p50 {r['p50_us']:7.2f} µs"
+            f" | p99 {r['p99_us']:7.2f} µs | close {r['close_ms']:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+benchmarks/bench_pen.py
+
+Mesure le coût par point d'un trait au stylo (mouvement souris + rafraîchissement
+de la vue), sur une scène contenant déjà des items.
+
+Compare :
+- ancienne approche : QPainterPath.lineTo() + QGraphicsPathItem.setPath() par point
+- LiveStrokeItem (drawing/live_stroke.py) : ajout O(1), seul le segment est redessiné
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.bench_pen [--points 5000] [--items 2000]
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QPointF, QRectF  # noqa: E402
+from PySide6.QtGui import QPainterPath, QPen  # noqa: E402
+from PySide6.QtWidgets import (  # noqa: E402
+    QApplication,
+    QGraphicsPathItem,
+    QGraphicsRectItem,
+    QGraphicsScene,
+    QGraphicsView,
+)
+
+from drawing.live_stroke import LiveStrokeItem  # noqa: E402
+
+
+def _stroke_points(n):
+    # Spirale : le trait sort régulièrement de son bounding rect
+    return [
+        QPointF(640 + 0.06 * i * math.cos(i / 40), 360 + 0.06 * i * math.sin(i / 40))
+        for i in range(n)
+    ]
+
+
+def _make_view(n_items):
+    scene = QGraphicsScene(QRectF(0, 0, 1280, 720))
+    rng = random.Random(0)
+    for _ in range(n_items):
+        scene.addItem(
+            QGraphicsRectItem(rng.uniform(0, 1240), rng.uniform(0, 680), 40, 30)
+        )
+    view = QGraphicsView(scene)
+    view.resize(1280, 720)
+    view.show()
+    QApplication.processEvents()
+    return scene, view
+
+
+class _SetPathStroke:
+    """Ancienne implémentation de la scène, pour comparaison."""
+
+    def __init__(self, scene, start, pen):
+        self.path = QPainterPath(start)
+        self.item = QGraphicsPathItem(self.path)
+        self.item.setPen(pen)
+        scene.addItem(self.item)
+
+    def add_point(self, p):
+        self.path.lineTo(p)
+        self.item.setPath(self.path)
+
+
+def _run(kind, points, n_items):
+    scene, view = _make_view(n_items)
+    pen = QPen()
+    pen.setWidth(2)
+
+    if kind == "setPath":
+        stroke = _SetPathStroke(scene, points[0], pen)
+    else:
+        stroke = LiveStrokeItem(points[0], pen)
+        scene.addItem(stroke)
+
+    samples = []
+    for p in points[1:]:
+        t0 = time.perf_counter_ns()
+        stroke.add_point(p)
+        QApplication.processEvents()  # repaint de la vue
+        samples.append(time.perf_counter_ns() - t0)
+
+    view.close()
+    # Coût moyen sur le dernier quart du trait (croissance en O(n) ou pas)
+    quarter = len(samples) // 4
+    tail_us = sum(samples[-quarter:]) / quarter / 1000
+    samples.sort()
+    return {
+        "mean_us": sum(samples) / len(samples) / 1000,
+        "p99_us": samples[int(len(samples) * 0.99)] / 1000,
+        "tail_us": tail_us,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=2000)
+    args = parser.parse_args()
+
+    QApplication.instance() or QApplication([])
+    points = _stroke_points(args.points)
+
+    print(f"trait de {args.points} points, {args.items} items dans la scène")
+    for kind in ("setPath", "LiveStrokeItem"):
+        r = _run(kind, points, args.items)
+        print(
+            f"{kind:>15} : moyenne {r['mean_us']:8.1f} µs/point"
+            f" | p99 {r['p99_us']:8.1f} µs | derniers 25 % {r['tail_us']:8.1f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
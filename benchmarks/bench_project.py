@@ -0,0 +1,73 @@
+"""
+benchmarks/bench_project.py
+
+Fichier projet (.skproj) : temps d'enregistrement, d'ouverture (chargement
+paresseux, seuls les items visibles sont créés) et de chargement complet.
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.bench_project [--items 100000] [--extent 40000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from benchmarks.bench_canvas import _content  # noqa: E402
+from drawing.project import open_project, save_project  # noqa: E402
+from drawing.scene import DrawingScene  # noqa: E402
+from ui.canvas_view import CanvasView  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--extent", type=float, default=40_000, help="côté (px)")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+
+    scene = DrawingScene(infinite=True)
+    scene.insert_items(_content(args.items, args.extent, random.Random(0)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.skproj")
+        t0 = time.perf_counter()
+        save_project(scene, path)
+        t_save = time.perf_counter() - t0
+        size_mb = os.path.getsize(path) / 1e6
+
+        target = DrawingScene(infinite=True)
+        view = CanvasView(target)
+        view.resize(1280, 720)
+        view.show()
+        app.processEvents()
+
+        t0 = time.perf_counter()
+        loader = open_project(target, path)
+        t_open = time.perf_counter() - t0
+        view.reset_view()  # crée les items de la zone visible
+        app.processEvents()
+        t_first = time.perf_counter() - t0
+        visible = len(target.items())
+
+        t0 = time.perf_counter()
+        loader.load_all()
+        t_all = time.perf_counter() - t0
+
+        view.close()
+
+    print(f"{args.items} items sur {args.extent:.0f} px de côté ({size_mb:.1f} Mo)")
+    print(f"  enregistrement           : {t_save:6.2f} s")
+    print(f"  ouverture (en-tête, TdM) : {t_open * 1000:6.1f} ms")
+    print(f"  + premier affichage      : {t_first * 1000:6.1f} ms ({visible} items)")
+    print(f"  chargement complet       : {t_all:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
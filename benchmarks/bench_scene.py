@@ -0,0 +1,369 @@
+"""
+benchmarks/bench_scene.py
+
+Suite de performance de DrawingScene (latence par événement, mémoire de pointe,
+comparaison à une référence) : à lancer avant une session d'étude.
+
+Chaque scénario envoie des QGraphicsSceneMouseEvent synthétiques aux
+gestionnaires mousePressEvent / mouseMoveEvent / mouseReleaseEvent de la scène,
+affichée dans une vue 1280x720 (plateforme offscreen). Un "événement" = le
+gestionnaire + le rafraîchissement de la vue qui suit.
+
+Scénarios :
+- pen_<n>        : trait au stylo de n points (10 à 10 000), relâché compris
+- erase_<n>      : glissés de gomme sur une scène dense de n items
+- rubber_<n>     : sélection au rectangle élastique sur n items
+- clipboard_<n>  : copier / coller / dupliquer n items sélectionnés
+
+Chaque scénario tourne dans un sous-processus : la mémoire de pointe (RSS
+maximal du processus, Qt compris) est celle du scénario seul.
+
+Usage (depuis la racine du projet) :
+    python -m benchmarks.bench_scene [--only pen] [--quick]
+    python -m benchmarks.bench_scene --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_scene --baseline benchmarks/baseline.json
+
+Avec --baseline, le code de sortie vaut 1 si un scénario régresse (p95 ou
+mémoire au-delà de la tolérance) : utilisable comme vérification avant session.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+try:
+    import resource
+except ImportError:  # Windows : pas de mesure de mémoire de pointe
+    resource = None
+
+import PySide6  # noqa: E402
+from PySide6.QtCore import QEvent, QPointF, QRectF, Qt  # noqa: E402
+from PySide6.QtGui import QPainterPath, QPen  # noqa: E402
+from PySide6.QtWidgets import (  # noqa: E402
+    QApplication,
+    QGraphicsEllipseItem,
+    QGraphicsRectItem,
+    QGraphicsSceneMouseEvent,
+    QGraphicsView,
+)
+
+from drawing.scene import DrawingScene  # noqa: E402
+from drawing.stroke_item import StrokeItem  # noqa: E402
+from drawing.tools import Tool  # noqa: E402
+
+# Tolérances de la comparaison à la référence
+P95_TOLERANCE = 0.25  # +25 % sur le p95
+P95_NOISE_MS = 0.05  # écarts absolus plus petits ignorés (bruit de mesure)
+MEMORY_TOLERANCE = 0.20  # +20 % sur le RSS de pointe
+
+WIDTH, HEIGHT = 1280, 720
+
+
+# ----------------------------------------------------------------------
+# Scènes et événements synthétiques
+# ----------------------------------------------------------------------
+def _mouse(scene, kind, p):
+    etype, handler = {
+        "press": (QEvent.Type.GraphicsSceneMousePress, scene.mousePressEvent),
+        "move": (QEvent.Type.GraphicsSceneMouseMove, scene.mouseMoveEvent),
+        "release": (QEvent.Type.GraphicsSceneMouseRelease, scene.mouseReleaseEvent),
+    }[kind]
+    e = QGraphicsSceneMouseEvent(etype)
+    e.setScenePos(p)
+    e.setScreenPos(p.toPoint())
+    left, none = Qt.MouseButton.LeftButton, Qt.MouseButton.NoButton
+    e.setButton(left if kind != "move" else none)
+    e.setButtons(left if kind != "release" else none)
+    handler(e)
+
+
+def _dense_items(n, rng):
+    """n petits items (rectangles, ellipses, traits) répartis sur la vue."""
+    pen = QPen()
+    pen.setWidth(2)
+    items = []
+    for i in range(n):
+        x, y = rng.uniform(0, WIDTH - 40), rng.uniform(0, HEIGHT - 40)
+        kind = i % 3
+        if kind == 0:
+            it = QGraphicsRectItem(x, y, rng.uniform(5, 40), rng.uniform(5, 40))
+        elif kind == 1:
+            it = QGraphicsEllipseItem(x, y, rng.uniform(5, 40), rng.uniform(5, 40))
+        else:
+            path = QPainterPath(QPointF(x, y))
+            for _ in range(12):
+                x, y = x + rng.uniform(-4, 4), y + rng.uniform(-4, 4)
+                path.lineTo(x, y)
+            it = StrokeItem(path)
+        it.setPen(pen)
+        it.setFlag(it.GraphicsItemFlag.ItemIsSelectable, True)
+        it.setFlag(it.GraphicsItemFlag.ItemIsMovable, True)
+        items.append(it)
+    return items
+
+
+class _Bench:
+    """Scène + vue offscreen ; chronomètre chaque événement (+ repaint)."""
+
+    def __init__(self, n_items, seed=0):
+        self.app = QApplication.instance() or QApplication([])
+        self.rng = random.Random(seed)
+        self.scene = DrawingScene()
+        if n_items:
+            self.scene.add_items(_dense_items(n_items, self.rng))
+            self.scene.undo_stack.clear()
+        self.view = QGraphicsView(self.scene)
+        self.view.resize(WIDTH, HEIGHT)
+        self.view.show()
+        self.app.processEvents()
+        self.samples = []  # ns
+
+    def timed(self, action):
+        t0 = time.perf_counter_ns()
+        action()
+        self.app.processEvents()
+        self.samples.append(time.perf_counter_ns() - t0)
+
+    def mouse(self, kind, p):
+        self.timed(lambda: _mouse(self.scene, kind, p))
+
+    def drag(self, tool, points):
+        self.scene.set_tool(tool)
+        self.mouse("press", points[0])
+        for p in points[1:]:
+            self.mouse("move", p)
+        self.mouse("release", points[-1])
+
+    def close(self):
+        self.view.close()
+        self.app.processEvents()
+
+
+# ----------------------------------------------------------------------
+# Scénarios
+# ----------------------------------------------------------------------
+def _spiral(n, cx=WIDTH / 2, cy=HEIGHT / 2):
+    # Rayon borné : le trait reste dans la vue quelle que soit sa longueur
+    k = min(0.06, 300 / max(n, 1))
+    return [
+        QPointF(cx + k * i * math.cos(i / 40), cy + k * i * math.sin(i / 40))
+        for i in range(n)
+    ]
+
+
+def _pen(n_points, background=500):
+    b = _Bench(background)
+    b.drag(Tool.PEN, _spiral(n_points))
+    return b
+
+
+def _erase(n_items, drags=10, points=100):
+    b = _Bench(n_items)
+    for k in range(drags):
+        y = HEIGHT * (k + 0.5) / drags
+        line = [
+            QPointF(40 + (WIDTH - 80) * i / (points - 1), y + 20 * math.sin(i / 6))
+            for i in range(points)
+        ]
+        b.drag(Tool.ERASER, line)
+    return b
+
+
+def _rubber(n_items, drags=5, points=60):
+    """
+    Le rectangle élastique est géré par QGraphicsView (RubberBandDrag) : à chaque
+    mouvement la vue appelle scene.setSelectionArea(). On reproduit ce chemin :
+    press / release via la scène (outil SELECT), setSelectionArea() par mouvement.
+    """
+    b = _Bench(n_items)
+    b.scene.set_tool(Tool.SELECT)
+    for k in range(drags):
+        origin = QPointF(20 + 30 * k, 20 + 20 * k)
+        b.mouse("press", origin)
+        for i in range(1, points):
+            corner = QPointF(
+                origin.x() + (WIDTH - 200) * i / points,
+                origin.y() + (HEIGHT - 150) * i / points,
+            )
+            path = QPainterPath()
+            path.addRect(QRectF(origin, corner).normalized())
+            b.timed(lambda path=path: b.scene.setSelectionArea(path))
+        b.mouse("release", corner)
+    return b
+
+
+def _clipboard(n_selected, background=2000, repeats=5):
+    b = _Bench(background)
+    scene = b.scene
+    targets = b.rng.sample(scene.items(), n_selected)
+    for _ in range(repeats):
+        scene.clearSelection()
+        for it in targets:
+            it.setSelected(True)
+        b.timed(scene.copy_selection)
+        b.timed(scene.paste)
+        b.timed(scene.undo_stack.undo)
+        scene.clearSelection()
+        for it in targets:
+            it.setSelected(True)
+        b.timed(scene.duplicate_selection)
+        b.timed(scene.undo_stack.undo)
+    return b
+
+
+def _scenarios(quick):
+    pen_sizes = (10, 100, 1000) if quick else (10, 100, 1000, 10_000)
+    dense = (2000,) if quick else (2000, 20_000)
+    copies = (10, 100) if quick else (10, 100, 1000)
+    table = {}
+    for n in pen_sizes:
+        table[f"pen_{n}"] = (_pen, n)
+    for n in dense:
+        table[f"erase_{n}"] = (_erase, n)
+        table[f"rubber_{n}"] = (_rubber, n)
+    for n in copies:
+        table[f"clipboard_{n}"] = (_clipboard, n)
+    return table
+
+
+# ----------------------------------------------------------------------
+# Mesures
+# ----------------------------------------------------------------------
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux : kio ; macOS : octets
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(sorted_ms, q):
+    return sorted_ms[min(len(sorted_ms) - 1, int(len(sorted_ms) * q))]
+
+
+def _summary(samples_ns):
+    ms = sorted(s / 1e6 for s in samples_ns)
+    return {
+        "events": len(ms),
+        "mean_ms": sum(ms) / len(ms),
+        "p50_ms": _percentile(ms, 0.50),
+        "p95_ms": _percentile(ms, 0.95),
+        "p99_ms": _percentile(ms, 0.99),
+        "max_ms": ms[-1],
+    }
+
+
+def _run_one(name, quick):
+    """Exécuté dans le sous-processus : un scénario, résultat JSON sur stdout."""
+    func, n = _scenarios(quick)[name]
+    b = func(n)
+    result = _summary(b.samples)
+    result["peak_rss_mb"] = _peak_rss_mb()
+    b.close()
+    print(json.dumps(result))
+
+
+def _spawn(name, quick):
+    cmd = [sys.executable, "-m", "benchmarks.bench_scene", "--run", name]
+    if quick:
+        cmd.append("--quick")
+    out = subprocess.run(cmd, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"{name} : échec du scénario\n{out.stderr}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _meta():
+    return {
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "pyside6": PySide6.__version__,
+        "platform": platform.platform(),
+        "machine": platform.node(),
+    }
+
+
+def _compare(results, baseline):
+    """Liste des régressions (texte) par rapport à la référence."""
+    regressions = []
+    for name, r in results.items():
+        ref = baseline.get(name)
+        if ref is None:
+            continue
+        limit = max(ref["p95_ms"] * (1 + P95_TOLERANCE), ref["p95_ms"] + P95_NOISE_MS)
+        if r["p95_ms"] > limit:
+            regressions.append(
+                f"{name} : p95 {r['p95_ms']:.2f} ms > {limit:.2f} ms"
+                f" (référence {ref['p95_ms']:.2f} ms)"
+            )
+        if r.get("peak_rss_mb") and ref.get("peak_rss_mb"):
+            mem_limit = ref["peak_rss_mb"] * (1 + MEMORY_TOLERANCE)
+            if r["peak_rss_mb"] > mem_limit:
+                regressions.append(
+                    f"{name} : mémoire {r['peak_rss_mb']:.0f} Mo"
+                    f" > {mem_limit:.0f} Mo (référence {ref['peak_rss_mb']:.0f} Mo)"
+                )
+    return regressions
+
+
+def _print_row(name, r, ref=None):
+    mem = f"{r['peak_rss_mb']:6.0f} Mo" if r.get("peak_rss_mb") else "     - "
+    line = (
+        f"{name:<16} {r['events']:>6} év. | p50 {r['p50_ms']:7.2f}"
+        f" | p95 {r['p95_ms']:7.2f} | p99 {r['p99_ms']:7.2f}"
+        f" | max {r['max_ms']:7.2f} ms | {mem}"
+    )
+    if ref is not None and ref.get("p95_ms"):
+        line += f" | p95 {100 * (r['p95_ms'] / ref['p95_ms'] - 1):+5.0f} %"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[3])
+    parser.add_argument("--only", help="scénarios dont le nom contient ce texte")
+    parser.add_argument("--quick", action="store_true", help="tailles réduites")
+    parser.add_argument("--baseline", help="JSON de référence à comparer")
+    parser.add_argument("--save-baseline", help="enregistrer les résultats (JSON)")
+    parser.add_argument("--run", help=argparse.SUPPRESS)  # sous-processus
+    args = parser.parse_args()
+
+    if args.run:
+        _run_one(args.run, args.quick)
+        return 0
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["scenarios"]
+
+    names = [n for n in _scenarios(args.quick) if not args.only or args.only in n]
+    results = {}
+    for name in names:
+        results[name] = _spawn(name, args.quick)
+        _print_row(name, results[name], baseline.get(name))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"meta": _meta(), "scenarios": results}, f, indent=2)
+        print(f"référence enregistrée : {args.save_baseline}")
+
+    if args.baseline:
+        regressions = _compare(results, baseline)
+        for line in regressions:
+            print(f"RÉGRESSION {line}")
+        if regressions:
+            return 1
+        print("aucune régression par rapport à la référence")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,727 @@
+"""
+drawing/autosave.py
+
+Sauvegarde automatique résistante aux crashs : journal d'opérations en ajout
+seul, instantanés compactés, récupération au démarrage suivant.
+
+Problème : si l'application plante pendant un essai, le dessin est perdu (le
+CSV d'événements ne contient pas la géométrie).
+
+Principe :
+- Autosave écoute la pile d'annulation (UndoHistory.command_applied : push,
+  undo, redo) et compare les items touchés par la commande à ce que le
+  journal en sait déjà ; il en déduit des opérations :
+  ADD (items sérialisés), REMOVE (ids), POS (positions absolues)
+- CLEAR / BASE : contenu remplacé d'un bloc (scene.clear, projet ouvert ou
+  enregistré). BASE référence le fichier .skproj ; ses items sont identifiés
+  par BASE_ID | rang d'empilement dans le fichier (ProjectLoader.ranks)
+- le thread GUI ne fait que sérialiser les items ajoutés (serialize_item) et
+  empiler ; l'encodage, l'écriture et les fsync (par lots, comme
+  logs/logger.py) se font dans un thread dédié
+- ce thread tient l'état courant (JournalState) : régulièrement, et après
+  chaque CLEAR / BASE, il l'écrit en instantané compacté puis repart d'un
+  journal vide
+
+Fichiers (logs/autosave/<session>.sksnap et .skjournal) : MAGIC puis une
+suite d'enregistrements _FRAME (longueur, crc32) + _SEQ_OP (numéro, type) +
+corps. Un enregistrement tronqué ou corrompu (crash pendant l'écriture) met
+fin à la lecture. Le journal ne rejoue que les numéros postérieurs à ceux
+de l'instantané : un crash entre l'écriture de l'instantané et la remise à
+zéro du journal ne duplique rien.
+
+Chaque session tient un verrou exclusif (<session>.lock, flock / msvcrt)
+tant qu'elle tourne : seuls les journaux dont le verrou est libre (processus
+terminé) sont proposés à la récupération (ui/editor.py). Une session fermée
+normalement supprime ses fichiers.
+
+Usage (depuis la racine du projet) :
+    python -m drawing.autosave info logs/autosave/<session>.skjournal
+"""
+
+import argparse
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+import warnings
+import weakref
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from PySide6.QtCore import Qt
+
+from drawing.history import SpilledItem, live_item
+from drawing.project import open_project
+from drawing.serialization import deserialize_item, serialize_item
+
+AUTOSAVE_DIR = os.path.join("logs", "autosave")
+JOURNAL_SUFFIX = ".skjournal"
+SNAPSHOT_SUFFIX = ".sksnap"
+LOCK_SUFFIX = ".lock"
+
+MAGIC = b"SKJRNL\x01\x00"  # 8 octets, version 1
+
+# Écriture par lots : fsync au plus tard FLUSH_INTERVAL_S après la première
+# opération en attente, ou dès FLUSH_EVERY opérations
+FLUSH_INTERVAL_S = 0.5
+FLUSH_EVERY = 64
+
+# Instantané : au plus tard SNAPSHOT_INTERVAL_S après le précédent (s'il y a
+# du nouveau), ou dès que le journal dépasse max(COMPACT_MIN_BYTES, taille de
+# l'instantané)
+SNAPSHOT_INTERVAL_S = 60.0
+COMPACT_MIN_BYTES = 1 << 20
+
+# Items par enregistrement ADD d'un instantané
+_SNAPSHOT_BATCH = 256
+
+_FRAME = struct.Struct("<II")  # longueur de la suite, crc32 de la suite
+_SEQ_OP = struct.Struct("<QB")
+_POS = struct.Struct("<Idd")
+
+OP_CLEAR, OP_BASE, OP_ADD, OP_REMOVE, OP_POS = 1, 2, 3, 4, 5
+_OP_NAMES = {
+    OP_CLEAR: "clear",
+    OP_BASE: "base",
+    OP_ADD: "add",
+    OP_REMOVE: "remove",
+    OP_POS: "pos",
+}
+
+# Ids des items du projet de base : BASE_ID | rang ; les autres : 1, 2, 3...
+BASE_ID = 1 << 31
+
+TAG_ROLE = int(Qt.UserRole)
+
+_STOP = object()
+
+
+class _FlushRequest:
+    """Demande de flush ; `done` est signalé quand le journal est sur disque."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+# ----------------------------------------------------------------------
+# Format
+# ----------------------------------------------------------------------
+def _encode(seq, op, payload):
+    if op == OP_ADD:  # [[id, data], ...]
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        body = zlib.compress(raw, 1)
+    elif op == OP_REMOVE:  # [id, ...]
+        body = struct.pack(f"<{len(payload)}I", *payload)
+    elif op == OP_POS:  # [(id, x, y), ...]
+        body = b"".join(_POS.pack(*p) for p in payload)
+    elif op == OP_BASE:  # chemin du .skproj
+        body = payload.encode("utf-8")
+    else:
+        body = b""
+    rest = _SEQ_OP.pack(seq, op) + body
+    return _FRAME.pack(len(rest), zlib.crc32(rest)) + rest
+
+
+def _decode(op, body):
+    if op == OP_ADD:
+        return json.loads(zlib.decompress(body))
+    if op == OP_REMOVE:
+        return list(struct.unpack(f"<{len(body) // 4}I", body))
+    if op == OP_POS:
+        return list(_POS.iter_unpack(body))
+    if op == OP_BASE:
+        return body.decode("utf-8")
+    return None
+
+
+def read_records(path):
+    """
+    Enregistrements valides de `path` : [(seq, op, payload)]. La lecture
+    s'arrête au premier enregistrement tronqué ou corrompu.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    if data[: len(MAGIC)] != MAGIC:
+        return []
+    records = []
+    pos = len(MAGIC)
+    while pos + _FRAME.size <= len(data):
+        length, crc = _FRAME.unpack_from(data, pos)
+        start = pos + _FRAME.size
+        rest = data[start : start + length]
+        if length < _SEQ_OP.size or len(rest) < length or zlib.crc32(rest) != crc:
+            break
+        seq, op = _SEQ_OP.unpack_from(rest)
+        try:
+            payload = _decode(op, rest[_SEQ_OP.size :])
+        except (ValueError, zlib.error, struct.error):
+            break
+        records.append((seq, op, payload))
+        pos = start + length
+    return records
+
+
+class JournalState:
+    """
+    Dessin décrit par une suite d'opérations : tenu par le thread d'écriture
+    (instantanés) et reconstruit à la récupération.
+    """
+
+    def __init__(self):
+        self.base = None  # chemin du projet de base
+        self.items = {}  # id -> data (serialize_item), ordre = empilement
+        self.base_removed = set()  # ids d'items du projet de base retirés
+        self.base_pos = {}  # id -> (x, y) des items du projet de base déplacés
+
+    def apply(self, op, payload):
+        if op in (OP_CLEAR, OP_BASE):
+            self.base = payload if op == OP_BASE else None
+            self.items.clear()
+            self.base_removed.clear()
+            self.base_pos.clear()
+        elif op == OP_ADD:
+            for iid, data in payload:
+                # Réajout : l'item repasse au-dessus (comme scene.addItem)
+                self.items.pop(iid, None)
+                self.items[iid] = data
+                self.base_removed.discard(iid)
+                self.base_pos.pop(iid, None)
+        elif op == OP_REMOVE:
+            for iid in payload:
+                self.items.pop(iid, None)
+                if iid & BASE_ID:
+                    self.base_removed.add(iid)
+                    self.base_pos.pop(iid, None)
+        elif op == OP_POS:
+            for iid, x, y in payload:
+                data = self.items.get(iid)
+                if data is not None:
+                    data["pos"] = [x, y]
+                elif iid & BASE_ID and iid not in self.base_removed:
+                    self.base_pos[iid] = (x, y)
+
+    def records(self):
+        """Opérations minimales qui reconstruisent cet état (instantané)."""
+        yield OP_CLEAR, None
+        if self.base is not None:
+            yield OP_BASE, self.base
+            if self.base_removed:
+                yield OP_REMOVE, sorted(self.base_removed)
+            if self.base_pos:
+                yield OP_POS, [(i, x, y) for i, (x, y) in self.base_pos.items()]
+        batch = []
+        for iid, data in self.items.items():
+            batch.append([iid, data])
+            if len(batch) == _SNAPSHOT_BATCH:
+                yield OP_ADD, batch
+                batch = []
+        if batch:
+            yield OP_ADD, batch
+
+
+def load_state(journal_path, snapshot_path):
+    """Instantané puis opérations du journal qui lui sont postérieures."""
+    state = JournalState()
+    last = 0
+    for seq, op, payload in read_records(snapshot_path):
+        state.apply(op, payload)
+        last = seq
+    for seq, op, payload in read_records(journal_path):
+        if seq > last:
+            state.apply(op, payload)
+    return state
+
+
+# ----------------------------------------------------------------------
+# Écriture (thread dédié)
+# ----------------------------------------------------------------------
+class _JournalWriter:
+    """
+    Thread d'écriture du journal. Le thread GUI ne fait qu'un `put()` ; ce
+    thread numérote et encode les opérations, les écrit par lots (un fsync
+    par lot) et compacte le journal en instantané.
+    """
+
+    def __init__(
+        self,
+        journal_path,
+        snapshot_path,
+        flush_interval_s=FLUSH_INTERVAL_S,
+        flush_every=FLUSH_EVERY,
+        snapshot_interval_s=SNAPSHOT_INTERVAL_S,
+    ):
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self._flush_interval_s = flush_interval_s
+        self._flush_every = flush_every
+        self._snapshot_interval_s = snapshot_interval_s
+
+        self.state = JournalState()
+        self._seq = 0
+        self._f = None
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+        self._last_snapshot = time.monotonic()
+        self._failed = False
+
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._run, name="AutosaveWriter", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, op, payload=None):
+        self._queue.put((op, payload))
+
+    def flush(self, timeout=2.0):
+        req = _FlushRequest()
+        self._queue.put(req)
+        req.done.wait(timeout)
+
+    def close(self, timeout=2.0):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _open_journal(self):
+        if self._f is not None:
+            self._f.close()
+        self._f = open(self.journal_path, "wb")
+        self._f.write(MAGIC)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._journal_bytes = 0
+
+    def _write(self, pending):
+        if not pending or self._failed:
+            pending.clear()
+            return
+        try:
+            if self._f is None:
+                self._open_journal()
+            out = bytearray()
+            reset = False
+            for op, payload in pending:
+                self._seq += 1
+                self.state.apply(op, payload)
+                out += _encode(self._seq, op, payload)
+                reset = reset or op in (OP_CLEAR, OP_BASE)
+            self._f.write(out)
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._journal_bytes += len(out)
+
+            # Contenu remplacé : l'instantané est petit, on compacte tout de suite
+            due = time.monotonic() - self._last_snapshot > self._snapshot_interval_s
+            too_big = self._journal_bytes > max(
+                COMPACT_MIN_BYTES, self._snapshot_bytes
+            )
+            if reset or due or too_big:
+                self._snapshot()
+        except OSError as e:
+            # Disque plein, droits... : on cesse d'écrire, sans bloquer l'app
+            self._failed = True
+            warnings.warn(f"autosave désactivée : {e}", stacklevel=1)
+        pending.clear()
+
+    def _snapshot(self):
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            for op, payload in self.state.records():
+                f.write(_encode(self._seq, op, payload))
+            f.flush()
+            os.fsync(f.fileno())
+            self._snapshot_bytes = f.tell()
+        os.replace(tmp, self.snapshot_path)
+        # Les opérations du journal sont dans l'instantané (numéros <= _seq)
+        self._open_journal()
+        self._last_snapshot = time.monotonic()
+
+    def _run(self):
+        pending = []
+        deadline = None
+
+        while True:
+            timeout = None
+            if deadline is not None:
+                timeout = max(0.0, deadline - time.monotonic())
+
+            try:
+                msg = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write(pending)
+                deadline = None
+                continue
+
+            if msg is _STOP:
+                self._write(pending)
+                if self._f is not None:
+                    self._f.close()
+                return
+
+            if isinstance(msg, _FlushRequest):
+                self._write(pending)
+                deadline = None
+                msg.done.set()
+                continue
+
+            pending.append(msg)
+            if deadline is None:
+                deadline = time.monotonic() + self._flush_interval_s
+            if len(pending) >= self._flush_every:
+                self._write(pending)
+                deadline = None
+
+
+# ----------------------------------------------------------------------
+# Côté scène (thread GUI)
+# ----------------------------------------------------------------------
+_UNKNOWN = object()  # item du projet de base jamais touché : présent, position ?
+
+
+def session_paths(session_id, directory=AUTOSAVE_DIR):
+    """(journal, instantané) d'une session."""
+    base = os.path.join(directory, session_id)
+    return base + JOURNAL_SUFFIX, base + SNAPSHOT_SUFFIX
+
+
+def _acquire_lock(session_id, directory):
+    """
+    Verrou exclusif de la session (fichier ouvert, à garder), ou None s'il
+    est tenu par un autre processus (ou une autre instance dans celui-ci).
+    """
+    f = open(os.path.join(directory, session_id + LOCK_SUFFIX), "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        return None
+    f.seek(0)
+    f.truncate()
+    f.write(str(os.getpid()).encode("ascii"))
+    f.flush()
+    return f
+
+
+def _release_lock(lock):
+    if lock is not None and not lock.closed:
+        lock.close()  # libère flock / msvcrt
+
+
+class Autosave:
+    """
+    Journal de récupération d'une scène (DrawingScene) pour une session.
+    close(discard=True) à la fermeture normale de l'application.
+    """
+
+    def __init__(
+        self,
+        scene,
+        session_id,
+        directory=AUTOSAVE_DIR,
+        flush_interval_s=FLUSH_INTERVAL_S,
+        snapshot_interval_s=SNAPSHOT_INTERVAL_S,
+    ):
+        self.scene = scene
+        self.session_id = session_id
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = _acquire_lock(session_id, directory)
+        if self._lock is None:
+            raise RuntimeError(f"session d'autosave {session_id!r} déjà ouverte")
+        self.journal_path, self.snapshot_path = session_paths(session_id, directory)
+        self._writer = _JournalWriter(
+            self.journal_path,
+            self.snapshot_path,
+            flush_interval_s=flush_interval_s,
+            snapshot_interval_s=snapshot_interval_s,
+        )
+
+        # Vue du journal côté GUI : item -> id, id -> position connue
+        # (absent = item hors scène pour le journal)
+        self._ids = weakref.WeakKeyDictionary()
+        self._next_id = 1
+        self._known = {}
+
+        scene.undo_stack.command_applied.connect(self._on_command)
+        scene.undo_stack.items_changed.connect(self._on_items_changed)
+        scene.content_replaced.connect(self._on_content_replaced)
+        self.resync()
+
+    def flush(self, timeout=2.0):
+        """Attend que les opérations en attente soient sur disque (tests, bench)."""
+        self._writer.flush(timeout)
+
+    def close(self, discard=False):
+        """Arrête le thread d'écriture ; discard=True supprime les fichiers."""
+        try:
+            self.scene.undo_stack.command_applied.disconnect(self._on_command)
+            self.scene.undo_stack.items_changed.disconnect(self._on_items_changed)
+            self.scene.content_replaced.disconnect(self._on_content_replaced)
+        except (RuntimeError, TypeError):
+            pass  # scène déjà détruite
+        self._writer.close()
+        if discard:
+            discard_session(self.session_id, self.directory, self._lock)
+        else:
+            _release_lock(self._lock)
+
+    # ------------------------------------------------------------------
+    # Identité des items
+    # ------------------------------------------------------------------
+    def _id(self, item):
+        iid = self._ids.get(item)
+        if iid is None:
+            loader = self.scene.project
+            rank = loader.ranks.get(item) if loader is not None else None
+            if rank is not None:
+                iid = BASE_ID | rank
+            else:
+                iid = self._next_id
+                self._next_id += 1
+            self._ids[item] = iid
+        return iid
+
+    def _reset(self):
+        self._ids = weakref.WeakKeyDictionary()
+        self._known.clear()
+        loader = self.scene.project
+        if loader is not None:
+            self._writer.put(OP_BASE, os.path.abspath(loader.path))
+        else:
+            self._writer.put(OP_CLEAR)
+
+    def _on_content_replaced(self):
+        self._reset()
+
+    def resync(self):
+        """Réécrit l'état complet de la scène (démarrage, après récupération)."""
+        self._reset()
+        self._record(
+            it
+            for it in self.scene.items(Qt.SortOrder.AscendingOrder)
+            if it.parentItem() is None
+        )
+
+    # ------------------------------------------------------------------
+    # Commandes
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _refs(cmd, redo):
+        """Références d'items de `cmd`, macros dépliées dans l'ordre d'exécution."""
+        children = [cmd.child(j) for j in range(cmd.childCount())]
+        if not redo:
+            children.reverse()
+        for child in children:
+            yield from Autosave._refs(child, redo)
+        refs = getattr(cmd, "item_refs", None)
+        if refs is not None:
+            yield from refs()
+
+    def _on_command(self, cmd, redo):
+        self._on_items_changed(self._refs(cmd, redo))
+
+    def _on_items_changed(self, refs):
+        items = []
+        for ref in refs:
+            # Item sérialisé par l'historique : hors scène, déjà retiré du journal
+            if isinstance(ref, SpilledItem) and not ref.is_live():
+                continue
+            items.append(live_item(ref))
+        self._record(items)
+
+    def _record(self, items):
+        """Compare les items à l'état connu du journal et émet les écarts."""
+        added, removed, moved = [], [], []
+        seen = set()
+        for item in items:
+            if item in seen:
+                continue
+            seen.add(item)
+            iid = self._id(item)
+            prev = self._known.get(iid, _UNKNOWN if iid & BASE_ID else None)
+            if item.scene() is self.scene:
+                pos = (item.x(), item.y())
+                if prev is None:
+                    data = serialize_item(item)
+                    if data is None:
+                        continue
+                    tag = item.data(TAG_ROLE)
+                    if tag is not None:
+                        data["assistant_tag"] = tag
+                    added.append([iid, data])
+                elif prev != pos:
+                    moved.append((iid, *pos))
+                self._known[iid] = pos
+            elif prev is not None:
+                removed.append(iid)
+                if iid & BASE_ID:
+                    self._known[iid] = None
+                else:
+                    del self._known[iid]
+        if removed:
+            self._writer.put(OP_REMOVE, removed)
+        if added:
+            self._writer.put(OP_ADD, added)
+        if moved:
+            self._writer.put(OP_POS, moved)
+
+
+# ----------------------------------------------------------------------
+# Récupération
+# ----------------------------------------------------------------------
+class OrphanSession:
+    """
+    Session arrêtée brutalement (verrou libre). Son verrou est tenu jusqu'à
+    discard() / release() : une autre instance ne la propose pas en même temps.
+    """
+
+    def __init__(self, session_id, directory, state, mtime, lock):
+        self.session_id = session_id
+        self.directory = directory
+        self.state = state
+        self.mtime = mtime  # dernière écriture (s depuis l'epoch)
+        self._lock = lock
+
+    def discard(self):
+        """Supprime les fichiers de la session."""
+        discard_session(self.session_id, self.directory, self._lock)
+
+    def release(self):
+        """Garde les fichiers (proposés à nouveau au prochain démarrage)."""
+        _release_lock(self._lock)
+
+
+def find_recoverable(directory=AUTOSAVE_DIR, exclude=None):
+    """
+    Sessions laissées par un arrêt brutal : [OrphanSession], la plus récente
+    d'abord. Les sessions dont le verrou est tenu (encore ouvertes dans un
+    autre processus) sont ignorées ; celles dont le dessin est vide sont
+    supprimées.
+    """
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    mtimes = {}
+    for name in names:
+        for suffix in (JOURNAL_SUFFIX, SNAPSHOT_SUFFIX, LOCK_SUFFIX):
+            if name.endswith(suffix):
+                sid = name[: -len(suffix)]
+                mtime = os.path.getmtime(os.path.join(directory, name))
+                mtimes[sid] = max(mtime, mtimes.get(sid, 0.0))
+    mtimes.pop(exclude, None)
+
+    found = []
+    for sid in sorted(mtimes, key=mtimes.get, reverse=True):
+        lock = _acquire_lock(sid, directory)
+        if lock is None:
+            continue  # session en cours
+        state = load_state(*session_paths(sid, directory))
+        session = OrphanSession(sid, directory, state, mtimes[sid], lock)
+        if session.state.base is None and not session.state.items:
+            session.discard()
+        else:
+            found.append(session)
+    return found
+
+
+def discard_session(session_id, directory=AUTOSAVE_DIR, lock=None):
+    """
+    Supprime les fichiers d'une session, en tenant son verrou `lock`, puis le
+    libère.
+    """
+    journal, snapshot = session_paths(session_id, directory)
+    for path in (journal, snapshot, snapshot + ".tmp"):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    _release_lock(lock)
+    try:
+        os.remove(os.path.join(directory, session_id + LOCK_SUFFIX))
+    except OSError:
+        pass  # déjà supprimé, ou repris entre-temps (Windows)
+
+
+def recover(scene, state):
+    """
+    Remplace le contenu de `scene` par le dessin journalisé `state` (voir
+    find_recoverable). Hors historique : rien à annuler.
+    Retourne le nombre d'items de la scène.
+    """
+    by_id = {}
+    if state.base is not None:
+        loader = open_project(scene, state.base)
+        loader.load_all()
+        by_id = {BASE_ID | rank: item for item, rank in loader.ranks.items()}
+    else:
+        scene.undo_stack.clear()
+        scene.clear()
+
+    # Items du projet retirés, ou remplacés par une version journalisée
+    gone = [by_id[i] for i in state.base_removed | state.items.keys() if i in by_id]
+    scene.remove_items(gone)
+    for iid, (x, y) in state.base_pos.items():
+        item = by_id.get(iid)
+        if item is not None:
+            item.setPos(x, y)
+
+    items = []
+    for data in state.items.values():
+        item = deserialize_item(data)
+        if item is None:
+            continue
+        if "assistant_tag" in data:
+            item.setData(TAG_ROLE, data["assistant_tag"])
+        items.append(item)
+    scene.insert_items(items)
+    return len(scene.items())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Journal de récupération")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_info = sub.add_parser("info", help="opérations et état reconstruit")
+    p_info.add_argument("path", help=f"fichier {JOURNAL_SUFFIX} ou {SNAPSHOT_SUFFIX}")
+    args = parser.parse_args(argv)
+
+    stem = os.path.splitext(args.path)[0]
+    journal, snapshot = stem + JOURNAL_SUFFIX, stem + SNAPSHOT_SUFFIX
+    for path in (snapshot, journal):
+        records = read_records(path)
+        counts = {}
+        for _seq, op, _payload in records:
+            name = _OP_NAMES.get(op, str(op))
+            counts[name] = counts.get(name, 0) + 1
+        seqs = f" (n° {records[0][0]}..{records[-1][0]})" if records else ""
+        detail = ", ".join(f"{n} {name}" for name, n in counts.items()) or "vide"
+        print(f"{path} : {detail}{seqs}")
+
+    state = load_state(journal, snapshot)
+    print(
+        f"  état : {len(state.items)} items journalisés"
+        f" | base {state.base or '-'}"
+        f" ({len(state.base_removed)} retirés, {len(state.base_pos)} déplacés)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,20 @@
+import time
+
+from PySide6.QtCore import QPointF
 from PySide6.QtGui import QUndoCommand
 from PySide6.QtWidgets import QGraphicsItem, QGraphicsScene
 
+from drawing.history import live_item
+
+# Chaque commande expose ses items via item_refs() / replace_refs() : l'historique
+# (drawing/history.py) peut remplacer un item hors scène par un SpilledItem
+# sérialisé. Un item n'est donc manipulé qu'à travers live_item(ref).
+
+# Identifiant de fusion des déplacements (QUndoCommand.id) ; délai max (s)
+# entre deux déplacements fusionnés
+MOVE_COMMAND_ID = 1
+MERGE_WINDOW_S = 1.0
+
 
 class AddItemCommand(QUndoCommand):
     def __init__(
@@ -15,17 +29,86 @@ class AddItemCommand(QUndoCommand):
         self.item = item
         self._first_redo = already_in_scene  # l'item est déjà visible (preview)
 
+    def item_refs(self):
+        return [self.item]
+
+    def replace_refs(self, mapping):
+        self.item = mapping.get(self.item, self.item)
+
     def redo(self):
         # Premier redo = no-op si l'item est déjà dans la scène
         if self._first_redo:
             self._first_redo = False
             return
-        if self.item.scene() is None:
-            self.scene.addItem(self.item)
+        item = live_item(self.item)
+        if item.scene() is None:
+            self.scene.addItem(item)
+
+    def undo(self):
+        item = live_item(self.item)
+        if item.scene() is not None:
+            self.scene.removeItem(item)
+
+
+class AddItemsCommand(QUndoCommand):
+    """
+    Ajout d'un lot d'items en une seule commande (un seul Ctrl+Z).
+    L'insertion / le retrait passent par scene.insert_items / remove_items
+    (DrawingScene), qui traitent le lot d'un bloc.
+    """
+
+    def __init__(self, scene, items, text="Add items", already_in_scene=False):
+        super().__init__(text)
+        self.scene = scene
+        self.items = list(items)
+        self._first_redo = already_in_scene  # items déjà visibles (ghost...)
+
+    def item_refs(self):
+        return self.items
+
+    def replace_refs(self, mapping):
+        self.items = [mapping.get(r, r) for r in self.items]
+
+    def redo(self):
+        if self._first_redo:
+            self._first_redo = False
+            return
+        self.scene.insert_items([live_item(r) for r in self.items])
+
+    def undo(self):
+        self.scene.remove_items([live_item(r) for r in self.items])
+
+
+class RemoveItemsCommand(QUndoCommand):
+    """
+    Retrait d'un lot d'items en une seule commande (couper, gomme), symétrique
+    d'AddItemsCommand : scene.remove_items / insert_items traitent le lot d'un
+    bloc.
+
+    already_removed=True : items déjà hors de la scène (glissé de gomme), le
+    premier redo ne fait rien.
+    """
+
+    def __init__(self, scene, items, text="Remove items", already_removed=False):
+        super().__init__(text)
+        self.scene = scene
+        self.items = list(items)
+        self._first_redo = already_removed
+
+    def item_refs(self):
+        return self.items
+
+    def replace_refs(self, mapping):
+        self.items = [mapping.get(r, r) for r in self.items]
+
+    def redo(self):
+        if self._first_redo:
+            self._first_redo = False
+            return
+        self.scene.remove_items([live_item(r) for r in self.items])
 
     def undo(self):
-        if self.item.scene() is not None:
-            self.scene.removeItem(self.item)
+        self.scene.insert_items([live_item(r) for r in self.items])
 
 
 class RemoveItemCommand(QUndoCommand):
@@ -35,31 +118,108 @@ class RemoveItemCommand(QUndoCommand):
         self.item = item
         self._pos = item.pos()  # utile si tu veux conserver des infos
 
+    def item_refs(self):
+        return [self.item]
+
+    def replace_refs(self, mapping):
+        self.item = mapping.get(self.item, self.item)
+
     def redo(self):
-        if self.item.scene() is not None:
-            self.scene.removeItem(self.item)
+        item = live_item(self.item)
+        if item.scene() is not None:
+            self.scene.removeItem(item)
 
     def undo(self):
-        if self.item.scene() is None:
-            self.scene.addItem(self.item)
-            self.item.setPos(self._pos)
+        item = live_item(self.item)
+        if item.scene() is None:
+            self.scene.addItem(item)
+            item.setPos(self._pos)
 
 
 class MoveItemsCommand(QUndoCommand):
     """
     Déplacement d'un ensemble d'items (utile quand l'utilisateur bouge une sélection).
+
+    - déplacement rigide (tous les items du même vecteur) : un seul delta
+      partagé, appliqué relativement (pos + delta / pos - delta)
+    - sinon : positions avant / après par item (dict[item] = QPointF)
+
+    Deux déplacements rigides successifs des mêmes items à moins de
+    MERGE_WINDOW_S secondes fusionnent (id() / mergeWith()) : un glissé
+    retouché ou une rafale de flèches clavier = une seule entrée d'annulation.
     """
 
-    def __init__(self, items, old_positions, new_positions, text="Move items"):
+    def __init__(
+        self,
+        items,
+        old_positions,
+        new_positions,
+        text="Move items",
+        already_applied=True,
+    ):
         super().__init__(text)
         self.items = list(items)
-        self.old_positions = old_positions  # dict[item] = QPointF
-        self.new_positions = new_positions  # dict[item] = QPointF
+        self._t_last = time.monotonic()
+        # already_applied : les items sont déjà à leur place (glissé souris),
+        # le premier redo() (appelé par push) ne fait rien
+        self._first_redo = already_applied
+
+        deltas = [new_positions[it] - old_positions[it] for it in self.items]
+        if deltas and all(d == deltas[0] for d in deltas):
+            self.delta = QPointF(deltas[0])
+            self.old_positions = self.new_positions = None
+        else:
+            self.delta = None
+            self.old_positions = old_positions
+            self.new_positions = new_positions
+
+    def item_refs(self):
+        return self.items
+
+    def replace_refs(self, mapping):
+        self.items = [mapping.get(r, r) for r in self.items]
+        if self.delta is None:
+            old, new = self.old_positions, self.new_positions
+            self.old_positions = {mapping.get(r, r): p for r, p in old.items()}
+            self.new_positions = {mapping.get(r, r): p for r, p in new.items()}
+
+    def id(self):
+        return MOVE_COMMAND_ID
+
+    def mergeWith(self, other):
+        if (
+            not isinstance(other, MoveItemsCommand)
+            or self.delta is None
+            or other.delta is None
+            or other._t_last - self._t_last > MERGE_WINDOW_S
+            or len(other.items) != len(self.items)
+            or set(other.items) != set(self.items)
+        ):
+            return False
+        self.delta += other.delta
+        self._t_last = other._t_last
+        # Aller-retour complet : l'entrée disparaît de la pile
+        if self.delta.manhattanLength() < 1e-9:
+            self.setObsolete(True)
+        return True
 
     def redo(self):
-        for it in self.items:
-            it.setPos(self.new_positions[it])
+        if self._first_redo:
+            self._first_redo = False
+            return
+        if self.delta is not None:
+            for ref in self.items:
+                item = live_item(ref)
+                item.setPos(item.pos() + self.delta)
+        else:
+            for ref in self.items:
+                live_item(ref).setPos(self.new_positions[ref])
 
     def undo(self):
-        for it in self.items:
-            it.setPos(self.old_positions[it])
+        if self.delta is not None:
+            for ref in self.items:
+                item = live_item(ref)
+                item.setPos(item.pos() - self.delta)
+        else:
+            for ref in self.items:
+                live_item(ref).setPos(self.old_positions[ref])
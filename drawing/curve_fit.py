@@ -0,0 +1,221 @@
+"""
+curve_fit.py
+
+Lissage des traits au stylo en courbes de Bézier cubiques (au relâchement).
+
+Algorithme de Schneider ("An Algorithm for Automatically Fitting Digitized
+Curves", Graphics Gems, 1990) :
+- le trait est d'abord coupé aux angles vifs (coins conservés nets)
+- chaque morceau est approché par une cubique (moindres carrés, tangentes
+  aux extrémités fixées), paramètres affinés par Newton-Raphson
+- si l'erreur max dépasse `max_error`, on coupe au point le plus éloigné
+  et on recommence sur chaque moitié (tangente commune => raccord lisse)
+
+Un trait de ~300 échantillons donne typiquement une dizaine de segments.
+
+Le résultat est une liste de segments (p0, c1, c2, p3) en tuples (x, y) ;
+c1 / c2 valent None pour un segment droit (LineTo).
+"""
+
+import math
+
+from PySide6.QtGui import QPainterPath
+
+from drawing.simplify import rdp_indices
+
+# Erreur max par défaut (px de scène) entre le trait et les courbes
+DEFAULT_MAX_ERROR = 2.0
+
+# Changement de direction à partir duquel un point est traité comme un coin
+CORNER_ANGLE_DEG = 60.0
+
+_MAX_NEWTON_ITERATIONS = 4
+
+
+def _sub(a, b):
+    return (a[0] - b[0], a[1] - b[1])
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1]
+
+
+def _scale(a, s):
+    return (a[0] * s, a[1] * s)
+
+
+def _normalize(v):
+    n = math.hypot(v[0], v[1])
+    if n == 0.0:
+        return (0.0, 0.0)
+    return (v[0] / n, v[1] / n)
+
+
+def _bezier(b, t):
+    mt = 1.0 - t
+    b0, b1, b2, b3 = mt * mt * mt, 3 * mt * mt * t, 3 * mt * t * t, t * t * t
+    return (
+        b0 * b[0][0] + b1 * b[1][0] + b2 * b[2][0] + b3 * b[3][0],
+        b0 * b[0][1] + b1 * b[1][1] + b2 * b[2][1] + b3 * b[3][1],
+    )
+
+
+def _newton_step(b, p, u):
+    """Un pas de Newton-Raphson : paramètre u plus proche du point p."""
+    mt = 1.0 - u
+    q = _bezier(b, u)
+    # Dérivées première et seconde de la cubique
+    d1 = [_scale(_sub(b[i + 1], b[i]), 3.0) for i in range(3)]
+    d2 = [_scale(_sub(d1[i + 1], d1[i]), 2.0) for i in range(2)]
+    q1 = (
+        mt * mt * d1[0][0] + 2 * mt * u * d1[1][0] + u * u * d1[2][0],
+        mt * mt * d1[0][1] + 2 * mt * u * d1[1][1] + u * u * d1[2][1],
+    )
+    q2 = (mt * d2[0][0] + u * d2[1][0], mt * d2[0][1] + u * d2[1][1])
+    diff = _sub(q, p)
+    den = _dot(q1, q1) + _dot(diff, q2)
+    if den == 0.0:
+        return u
+    return u - _dot(diff, q1) / den
+
+
+def _chord_params(pts, first, last):
+    u = [0.0]
+    for i in range(first + 1, last + 1):
+        a, b = pts[i], pts[i - 1]
+        u.append(u[-1] + math.hypot(a[0] - b[0], a[1] - b[1]))
+    total = u[-1]
+    return [x / total for x in u] if total > 0 else u
+
+
+def _generate(pts, first, last, u, t1, t2):
+    """Cubique aux extrémités fixées, longueurs de tangentes par moindres carrés."""
+    p0, p3 = pts[first], pts[last]
+    c00 = c01 = c11 = x0 = x1 = 0.0
+    for i, t in enumerate(u):
+        mt = 1.0 - t
+        b0, b1, b2, b3 = mt * mt * mt, 3 * mt * mt * t, 3 * mt * t * t, t * t * t
+        a0 = _scale(t1, b1)
+        a1 = _scale(t2, b2)
+        c00 += _dot(a0, a0)
+        c01 += _dot(a0, a1)
+        c11 += _dot(a1, a1)
+        p = pts[first + i]
+        tmp = (
+            p[0] - (p0[0] * (b0 + b1) + p3[0] * (b2 + b3)),
+            p[1] - (p0[1] * (b0 + b1) + p3[1] * (b2 + b3)),
+        )
+        x0 += _dot(a0, tmp)
+        x1 += _dot(a1, tmp)
+
+    det = c00 * c11 - c01 * c01
+    alpha1 = (x0 * c11 - x1 * c01) / det if det != 0.0 else 0.0
+    alpha2 = (c00 * x1 - c01 * x0) / det if det != 0.0 else 0.0
+
+    seg_len = math.hypot(p3[0] - p0[0], p3[1] - p0[1])
+    eps = 1e-6 * seg_len
+    if alpha1 < eps or alpha2 < eps:
+        # Système mal conditionné : heuristique de Wu / Barsky
+        alpha1 = alpha2 = seg_len / 3.0
+
+    return (
+        p0,
+        (p0[0] + t1[0] * alpha1, p0[1] + t1[1] * alpha1),
+        (p3[0] + t2[0] * alpha2, p3[1] + t2[1] * alpha2),
+        p3,
+    )
+
+
+def _max_error(pts, first, last, b, u):
+    worst, split = 0.0, (first + last) // 2
+    for i in range(first + 1, last):
+        q = _bezier(b, u[i - first])
+        d2 = (q[0] - pts[i][0]) ** 2 + (q[1] - pts[i][1]) ** 2
+        if d2 >= worst:
+            worst, split = d2, i
+    return worst, split
+
+
+def _fit(pts, first, last, t1, t2, err2, out):
+    if last - first == 1:
+        out.append((pts[first], None, None, pts[last]))
+        return
+
+    u = _chord_params(pts, first, last)
+    b = _generate(pts, first, last, u, t1, t2)
+    worst, split = _max_error(pts, first, last, b, u)
+    if worst < err2:
+        out.append(b)
+        return
+
+    # Erreur modérée : on tente d'ajuster les paramètres avant de couper
+    if worst < 4 * err2:
+        for _ in range(_MAX_NEWTON_ITERATIONS):
+            u = [_newton_step(b, pts[first + i], t) for i, t in enumerate(u)]
+            b = _generate(pts, first, last, u, t1, t2)
+            worst, split = _max_error(pts, first, last, b, u)
+            if worst < err2:
+                out.append(b)
+                return
+
+    # Coupe au point le plus éloigné, tangente commune (raccord lisse)
+    tc = _normalize(_sub(pts[split - 1], pts[split + 1]))
+    if tc == (0.0, 0.0):
+        tc = _normalize(_sub(pts[split - 1], pts[split]))
+    _fit(pts, first, split, t1, tc, err2, out)
+    _fit(pts, split, last, _scale(tc, -1.0), t2, err2, out)
+
+
+def _corners(pts, max_error):
+    """
+    Indices des points où la direction change de plus de CORNER_ANGLE_DEG.
+    Les angles sont mesurés sur la polyligne RDP (tolérance max_error) : entre
+    échantillons voisins, le bruit de la souris donnerait de faux coins.
+    """
+    cos_corner = math.cos(math.radians(CORNER_ANGLE_DEG))
+    idx = rdp_indices(pts, max_error)
+    out = []
+    for k in range(1, len(idx) - 1):
+        a = _normalize(_sub(pts[idx[k]], pts[idx[k - 1]]))
+        b = _normalize(_sub(pts[idx[k + 1]], pts[idx[k]]))
+        if _dot(a, b) < cos_corner:
+            out.append(idx[k])
+    return out
+
+
+def fit_beziers(points, max_error=DEFAULT_MAX_ERROR):
+    """
+    Approche une polyligne (QPointF ou tuples) par des cubiques de Bézier.
+    Retourne une liste de segments (p0, c1, c2, p3) ; c1/c2 None = segment droit.
+    """
+    pts = []
+    for p in points:
+        xy = (p.x(), p.y()) if hasattr(p, "x") else (float(p[0]), float(p[1]))
+        if not pts or xy != pts[-1]:
+            pts.append(xy)
+    if len(pts) < 2:
+        return []
+
+    err2 = max_error * max_error
+    bounds = [0, *_corners(pts, max_error), len(pts) - 1]
+
+    out = []
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        t1 = _normalize(_sub(pts[first + 1], pts[first]))
+        t2 = _normalize(_sub(pts[last - 1], pts[last]))
+        _fit(pts, first, last, t1, t2, err2, out)
+    return out
+
+
+def path_from_beziers(segments) -> QPainterPath:
+    """Segments de fit_beziers -> QPainterPath (MoveTo, puis LineTo / CubicTo)."""
+    path = QPainterPath()
+    if not segments:
+        return path
+    path.moveTo(*segments[0][0])
+    for _p0, c1, c2, p3 in segments:
+        if c1 is None:
+            path.lineTo(*p3)
+        else:
+            path.cubicTo(c1[0], c1[1], c2[0], c2[1], p3[0], p3[1])
+    return path
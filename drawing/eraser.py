@@ -0,0 +1,77 @@
+"""
+eraser.py
+
+Gomme "balayée" (outil ERASER).
+
+Problème de l'approche itemAt() à chaque mouvement : on ne teste qu'un point
+par événement souris. Un glissé rapide saute les traits fins situés entre deux
+échantillons, et chaque item touché donnait sa propre entrée d'historique.
+
+SweptEraser teste, à chaque échantillon, toute la zone balayée depuis le
+précédent : une capsule (segment épaissi de `radius`, bouts ronds).
+- candidats : scene.items(bbox de la capsule), servi par l'index BSP de la
+  scène => coût proportionnel aux items proches, pas à la taille de la scène
+- test exact : forme de l'item (shape()) contre la capsule
+- les items touchés sont retirés de la scène tout de suite (retour visuel) ;
+  la scène les enregistre en une seule commande undo (RemoveItemsCommand)
+  au relâchement
+"""
+
+from PySide6.QtCore import QPointF, Qt
+from PySide6.QtGui import QPainterPath, QPainterPathStroker
+
+from drawing.serialization import item_type_name
+
+# Rayon par défaut de la gomme (px de scène)
+DEFAULT_RADIUS = 6.0
+
+
+def capsule_path(a: QPointF, b: QPointF, radius) -> QPainterPath:
+    """Zone à moins de `radius` du segment [a, b] (disque si a == b)."""
+    if a == b:
+        path = QPainterPath()
+        path.addEllipse(a, radius, radius)
+        return path
+    segment = QPainterPath(a)
+    segment.lineTo(b)
+    stroker = QPainterPathStroker()
+    stroker.setWidth(2 * radius)
+    stroker.setCapStyle(Qt.PenCapStyle.RoundCap)
+    return stroker.createStroke(segment)
+
+
+class SweptEraser:
+    """Un glissé de gomme : du mousePress au mouseRelease."""
+
+    def __init__(self, scene, start: QPointF, radius=DEFAULT_RADIUS):
+        self.scene = scene
+        self.radius = radius
+        self._last = QPointF(start)
+        self.erased = []  # items retirés, dans l'ordre
+        self.item_types = {}  # nom du type -> nombre d'items retirés
+
+    def _hits(self, capsule):
+        candidates = self.scene.items(
+            capsule.boundingRect(), Qt.ItemSelectionMode.IntersectsItemBoundingRect
+        )
+        for item in candidates:
+            # Items désactivés (ghost de suggestion...) : pas gommables
+            if not item.isEnabled():
+                continue
+            if item.collidesWithPath(
+                item.mapFromScene(capsule), Qt.ItemSelectionMode.IntersectsItemShape
+            ):
+                yield item
+
+    def sweep_to(self, p: QPointF):
+        """Gomme la capsule [dernier point, p]. Retourne les items retirés."""
+        capsule = capsule_path(self._last, p, self.radius)
+        self._last = QPointF(p)
+
+        removed = list(self._hits(capsule))
+        for item in removed:
+            self.scene.removeItem(item)
+            self.erased.append(item)
+            name = item_type_name(item)
+            self.item_types[name] = self.item_types.get(name, 0) + 1
+        return removed
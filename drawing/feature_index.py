@@ -0,0 +1,113 @@
+"""
+feature_index.py
+
+Index "caractéristiques" de la scène, tenu à jour à chaque ajout / retrait
+d'item (donc aussi à chaque undo / redo, qui passent par addItem / removeItem).
+
+L'assistant se demande souvent "y a-t-il une ellipse ?", "les oreilles ont-elles
+déjà été ajoutées ?" : au lieu de parcourir scene.items() à chaque question,
+SceneFeatureIndex garde :
+- par type Qt ("QGraphicsEllipseItem"...) : l'ensemble des items de ce type
+- par tag assistant (data(ASSISTANT_TAG_ROLE)) : l'ensemble des items tagués
+=> compteurs et tests de présence en O(1), accès direct aux items d'un type.
+
+Le type et le tag sont lus à l'ajout et mémorisés avec l'item : le retrait
+reste correct même si l'item a changé entre-temps.
+"""
+
+from PySide6.QtCore import Qt
+
+from drawing.serialization import item_type_name
+
+# Rôle Qt du tag assistant (même valeur que assistant.suggestions)
+TAG_ROLE = int(Qt.UserRole)
+
+
+class SceneFeatureIndex:
+    def __init__(self, tag_role=TAG_ROLE):
+        self.tag_role = tag_role
+        self._by_type = {}  # nom du type -> {item: None} (ensemble ordonné)
+        self._by_tag = {}  # tag -> {item: None}
+        self._keys = {}  # item -> (nom du type, tag) lus à l'ajout
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, item):
+        return item in self._keys
+
+    def add(self, item):
+        if item in self._keys:
+            return
+        tname = item_type_name(item)
+        tag = item.data(self.tag_role)
+        self._keys[item] = (tname, tag)
+        self._by_type.setdefault(tname, {})[item] = None
+        if tag is not None:
+            self._by_tag.setdefault(tag, {})[item] = None
+
+    def add_many(self, items):
+        for item in items:
+            self.add(item)
+
+    def remove(self, item):
+        keys = self._keys.pop(item, None)
+        if keys is None:
+            return
+        tname, tag = keys
+        self._discard(self._by_type, tname, item)
+        if tag is not None:
+            self._discard(self._by_tag, tag, item)
+
+    def remove_many(self, items):
+        for item in items:
+            self.remove(item)
+
+    @staticmethod
+    def _discard(table, key, item):
+        group = table.get(key)
+        if group is not None:
+            group.pop(item, None)
+            if not group:
+                del table[key]
+
+    def clear(self):
+        self._by_type.clear()
+        self._by_tag.clear()
+        self._keys.clear()
+
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+    def type_of(self, item):
+        """Nom du type enregistré pour l'item (None s'il n'est pas indexé)."""
+        keys = self._keys.get(item)
+        return keys[0] if keys is not None else None
+
+    def tag_of(self, item):
+        keys = self._keys.get(item)
+        return keys[1] if keys is not None else None
+
+    def count(self, type_name):
+        return len(self._by_type.get(type_name, ()))
+
+    def has_type(self, type_name):
+        return type_name in self._by_type
+
+    def items_of_type(self, type_name):
+        """Items d'un type (liste, ordre d'ajout)."""
+        return list(self._by_type.get(type_name, ()))
+
+    def tag_count(self, tag):
+        return len(self._by_tag.get(tag, ()))
+
+    def has_tag(self, tag):
+        return tag in self._by_tag
+
+    def items_with_tag(self, tag):
+        """Items portant un tag (liste, ordre d'ajout)."""
+        return list(self._by_tag.get(tag, ()))
+
+    def type_counts(self):
+        """{nom du type: nombre d'items}."""
+        return {t: len(group) for t, group in self._by_type.items()}
@@ -0,0 +1,318 @@
+"""
+history.py
+
+Historique undo/redo à budget mémoire.
+
+Problème : les commandes (AddItemCommand, RemoveItemCommand...) gardent les
+QGraphicsItem vivants pour toujours, y compris ceux qui ne sont plus dans la
+scène (gommés, coupés, ajouts annulés), avec leur QPainterPath complet et les
+caches de hit-test des StrokeItem. Une longue session de dessin libre fait donc
+grossir la mémoire sans limite.
+
+UndoHistory (un QUndoStack) :
+- estime les octets des items détenus par l'historique seul (hors scène)
+- au-delà du budget, convertit les plus anciens en SpilledItem : charge utile
+  compacte (serialization.serialize_item, JSON compressé), l'item Qt est libéré
+- un SpilledItem n'est réhydraté (deserialize_item) que si un undo / redo
+  l'atteint ; toutes les commandes qui le référencent retrouvent le même item
+- plafond dur : au-delà de `undo_limit` commandes, Qt supprime les plus
+  anciennes (QUndoStack.setUndoLimit)
+
+Les commandes exposent leurs références via item_refs() / replace_refs() et
+passent par live_item() avant de toucher à un item.
+
+Le signal command_applied(cmd, redo) est émis pour chaque commande exécutée
+(push) ou traversée par un undo / redo, dans l'ordre d'exécution : c'est le
+point d'accroche du journal de récupération (drawing/autosave.py). Une
+commande fusionnée par Qt (mergeWith) est détruite pendant push : on émet
+alors la commande qui l'a absorbée, ou items_changed(refs) si cette dernière
+a disparu (aller-retour complet) ou est dans une macro en cours.
+"""
+
+import json
+import time
+import zlib
+
+import shiboken6
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QUndoStack
+
+from drawing.serialization import deserialize_item, serialize_item
+from drawing.stroke_item import StrokeItem
+
+DEFAULT_BUDGET_BYTES = 32 * 1024 * 1024
+DEFAULT_UNDO_LIMIT = 1000
+
+# Après un dépassement, on redescend à cette fraction du budget : le parcours
+# de l'historique n'a lieu qu'une fois par demi-budget de nouvelles données.
+_SPILL_TARGET = 0.5
+
+# Temps max de sérialisation par action (s) : un gros débordement est étalé
+# sur les actions suivantes au lieu de figer l'interface d'un coup.
+_SPILL_SLICE_S = 0.010
+
+# Estimation mémoire d'un item (mesurée sur PySide6 6.9, ordre de grandeur)
+_ITEM_OVERHEAD = 512  # QGraphicsItem + données privées Qt + wrapper Python
+_ELEMENT_BYTES = 48  # un élément de QPainterPath / un point de polygone
+_STROKE_CACHE_BYTES = 120  # contour + tronçons d'un StrokeItem, par élément
+
+TAG_ROLE = int(Qt.UserRole)
+
+
+def item_bytes(item) -> int:
+    """Estimation (octets) de la mémoire d'un item Qt."""
+    n = 0
+    if hasattr(item, "path"):
+        n = item.path().elementCount()
+    elif hasattr(item, "polygon"):
+        n = item.polygon().count()
+    size = _ITEM_OVERHEAD + n * _ELEMENT_BYTES
+    if isinstance(item, StrokeItem) and (
+        item._shape is not None or item._chunks is not None
+    ):
+        size += n * _STROKE_CACHE_BYTES
+    return size
+
+
+class SpilledItem:
+    """
+    Item hors scène conservé par l'historique sous forme sérialisée.
+    Partagé par toutes les commandes qui référençaient l'item.
+    """
+
+    __slots__ = ("_item", "_payload")
+
+    def __init__(self, item):
+        self._item = item
+        self._payload = None
+
+    def is_live(self):
+        return self._item is not None
+
+    def payload_bytes(self):
+        return len(self._payload) if self._payload is not None else 0
+
+    def spill(self) -> bool:
+        """Sérialise et libère l'item. False si son type n'est pas sérialisable."""
+        if self._item is None:
+            return True
+        data = serialize_item(self._item)
+        if data is None:
+            return False
+        tag = self._item.data(TAG_ROLE)
+        if tag is not None:
+            data["assistant_tag"] = tag
+        raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        self._payload = zlib.compress(raw, 1)
+        self._item = None
+        return True
+
+    def item(self):
+        """L'item Qt, réhydraté à la première demande."""
+        if self._item is None:
+            data = json.loads(zlib.decompress(self._payload))
+            item = deserialize_item(data)
+            if "assistant_tag" in data:
+                item.setData(TAG_ROLE, data["assistant_tag"])
+            self._item = item
+            self._payload = None  # resérialisé au prochain débordement
+        return self._item
+
+
+def live_item(ref):
+    """Item Qt d'une référence de commande (item, ou SpilledItem)."""
+    return ref.item() if isinstance(ref, SpilledItem) else ref
+
+
+class UndoHistory(QUndoStack):
+    command_applied = Signal(object, bool)  # (commande, True = redo / push)
+    items_changed = Signal(list)  # références d'items modifiés hors commande
+
+    def __init__(
+        self,
+        parent=None,
+        budget_bytes=DEFAULT_BUDGET_BYTES,
+        undo_limit=DEFAULT_UNDO_LIMIT,
+    ):
+        super().__init__(parent)
+        # Plafond dur (nombre de commandes) : à fixer tant que la pile est vide
+        if undo_limit:
+            self.setUndoLimit(undo_limit)
+        self._budget = budget_bytes
+
+        # Majorant des octets hors scène détenus depuis le dernier bilan
+        self._estimate = 0
+        self._last_index = 0
+        self._macro_depth = 0
+        self._pushing = False
+        # undo / redo passent aussi par les QAction de createUndoAction (C++)
+        self.indexChanged.connect(self._on_index_changed)
+
+    def budget_bytes(self):
+        return self._budget
+
+    def set_budget_bytes(self, budget):
+        self._budget = budget
+        self._maybe_spill()
+
+    # ------------------------------------------------------------------
+    # QUndoStack
+    # ------------------------------------------------------------------
+    def push(self, cmd):
+        self._estimate += self._command_bytes(cmd)
+        # Si Qt fusionne cmd dans la commande précédente, il la détruit
+        refs = list(self._refs(cmd))
+        count = self.count()
+        self._pushing = True
+        try:
+            super().push(cmd)
+        finally:
+            self._pushing = False
+        self._last_index = self.index()
+        if shiboken6.isValid(cmd):
+            self.command_applied.emit(cmd, True)
+        elif not self._macro_depth and self.count() == count and self.index() > 0:
+            # Fusionnée : la commande du dessus a absorbé cmd
+            self.command_applied.emit(self.command(self.index() - 1), True)
+        else:
+            # Fusion dans une macro en cours, ou aller-retour complet (obsolète)
+            self.items_changed.emit(refs)
+        self._maybe_spill()
+
+    def beginMacro(self, text):
+        self._macro_depth += 1
+        super().beginMacro(text)
+
+    def endMacro(self):
+        self._pushing = True
+        try:
+            super().endMacro()
+        finally:
+            self._pushing = False
+            self._macro_depth -= 1
+        self._last_index = self.index()
+        self._maybe_spill()
+
+    def clear(self):
+        super().clear()
+        self._estimate = 0
+        self._last_index = 0
+
+    def _on_index_changed(self, index):
+        if self._pushing:
+            return
+        # undo / redo : les items des commandes traversées peuvent quitter la scène
+        lo, hi = sorted((self._last_index, index))
+        n = self.count()
+        for i in range(lo, min(hi, n)):
+            self._estimate += self._command_bytes(self.command(i))
+        if index < self._last_index:
+            steps = [(i, False) for i in range(min(hi, n) - 1, lo - 1, -1)]
+        else:
+            steps = [(i, True) for i in range(lo, min(hi, n))]
+        self._last_index = index
+        for i, redo in steps:
+            self.command_applied.emit(self.command(i), redo)
+        self._maybe_spill()
+
+    # ------------------------------------------------------------------
+    # Bilan et débordement
+    # ------------------------------------------------------------------
+    def _walk(self):
+        """Toutes les commandes (macros dépliées), la plus ancienne d'abord."""
+        stack = [self.command(i) for i in range(self.count() - 1, -1, -1)]
+        while stack:
+            cmd = stack.pop()
+            yield cmd
+            stack.extend(cmd.child(j) for j in range(cmd.childCount() - 1, -1, -1))
+
+    @staticmethod
+    def _refs(cmd):
+        refs = getattr(cmd, "item_refs", None)
+        return refs() if refs is not None else ()
+
+    def _command_bytes(self, cmd):
+        total = 0
+        todo = [cmd]
+        while todo:
+            c = todo.pop()
+            for ref in self._refs(c):
+                if not isinstance(ref, SpilledItem) or ref.is_live():
+                    total += item_bytes(live_item(ref))
+            todo.extend(c.child(j) for j in range(c.childCount()))
+        return total
+
+    def _maybe_spill(self):
+        if self._macro_depth or self._estimate <= self._budget:
+            return
+        self.spill_to(int(self._budget * _SPILL_TARGET), _SPILL_SLICE_S)
+
+    def _held(self, commands):
+        """
+        Items vivants hors scène détenus par l'historique, du plus ancien au plus
+        récent : [(item, octets)], et {item: SpilledItem} pour ceux déjà
+        réhydratés.
+        """
+        held, owners, seen = [], {}, set()
+        for cmd in commands:
+            for ref in self._refs(cmd):
+                if isinstance(ref, SpilledItem):
+                    if not ref.is_live():
+                        continue
+                    item = ref.item()
+                    owners[item] = ref
+                else:
+                    item = ref
+                if item in seen:
+                    continue
+                seen.add(item)
+                if item.scene() is None:
+                    held.append((item, item_bytes(item)))
+        return held, owners
+
+    def spill_to(self, target_bytes, time_limit=None):
+        """
+        Sérialise les plus anciens items hors scène jusqu'à ce que l'historique
+        en détienne au plus `target_bytes` (ou que `time_limit` secondes soient
+        écoulées). Retourne le nombre d'items convertis.
+        """
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        commands = [c for c in self._walk() if self._refs(c)]
+        held, owners = self._held(commands)
+        total = sum(b for _it, b in held)
+
+        spilled = {}
+        for item, b in held:
+            if total <= target_bytes:
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            s = owners.get(item) or SpilledItem(item)
+            if s.spill():
+                spilled[item] = s
+                total -= b
+
+        # Les commandes qui tenaient l'item lui-même pointent vers le SpilledItem
+        if spilled:
+            for cmd in commands:
+                if any(r in spilled for r in self._refs(cmd)):
+                    cmd.replace_refs(spilled)
+        self._estimate = total
+        return len(spilled)
+
+    def stats(self):
+        """Bilan mémoire : octets hors scène vivants, items et octets sérialisés."""
+        commands = [c for c in self._walk() if self._refs(c)]
+        held, _owners = self._held(commands)
+        spilled = {
+            r
+            for c in commands
+            for r in self._refs(c)
+            if isinstance(r, SpilledItem) and not r.is_live()
+        }
+        return {
+            "commands": self.count(),
+            "live_bytes": sum(b for _it, b in held),
+            "spilled_items": len(spilled),
+            "spilled_bytes": sum(s.payload_bytes() for s in spilled),
+        }
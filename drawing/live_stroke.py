@@ -0,0 +1,117 @@
+"""
+live_stroke.py
+
+Item "trait en cours" pour l'outil stylo (PEN).
+
+Problème de l'approche QPainterPath + setPath() à chaque mouvement :
+setPath() copie tout le chemin et Qt recalcule bounding rect / shape du trait
+entier => O(n) par point, O(n²) sur un long trait.
+
+LiveStrokeItem :
+- stocke les points dans un QPolygonF pré-alloué (append en O(1) amorti)
+- agrandit son bounding rect par paliers (marge proportionnelle à la taille) :
+  prepareGeometryChange() n'est appelé que O(log n) fois par trait
+- n'invalide que la zone du nouveau segment (update(rect))
+- paint() ne trace que les tronçons (blocs de CHUNK points, bbox tenue à jour
+  à l'ajout) qui touchent la zone exposée : tracer tout le trait à chaque
+  repaint coûterait encore O(n) par point
+- au relâchement, to_path() fournit le QPainterPath du trait final, converti
+  en QGraphicsPathItem classique par la scène (sélection, sérialisation...)
+"""
+
+from PySide6.QtCore import QPointF, QRectF
+from PySide6.QtGui import QPainterPath, QPen, QPolygonF
+from PySide6.QtWidgets import QGraphicsItem
+
+# Capacité initiale du buffer de points (un trait typique tient dedans)
+DEFAULT_CAPACITY = 1024
+
+# Marge minimale (px) ajoutée quand le bounding rect doit grandir
+_GROW_MIN = 64.0
+
+# Nombre de segments par tronçon (unité de tracé dans paint)
+CHUNK = 64
+
+
+class LiveStrokeItem(QGraphicsItem):
+    def __init__(self, start: QPointF, pen: QPen, capacity=DEFAULT_CAPACITY):
+        super().__init__()
+        self._pen = QPen(pen)
+
+        # option.exposedRect dans paint() (zone réellement à redessiner)
+        self.setFlag(
+            QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption, True
+        )
+
+        self._points = QPolygonF()
+        self._points.reserve(capacity)
+        self._points.append(QPointF(start))
+        self._last = QPointF(start)
+
+        # Demi-épaisseur du trait (+1 px pour l'antialiasing / les jointures)
+        self._margin = self._pen.widthF() / 2 + 1.0
+        m = self._margin + _GROW_MIN
+        self._bounds = QRectF(start.x() - m, start.y() - m, 2 * m, 2 * m)
+
+        # Bbox (avec épaisseur du trait) de chaque tronçon de CHUNK segments
+        self._chunk_rects = []
+
+    # ------------------------------------------------------------------
+    # QGraphicsItem
+    # ------------------------------------------------------------------
+    def boundingRect(self) -> QRectF:
+        return self._bounds
+
+    def paint(self, painter, option, widget=None):
+        exposed = option.exposedRect
+        painter.setPen(self._pen)
+        for i, rect in enumerate(self._chunk_rects):
+            if rect.intersects(exposed):
+                # CHUNK segments = CHUNK + 1 points (le dernier est partagé)
+                painter.drawPolyline(self._points.mid(i * CHUNK, CHUNK + 1))
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def add_point(self, p: QPointF):
+        """Ajoute un point : O(1), invalide uniquement le nouveau segment."""
+        m = self._margin
+        seg = QRectF(self._last, p).normalized().adjusted(-m, -m, m, m)
+        self._points.append(QPointF(p))
+        self._last = QPointF(p)
+
+        # Segment n° (nb de points - 2) => tronçon correspondant
+        chunk = (self._points.size() - 2) // CHUNK
+        if chunk == len(self._chunk_rects):
+            self._chunk_rects.append(seg)
+        else:
+            self._chunk_rects[chunk] = self._chunk_rects[chunk].united(seg)
+
+        if self._bounds.contains(seg):
+            self.update(seg)
+            return
+
+        # Sortie du rect courant : on l'agrandit avec de la marge pour que les
+        # prochains points tombent dedans (changement de géométrie rare)
+        grow = max(_GROW_MIN, max(self._bounds.width(), self._bounds.height()) / 2)
+        self.prepareGeometryChange()
+        self._bounds = self._bounds.united(seg.adjusted(-grow, -grow, grow, grow))
+
+    def point_count(self) -> int:
+        return self._points.size()
+
+    def pen(self) -> QPen:
+        return QPen(self._pen)
+
+    def points(self):
+        """Copie des points du trait (liste de QPointF)."""
+        return list(self._points)
+
+    def to_path(self, points=None) -> QPainterPath:
+        """
+        Chemin du trait (MoveTo + LineTo), construit une seule fois au relâchement.
+        `points` : points à utiliser à la place du buffer (ex : trait simplifié).
+        """
+        path = QPainterPath()
+        path.addPolygon(self._points if points is None else QPolygonF(points))
+        return path
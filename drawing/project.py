@@ -0,0 +1,652 @@
+"""
+drawing/project.py
+
+Fichier projet (.skproj) : sauvegarde et réouverture d'un dessin complet.
+
+Objectifs :
+- ouvrir un projet de 100k items en bien moins d'une seconde : à l'ouverture,
+  on ne lit que l'en-tête, la table de chaînes et la table des matières ; les
+  items ne sont créés que lorsqu'ils entrent dans la zone visible
+- format compact : couleurs internées, géométrie en float32
+
+Structure (little-endian, sections alignées sur 8 octets) :
+- en-tête : MAGIC + _HEADER (nombres d'items / chaînes / tronçons / flottants,
+  offsets des sections, bornes du contenu, sceneRect, drapeaux)
+- chaînes : couleurs ("#rrggbb", "none") et tags assistant ; u16 longueur +
+  utf-8 ; l'id 0 est réservé à la chaîne vide
+- table des matières spatiale : un tronçon (_CHUNK) par case d'une grille sur
+  le contenu ; bbox de scène de ses items, premier enregistrement, nombre.
+  Les enregistrements d'un tronçon sont contigus
+- enregistrements (_RECORD, taille fixe) : type, style (ids de chaînes), z,
+  position, plage de géométrie, rang d'empilement, bbox de scène
+- géométrie : float32 contigus. Ligne / rectangle / ellipse : 4 valeurs ;
+  polygone : x, y par point ; chemin : x, y, type par élément (mêmes éléments
+  que serialize_item : MoveTo, LineTo, CurveTo, CurveToData)
+
+Ouverture (ProjectLoader) : le fichier est projeté en mémoire (mmap).
+DrawingScene.ensure_loaded(rect), appelée par CanvasView à chaque défilement /
+zoom, crée les items des tronçons qui touchent la zone. Petits projets
+(moins de LAZY_MIN_ITEMS items) : tout est chargé à l'ouverture.
+
+Ordre d'empilement : z d'origine, puis rang d'origine à l'intérieur d'un lot
+chargé ; à z égal, un lot chargé plus tard passe au-dessus des précédents.
+
+Usage (depuis la racine du projet) :
+    python -m drawing.project info dessin.skproj
+"""
+
+import argparse
+import math
+import mmap
+import os
+import struct
+import sys
+import weakref
+from array import array
+
+from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtGui import QPainterPath, QPolygonF
+from PySide6.QtWidgets import (
+    QGraphicsEllipseItem,
+    QGraphicsLineItem,
+    QGraphicsPolygonItem,
+    QGraphicsRectItem,
+)
+
+from drawing.serialization import (
+    apply_fill_from,
+    enable_interaction_flags,
+    make_pen_from,
+    serialize_item,
+)
+from drawing.stroke_item import StrokeItem
+
+PROJECT_SUFFIX = ".skproj"
+
+MAGIC = b"SKPROJ\x01\x00"  # 8 octets, version 1
+
+# Nombre d'items visé par tronçon de la table des matières
+CHUNK_ITEMS = 256
+
+# En dessous, tout est chargé à l'ouverture (ordre d'empilement exact)
+LAZY_MIN_ITEMS = 2000
+
+_HEADER = struct.Struct("<IIIIQQQQ4f4fI")
+_STRING_LEN = struct.Struct("<H")
+_CHUNK = struct.Struct("<4fII")
+_RECORD = struct.Struct("<BBHIIIfffIII4f")
+
+_FLAG_INFINITE = 1
+
+# Types d'items
+_LINE, _RECT, _ELLIPSE, _PATH, _POLYGON = 1, 2, 3, 4, 5
+_TYPE_CODES = {
+    "QGraphicsLineItem": _LINE,
+    "QGraphicsRectItem": _RECT,
+    "QGraphicsEllipseItem": _ELLIPSE,
+    "QGraphicsPathItem": _PATH,
+    "QGraphicsPolygonItem": _POLYGON,
+}
+
+# Éléments de chemin (3e valeur de chaque triplet)
+_ELEMENT_CODES = {"MoveTo": 0, "LineTo": 1, "CurveTo": 2, "CurveToData": 3}
+
+TAG_ROLE = int(Qt.UserRole)
+
+
+class ProjectError(ValueError):
+    """Fichier projet illisible (mauvais en-tête, sections incohérentes)."""
+
+
+def _pad8(n):
+    return (-n) % 8
+
+
+# ----------------------------------------------------------------------
+# Écriture
+# ----------------------------------------------------------------------
+class _Row:
+    """Un item à écrire : venu de la scène (item) ou d'un enregistrement non
+    encore chargé (item None, géométrie recopiée telle quelle)."""
+
+    __slots__ = (
+        "kind",
+        "stroke",
+        "width",
+        "fill",
+        "tag",
+        "z",
+        "x",
+        "y",
+        "geometry",
+        "bbox",
+        "key",
+        "item",
+    )
+
+    def __init__(self, kind, stroke, width, fill, tag, z, x, y, geometry, bbox):
+        self.kind = kind
+        self.stroke = stroke
+        self.width = width
+        self.fill = fill
+        self.tag = tag
+        self.z = z
+        self.x, self.y = x, y
+        self.geometry = geometry  # bytes (float32 little-endian)
+        self.bbox = bbox  # (x0, y0, x1, y1) en coordonnées de scène
+        self.key = None  # clé de tri (ordre d'empilement)
+        self.item = None
+
+
+def _floats(values):
+    a = array("f", values)
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a.tobytes()
+
+
+def _row_from_item(item):
+    data = serialize_item(item)
+    if data is None:
+        return None
+    kind = _TYPE_CODES[data["type"]]
+    if kind == _LINE:
+        geom = data["line"]
+    elif kind == _RECT:
+        geom = data["rect"]
+    elif kind == _ELLIPSE:
+        geom = data["ellipse"]
+    elif kind == _POLYGON:
+        geom = [v for pt in data["polygon"] for v in pt]
+    else:
+        geom = [
+            v
+            for x, y, name in data["path_elems"]
+            for v in (x, y, _ELEMENT_CODES[name])
+        ]
+    b = item.sceneBoundingRect()
+    row = _Row(
+        kind,
+        data["stroke"],
+        data["stroke_width"],
+        data["fill"],
+        item.data(TAG_ROLE),
+        data["z"],
+        *data["pos"],
+        _floats(geom),
+        (b.left(), b.top(), b.right(), b.bottom()),
+    )
+    row.item = item
+    return row
+
+
+def _build_chunks(rows):
+    """
+    Regroupe les lignes par case d'une grille (≈ CHUNK_ITEMS items par case pour
+    un contenu uniforme) ; une case trop pleine est coupée en plusieurs tronçons.
+    Retourne [[lignes du tronçon], ...] (ordre d'empilement dans chaque tronçon).
+    """
+    if not rows:
+        return []
+    x0 = min(r.bbox[0] for r in rows)
+    y0 = min(r.bbox[1] for r in rows)
+    x1 = max(r.bbox[2] for r in rows)
+    y1 = max(r.bbox[3] for r in rows)
+    area = max((x1 - x0) * (y1 - y0), 1.0)
+    cell = max(64.0, math.sqrt(area * CHUNK_ITEMS / len(rows)))
+
+    cells = {}
+    for r in rows:  # rows triées par ordre d'empilement
+        cx = (r.bbox[0] + r.bbox[2]) / 2
+        cy = (r.bbox[1] + r.bbox[3]) / 2
+        key = (int((cy - y0) // cell), int((cx - x0) // cell))
+        cells.setdefault(key, []).append(r)
+
+    chunks = []
+    for key in sorted(cells):
+        group = cells[key]
+        for start in range(0, len(group), CHUNK_ITEMS):
+            chunks.append(group[start : start + CHUNK_ITEMS])
+    return chunks
+
+
+def write_project(path, rows, scene_rect, infinite):
+    """
+    Écrit `rows` (ordre d'empilement, bas -> haut) dans un fichier temporaire
+    à côté de `path`. Retourne (chemin temporaire, lignes dans l'ordre des
+    enregistrements du fichier) ; à l'appelant de le renommer en `path`.
+    """
+    strings = {"": 0}
+
+    def sid(s):
+        if s is None:
+            return 0
+        s = str(s)
+        if s not in strings:
+            strings[s] = len(strings)
+        return strings[s]
+
+    for rank, r in enumerate(rows):
+        r.key = rank
+    chunks = _build_chunks(rows)
+    ordered = [r for chunk in chunks for r in chunk]
+
+    # Chaînes, enregistrements et géométrie
+    records = bytearray()
+    geometry = bytearray()
+    for r in ordered:
+        n_floats = len(r.geometry) // 4
+        records += _RECORD.pack(
+            r.kind,
+            0,
+            r.width,
+            sid(r.stroke),
+            sid(r.fill),
+            sid(r.tag),
+            r.z,
+            r.x,
+            r.y,
+            len(geometry) // 4,
+            n_floats,
+            r.key,
+            *r.bbox,
+        )
+        geometry += r.geometry
+
+    string_blob = bytearray()
+    for s in strings:  # ordre d'insertion = ordre des ids
+        raw = s.encode("utf-8")
+        string_blob += _STRING_LEN.pack(len(raw)) + raw
+
+    toc = bytearray()
+    first = 0
+    for chunk in chunks:
+        toc += _CHUNK.pack(
+            min(r.bbox[0] for r in chunk),
+            min(r.bbox[1] for r in chunk),
+            max(r.bbox[2] for r in chunk),
+            max(r.bbox[3] for r in chunk),
+            first,
+            len(chunk),
+        )
+        first += len(chunk)
+
+    if rows:
+        bounds = (
+            min(r.bbox[0] for r in rows),
+            min(r.bbox[1] for r in rows),
+            max(r.bbox[2] for r in rows),
+            max(r.bbox[3] for r in rows),
+        )
+    else:
+        bounds = (0.0, 0.0, 0.0, 0.0)
+
+    # Offsets des sections (alignées sur 8 octets)
+    offset = len(MAGIC) + _HEADER.size
+    offset += _pad8(offset)
+    sections = []
+    for blob in (string_blob, toc, records, geometry):
+        sections.append(offset)
+        offset += len(blob) + _pad8(len(blob))
+
+    header = _HEADER.pack(
+        len(ordered),
+        len(strings),
+        len(chunks),
+        len(geometry) // 4,
+        *sections,
+        *bounds,
+        scene_rect.x(),
+        scene_rect.y(),
+        scene_rect.width(),
+        scene_rect.height(),
+        _FLAG_INFINITE if infinite else 0,
+    )
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + header)
+        f.write(b"\0" * _pad8(len(MAGIC) + _HEADER.size))
+        for blob in (string_blob, toc, records, geometry):
+            f.write(blob)
+            f.write(b"\0" * _pad8(len(blob)))
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp, ordered
+
+
+def save_project(scene, path):
+    """
+    Enregistre le dessin de `scene` (items de la scène + items du projet ouvert
+    pas encore chargés). Le projet reste ouvert sur le nouveau fichier.
+    Retourne le nombre d'items écrits.
+    """
+    loader = getattr(scene, "project", None)
+    ranks = loader.ranks if loader is not None else {}
+    seq_base = len(ranks) + (loader.item_count if loader is not None else 0)
+
+    rows = []
+    for seq, item in enumerate(scene.items(Qt.SortOrder.AscendingOrder)):
+        if item.parentItem() is not None:
+            continue
+        row = _row_from_item(item)
+        if row is None:
+            continue
+        # Items du fichier : rang d'origine ; nouveaux items : au-dessus
+        rank = ranks.get(item)
+        row.key = (row.z, rank if rank is not None else seq_base + seq)
+        rows.append(row)
+    if loader is not None:
+        rows.extend(loader.pending_rows())
+    rows.sort(key=lambda r: r.key)
+
+    rect = scene.sceneRect()
+    infinite = scene.is_infinite() if hasattr(scene, "is_infinite") else False
+    tmp, ordered = write_project(path, rows, rect, infinite)
+
+    # Le fichier source est peut-être projeté en mémoire : on le libère avant
+    # de le remplacer, puis on rouvre le projet sur le nouveau fichier
+    if loader is not None:
+        loader.close()
+    os.replace(tmp, path)
+    scene.project = ProjectLoader(path, scene, loaded=[r.item for r in ordered])
+    return len(ordered)
+
+
+# ----------------------------------------------------------------------
+# Lecture
+# ----------------------------------------------------------------------
+class ProjectLoader:
+    """
+    Projet ouvert (mmap). Crée les items à la demande :
+    - load_rect(rect) : items des tronçons qui touchent `rect`
+    - load_all() : tout le reste
+    Une fois tout chargé, le fichier est refermé.
+    """
+
+    def __init__(self, path, scene, loaded=None):
+        self.path = path
+        self.scene = scene
+        # item créé -> rang d'empilement dans le fichier (sans retenir les items
+        # gommés : l'historique doit pouvoir les libérer)
+        self.ranks = weakref.WeakKeyDictionary()
+
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # fichier vide
+            self._file.close()
+            raise ProjectError(f"{path} : fichier vide")
+        try:
+            self._parse()
+        except (ProjectError, struct.error):
+            self.close()
+            raise
+
+        # Enregistrements déjà présents dans la scène (après une sauvegarde)
+        self._loaded = bytearray(self.item_count)
+        self._pending = self.item_count
+        if loaded is not None:
+            for i, item in enumerate(loaded):
+                if item is not None:
+                    self._loaded[i] = 1
+                    self._pending -= 1
+                    self.ranks[item] = self._rank(i)
+        self._chunk_done = [
+            all(self._loaded[first : first + count])
+            for _rect, first, count in self.chunks
+        ]
+        if not self._pending:
+            self.close()
+
+    # ------------------------------------------------------------------
+    # Ouverture
+    # ------------------------------------------------------------------
+    def _parse(self):
+        mm = self._mm
+        if mm[: len(MAGIC)] != MAGIC:
+            raise ProjectError(f"{self.path} : en-tête de projet invalide")
+        (
+            self.item_count,
+            n_strings,
+            n_chunks,
+            n_floats,
+            strings_off,
+            chunks_off,
+            self._records_off,
+            geom_off,
+            bx0,
+            by0,
+            bx1,
+            by1,
+            sx,
+            sy,
+            sw,
+            sh,
+            flags,
+        ) = _HEADER.unpack_from(mm, len(MAGIC))
+        if geom_off + 4 * n_floats > len(mm):
+            raise ProjectError(f"{self.path} : fichier tronqué")
+
+        self.bounds = QRectF(bx0, by0, bx1 - bx0, by1 - by0)
+        self.scene_rect = QRectF(sx, sy, sw, sh)
+        self.infinite = bool(flags & _FLAG_INFINITE)
+
+        self.strings = []
+        pos = strings_off
+        for _ in range(n_strings):
+            (n,) = _STRING_LEN.unpack_from(mm, pos)
+            pos += _STRING_LEN.size
+            self.strings.append(mm[pos : pos + n].decode("utf-8"))
+            pos += n
+
+        self.chunks = []
+        for i in range(n_chunks):
+            x0, y0, x1, y1, first, count = _CHUNK.unpack_from(
+                mm, chunks_off + i * _CHUNK.size
+            )
+            self.chunks.append((QRectF(x0, y0, x1 - x0, y1 - y0), first, count))
+
+        # Géométrie : vue float32 directe sur le fichier projeté
+        self._view = memoryview(mm)[geom_off : geom_off + 4 * n_floats]
+        if sys.byteorder == "little":
+            self._geom = self._view.cast("f")
+        else:
+            self._geom = array("f", self._view)
+            self._geom.byteswap()
+
+    def close(self):
+        """Libère le fichier (les items déjà créés restent dans la scène)."""
+        if self._mm is None:
+            return
+        if isinstance(self._geom, memoryview):
+            self._geom.release()
+        self._view.release()
+        self._mm.close()
+        self._file.close()
+        self._mm = None
+
+    @property
+    def done(self):
+        return self._pending == 0
+
+    def pending_count(self):
+        return self._pending
+
+    # ------------------------------------------------------------------
+    # Matérialisation
+    # ------------------------------------------------------------------
+    def _rank(self, index):
+        offset = self._records_off + index * _RECORD.size
+        return _RECORD.unpack_from(self._mm, offset)[11]
+
+    def load_rect(self, rect: QRectF):
+        """Crée les items des tronçons non chargés qui touchent `rect`."""
+        if self._mm is None:
+            return 0
+        todo = [
+            i
+            for i, (crect, _first, _count) in enumerate(self.chunks)
+            if not self._chunk_done[i] and crect.intersects(rect)
+        ]
+        return self._load_chunks(todo)
+
+    def load_all(self):
+        if self._mm is None:
+            return 0
+        return self._load_chunks(
+            [i for i, done in enumerate(self._chunk_done) if not done]
+        )
+
+    def _load_chunks(self, chunk_indices):
+        if not chunk_indices:
+            return 0
+        unpack = _RECORD.unpack_from
+        base, size = self._records_off, _RECORD.size
+        records = []
+        for ci in chunk_indices:
+            self._chunk_done[ci] = True
+            _rect, first, count = self.chunks[ci]
+            for i in range(first, first + count):
+                if not self._loaded[i]:
+                    self._loaded[i] = 1
+                    records.append(unpack(self._mm, base + i * size))
+        # Ordre d'empilement d'origine à l'intérieur du lot
+        records.sort(key=lambda rec: rec[11])
+
+        pens = {}
+        items = []
+        for rec in records:
+            item = self._make_item(rec, pens)
+            if item is not None:
+                self.ranks[item] = rec[11]
+                items.append(item)
+        self.scene.insert_items(items)
+
+        self._pending -= len(records)
+        if not self._pending:
+            self.close()
+        return len(items)
+
+    def _make_item(self, rec, pens):
+        kind, _flags, width, stroke, fill, tag, z, x, y, goff, glen, _rank = rec[:12]
+        g = self._geom[goff : goff + glen]
+
+        pen = pens.get((stroke, width))
+        if pen is None:
+            pen = pens[(stroke, width)] = make_pen_from(self.strings[stroke], width)
+
+        if kind == _LINE:
+            item = QGraphicsLineItem(g[0], g[1], g[2], g[3])
+        elif kind == _RECT:
+            item = QGraphicsRectItem(g[0], g[1], g[2], g[3])
+        elif kind == _ELLIPSE:
+            item = QGraphicsEllipseItem(g[0], g[1], g[2], g[3])
+        elif kind == _POLYGON:
+            item = QGraphicsPolygonItem(
+                QPolygonF([QPointF(g[i], g[i + 1]) for i in range(0, glen - 1, 2)])
+            )
+        elif kind == _PATH:
+            item = StrokeItem(_path_from_floats(g))
+        else:
+            return None
+
+        item.setPen(pen)
+        if kind in (_RECT, _ELLIPSE, _POLYGON):
+            apply_fill_from(item, self.strings[fill] or "none")
+        if tag:
+            item.setData(TAG_ROLE, self.strings[tag])
+        item.setZValue(z)
+        enable_interaction_flags(item)
+        item.setPos(x, y)
+        return item
+
+    def pending_rows(self):
+        """Enregistrements pas encore chargés, pour une nouvelle sauvegarde."""
+        if self._mm is None:
+            return []
+        rows = []
+        unpack = _RECORD.unpack_from
+        base, size = self._records_off, _RECORD.size
+        for i in range(self.item_count):
+            if self._loaded[i]:
+                continue
+            kind, _f, width, stroke, fill, tag, z, x, y, goff, glen, rank, *bbox = (
+                unpack(self._mm, base + i * size)
+            )
+            start = goff * 4
+            row = _Row(
+                kind,
+                self.strings[stroke],
+                width,
+                self.strings[fill] or "none",
+                self.strings[tag] if tag else None,
+                z,
+                x,
+                y,
+                bytes(self._view[start : start + glen * 4]),
+                tuple(bbox),
+            )
+            row.key = (z, rank)
+            rows.append(row)
+        return rows
+
+
+def _path_from_floats(g):
+    """QPainterPath depuis des triplets (x, y, type) ; cf. path_from_elements."""
+    path = QPainterPath()
+    n = len(g) // 3
+    i = 0
+    while i < n:
+        x, y, code = g[3 * i], g[3 * i + 1], g[3 * i + 2]
+        if i == 0 or code == 0:
+            path.moveTo(x, y)
+        elif code == 2 and i + 2 < n:
+            j = 3 * (i + 1)
+            path.cubicTo(x, y, g[j], g[j + 1], g[j + 3], g[j + 4])
+            i += 3
+            continue
+        else:
+            path.lineTo(x, y)
+        i += 1
+    return path
+
+
+def open_project(scene, path):
+    """
+    Remplace le contenu de `scene` par le projet `path`. Les items sont créés
+    au fil de l'affichage (scene.ensure_loaded), ou tous de suite pour un petit
+    projet. Retourne le ProjectLoader (aussi rangé dans scene.project).
+    """
+    loader = ProjectLoader(path, scene)
+    scene.undo_stack.clear()
+    scene.clear()
+    scene.project = loader
+    if loader.item_count and hasattr(scene, "include_rect"):
+        scene.include_rect(loader.bounds)
+    if loader.item_count < LAZY_MIN_ITEMS:
+        loader.load_all()
+    return loader
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fichier projet (.skproj)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_info = sub.add_parser("info", help="en-tête et table des matières")
+    p_info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    loader = ProjectLoader(args.path, scene=None)
+    b = loader.bounds
+    print(f"{args.path} : {loader.item_count} items, {len(loader.strings)} chaînes")
+    print(
+        f"  contenu ({b.x():.0f}, {b.y():.0f}) {b.width():.0f} x {b.height():.0f}"
+        f" | {len(loader.chunks)} tronçons"
+        f" | canvas {'infini' if loader.infinite else 'fixe'}"
+    )
+    loader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,7 +20,6 @@ import json  # Sérialisation/désérialisation des items pour copy/paste via le
 # Widgets/Items Qt utilisés par la scène
 from PySide6.QtWidgets import (
     QGraphicsScene,  # Scène “modèle” : contient les items
-    QGraphicsPathItem,  # Item pour le dessin libre (stylo) via QPainterPath
     QGraphicsLineItem,  # Item pour un segment
     QGraphicsRectItem,  # Item pour un rectangle
     QGraphicsEllipseItem,  # Item pour une ellipse
@@ -30,7 +29,6 @@ from PySide6.QtWidgets import (
 
 # Outils graphiques + pile undo/redo
 from PySide6.QtGui import (
-    QPainterPath,  # Représentation vectorielle d’un trait libre
     QPen,  # Style de contour (couleur, épaisseur, etc.)
     QColor,  # Couleurs (hex, RGB...)
     QBrush,  # Style de remplissage (fill) des formes
@@ -50,38 +48,139 @@ from PySide6.QtCore import (
 # Enum métier des outils (SELECT, PEN, ERASER, LINE, RECT, ELLIPSE, ...)
 from drawing.tools import Tool
 
+# Historique undo/redo à budget mémoire (items anciens sérialisés)
+from drawing.history import DEFAULT_BUDGET_BYTES, DEFAULT_UNDO_LIMIT, UndoHistory
+
 # Commandes “undoables” : ajout, suppression, déplacement
-from drawing.commands import AddItemCommand, RemoveItemCommand, MoveItemsCommand
+from drawing.commands import (
+    AddItemCommand,
+    AddItemsCommand,
+    RemoveItemsCommand,
+    MoveItemsCommand,
+)
+
+# Trait en cours (stylo) : ajout de points en O(1)
+from drawing.live_stroke import LiveStrokeItem
+
+# Trait finalisé (QGraphicsPathItem au hit-test mis en cache)
+from drawing.stroke_item import StrokeItem
+
+# Simplification des traits (décimation pendant le tracé + RDP au relâchement)
+from drawing.simplify import DEFAULT_TOLERANCE, KEEP, StrokeDecimator, rdp
+
+# Lissage des traits en courbes de Bézier cubiques (au relâchement)
+from drawing.curve_fit import DEFAULT_MAX_ERROR, fit_beziers, path_from_beziers
+
+# Index par type / tag des items (requêtes de l'assistant)
+from drawing.feature_index import SceneFeatureIndex
+
+# Gomme balayée (capsule entre deux échantillons souris)
+from drawing.eraser import (
+    DEFAULT_RADIUS as DEFAULT_ERASER_RADIUS,
+    SweptEraser,
+    capsule_path,
+)
+
+# Zone de dessin initiale (coordonnées de scène)
+BASE_SCENE_RECT = QRectF(0, 0, 1280, 720)
+
+# Canvas infini : marge minimale (px) ajoutée quand le sceneRect doit grandir
+# (sinon la moitié de sa taille : croissance géométrique, reconstructions de
+# l'index BSP en O(log))
+_GROW_MIN = 1024.0
+
+# Profondeur de l'arbre BSP : ~ITEMS_PER_LEAF items par feuille, bornée.
+# (Profondeur auto de Qt = ~1 item par feuille : plus de mémoire et des
+# reconstructions plus longues, pour des requêtes à peine plus rapides.)
+ITEMS_PER_LEAF = 8
+_BSP_MIN_DEPTH = 5
+_BSP_MAX_DEPTH = 18
+
+# k plus proches voisins : demi-côté du premier carré de recherche (px),
+# doublé tant qu'il ne contient pas assez d'items
+_KNN_START_RADIUS = 32.0
+
+# Déplacement au clavier (flèches) : pas en px de scène, Maj = grand pas
+NUDGE_STEP = 1.0
+NUDGE_STEP_LARGE = 10.0
+_NUDGE_KEYS = {
+    Qt.Key.Key_Left: (-1, 0),
+    Qt.Key.Key_Right: (1, 0),
+    Qt.Key.Key_Up: (0, -1),
+    Qt.Key.Key_Down: (0, 1),
+}
 
 # Utilitaires pour la sérialisation
 from drawing.serialization import (
     serialize_item as _serialize_item_shared,
     deserialize_item as _deserialize_item_shared,
     apply_fill_from as _apply_fill_from_shared,
+    item_type_name,
 )
 
 
+
+def _covers(outer: QRectF, inner: QRectF) -> bool:
+    """outer contient inner (bords inclus, y compris un rect vide)."""
+    return outer.contains(inner.topLeft()) and outer.contains(inner.bottomRight())
+
+
 class DrawingScene(QGraphicsScene):
     item_created = Signal(object)  # émettra le QGraphicsItem créé
-
-    def __init__(self, logger=None):
+    # Contenu remplacé d'un bloc (clear, projet ouvert / enregistré)
+    content_replaced = Signal()
+
+    def __init__(
+        self,
+        logger=None,
+        stroke_tolerance=DEFAULT_TOLERANCE,
+        curve_error=DEFAULT_MAX_ERROR,
+        eraser_radius=DEFAULT_ERASER_RADIUS,
+        infinite=False,
+        history_budget=DEFAULT_BUDGET_BYTES,
+        undo_limit=DEFAULT_UNDO_LIMIT,
+    ):
         """
         Parameters
         ----------
         logger : EventLogger | None
             Logger utilisé pour enregistrer les interactions utilisateur.
             (Peut être None si on veut désactiver la journalisation.)
+        stroke_tolerance : float | None
+            Tolérance (px) de simplification des traits au stylo
+            (voir drawing/simplify.py). 0 / None => points bruts conservés.
+        curve_error : float | None
+            Erreur max (px) du lissage des traits en cubiques de Bézier
+            (voir drawing/curve_fit.py). 0 / None => polyligne (LineTo).
+        eraser_radius : float
+            Rayon (px) de la gomme (voir drawing/eraser.py).
+        infinite : bool
+            Canvas infini : le sceneRect part de BASE_SCENE_RECT et grandit avec
+            le contenu (et la navigation de la vue), au lieu de rester fixe.
+        history_budget : int
+            Octets d'items hors scène (gommés, coupés...) gardés vivants par
+            l'historique ; au-delà, les plus anciens sont sérialisés
+            (voir drawing/history.py).
+        undo_limit : int
+            Nombre max de commandes annulables (les plus anciennes sont oubliées).
         """
         super().__init__()
 
-        # Dimensions “fixes” de la zone de dessin (coordonnées de scène)
-        width = 1280
-        height = 720
-        self.setSceneRect(QRectF(0, 0, width, height))
+        # Zone de dessin (coordonnées de scène) : fixe, ou point de départ du
+        # canvas infini
+        self._infinite = infinite
+        self.setSceneRect(BASE_SCENE_RECT)
+
+        # Profondeur BSP choisie pour ~_bsp_count items (ajustée quand le nombre
+        # d'items double ou est divisé par deux : pas de reconstruction en boucle)
+        self._bsp_count = 0
+        self.setBspTreeDepth(_BSP_MIN_DEPTH)
 
         # Pile des commandes (Annuler/Rétablir).
         # On “push” des QUndoCommand dès qu’une action modifie réellement la scène.
-        self.undo_stack = QUndoStack(self)
+        self.undo_stack = UndoHistory(
+            self, budget_bytes=history_budget, undo_limit=undo_limit
+        )
 
         # Sauvegarde des positions des items sélectionnés au moment du mousePress (SELECT),
         # pour pouvoir construire une commande MoveItemsCommand au mouseRelease.
@@ -99,15 +198,23 @@ class DrawingScene(QGraphicsScene):
 
         # ---- État interne pour Tool.PEN (dessin libre) ----
 
-        # Path en cours de construction (QPainterPath)
-        self._current_path = None
-
-        # Item graphique associé au path en cours (QGraphicsPathItem)
+        # Trait en cours (LiveStrokeItem), converti en QGraphicsPathItem au release
         self._current_item = None
 
+        # Simplification des traits (décimateur du trait en cours)
+        self._stroke_tolerance = stroke_tolerance
+        self._decimator = None
+        self._curve_error = curve_error
+
         # Nombre de points ajoutés dans le path (utile pour logs)
         self._points_count = 0
 
+        # ---- État interne pour Tool.ERASER ----
+
+        # Glissé de gomme en cours (SweptEraser) : items retirés depuis le press
+        self._eraser = None
+        self._eraser_radius = eraser_radius
+
         # ---- État interne pour Tool.SELECT ----
 
         # Item sous la souris au mousePress (peut être None)
@@ -124,6 +231,27 @@ class DrawingScene(QGraphicsScene):
         # Item graphique temporaire (preview) de la forme en création
         self._shape_item = None  # QGraphicsLineItem / RectItem / EllipseItem
 
+        # ---- Ordre d'empilement de la sélection ----
+
+        # Rang d'ajout des items : à zValue égale, Qt empile le dernier ajouté
+        # au-dessus => clé de tri (zValue, rang), identique à items(AscendingOrder)
+        self._insert_seq = {}
+        self._next_seq = 0
+
+        # Sélection triée bas -> haut, avec la zValue de chaque item au moment du
+        # tri (None = à recalculer : sélection modifiée, item ajouté / retiré)
+        self._selection_order = None
+        self.selectionChanged.connect(self._invalidate_selection_order)
+
+        # ---- Projet ouvert (drawing/project.py) : items créés à l'affichage ----
+        self._project = None
+
+        # ---- Index par type / tag (tenu à jour par addItem / removeItem) ----
+        self.features = SceneFeatureIndex()
+
+        # Dernier item créé par l'utilisateur, par type (cibles de l'assistant)
+        self._last_created = {}
+
     # ----------------------------
     # Utils (clipboard, styles, helpers)
     # ----------------------------
@@ -203,6 +331,8 @@ class DrawingScene(QGraphicsScene):
 
     def _finalize_created_item(self, item):
         """À appeler quand un item 'définitif' est créé par l'utilisateur."""
+        self._last_created[item_type_name(item)] = item
+        self._last_created[None] = item
         self.item_created.emit(item)
 
     def _triangle_polygon(self, p0: QPointF, p1: QPointF) -> QPolygonF:
@@ -218,6 +348,164 @@ class DrawingScene(QGraphicsScene):
 
         return QPolygonF([top, left, right])
 
+    def _commit_erase(self, eraser):
+        """
+        Fin d'un glissé de gomme : les items sont déjà hors de la scène, on les
+        enregistre dans une seule commande (un Ctrl+Z restaure tout le glissé).
+        """
+        self.undo_stack.push(
+            RemoveItemsCommand(self, eraser.erased, text="Erase", already_removed=True)
+        )
+
+        if self.logger:
+            types = eraser.item_types
+            self.logger.log(
+                event_type="erase",
+                tool="ERASER",
+                item_type=next(iter(types)) if len(types) == 1 else "mixed",
+                count=len(eraser.erased),
+                item_types=";".join(f"{t}:{n}" for t, n in types.items()),
+                eraser_radius=eraser.radius,
+            )
+
+    # ---------
+    # QGraphicsScene : suivi de l'ordre d'ajout et de l'index par type / tag
+    # ---------
+
+    def addItem(self, item):
+        super().addItem(item)
+        self._next_seq += 1
+        self._insert_seq[item] = self._next_seq
+        self._selection_order = None
+        self.features.add(item)
+        self._tune_bsp()
+        if self._infinite:
+            self.include_rect(item.sceneBoundingRect())
+
+    def removeItem(self, item):
+        super().removeItem(item)
+        self._insert_seq.pop(item, None)
+        self._selection_order = None
+        self.features.remove(item)
+        self._tune_bsp()
+
+    def insert_items(self, items):
+        """
+        Ajoute un lot d'items (AddItemsCommand, undo d'un retrait groupé,
+        projet, récupération). Les suivis de addItem (index par type / tag,
+        profondeur BSP, sceneRect du canvas infini) sont mis à jour une seule
+        fois pour le lot ; aucune requête sur la scène pendant la boucle :
+        l'index BSP de Qt range les nouveaux items en une passe, au prochain
+        accès (items(), itemAt...).
+        """
+        added = [it for it in items if it.scene() is None]
+        if not added:
+            return
+        for it in added:
+            super().addItem(it)
+            self._next_seq += 1
+            self._insert_seq[it] = self._next_seq
+        self._selection_order = None
+        self.features.add_many(added)
+        self._tune_bsp()
+        self._include_items(added)
+
+    def remove_items(self, items):
+        """Retire un lot d'items (suivis de removeItem mis à jour une fois)."""
+        removed = [it for it in items if it.scene() is self]
+        if not removed:
+            return
+        for it in removed:
+            super().removeItem(it)
+            self._insert_seq.pop(it, None)
+        self._selection_order = None
+        self.features.remove_many(removed)
+        self._tune_bsp()
+
+    def clear(self):
+        if self._project is not None:
+            self._project.close()
+            self._project = None
+        super().clear()
+        self._insert_seq.clear()
+        self._selection_order = None
+        self.features.clear()
+        self._tune_bsp()
+        if self._infinite:
+            self.setSceneRect(BASE_SCENE_RECT)
+        self.content_replaced.emit()
+
+    @property
+    def project(self):
+        """ProjectLoader du dessin ouvert / enregistré (None sinon)."""
+        return self._project
+
+    @project.setter
+    def project(self, loader):
+        # open_project / save_project : la scène reflète désormais ce fichier
+        self._project = loader
+        if loader is not None:
+            self.content_replaced.emit()
+
+    # ---------
+    # Canvas infini et index spatial
+    # ---------
+
+    def is_infinite(self):
+        return self._infinite
+
+    def include_rect(self, rect: QRectF):
+        """
+        Canvas infini : agrandit le sceneRect pour contenir `rect`.
+        Chaque côté dépassé est repoussé avec une marge (max(_GROW_MIN, moitié
+        de la taille courante)) : le sceneRect ne change que rarement, or chaque
+        changement reconstruit l'index BSP de Qt.
+        """
+        if not self._infinite or rect.isNull():
+            return
+        cur = self.sceneRect()
+        if _covers(cur, rect):
+            return
+        mx = max(_GROW_MIN, cur.width() / 2)
+        my = max(_GROW_MIN, cur.height() / 2)
+        left, top, right, bottom = cur.left(), cur.top(), cur.right(), cur.bottom()
+        if rect.left() < left:
+            left = rect.left() - mx
+        if rect.right() > right:
+            right = rect.right() + mx
+        if rect.top() < top:
+            top = rect.top() - my
+        if rect.bottom() > bottom:
+            bottom = rect.bottom() + my
+        self.setSceneRect(QRectF(left, top, right - left, bottom - top))
+
+    def ensure_loaded(self, rect: QRectF):
+        """
+        Projet ouvert en chargement paresseux : crée les items qui touchent
+        `rect` (appelé par la vue à chaque défilement / zoom).
+        """
+        if self.project is not None and not self.project.done:
+            self.project.load_rect(rect)
+
+    def _include_items(self, items):
+        if self._infinite and items:
+            rect = QRectF()
+            for it in items:
+                rect = rect.united(it.sceneBoundingRect())
+            self.include_rect(rect)
+
+    def _tune_bsp(self):
+        """Profondeur BSP adaptée au nombre d'items (hystérésis x2)."""
+        n = len(self.features)
+        if self._bsp_count // 2 <= n <= self._bsp_count * 2 and self._bsp_count:
+            return
+        self._bsp_count = max(n, 1)
+        leaves = max(1, n // ITEMS_PER_LEAF)
+        depth = min(_BSP_MAX_DEPTH, max(_BSP_MIN_DEPTH, leaves.bit_length()))
+        if depth != self.bspTreeDepth():
+            # L'index est reconstruit paresseusement, à la prochaine requête
+            self.setBspTreeDepth(depth)
+
     # ---------
     # API publique (appelée par l'UI)
     # ---------
@@ -262,6 +550,212 @@ class DrawingScene(QGraphicsScene):
         """Retourne la couleur de fill (ou None si pas de remplissage)."""
         return QColor(self._fill_color) if self._fill_color is not None else None
 
+    def set_stroke_tolerance(self, tolerance):
+        """Tolérance de simplification des traits au stylo (0 / None = désactivée)."""
+        self._stroke_tolerance = tolerance
+
+    def stroke_tolerance(self):
+        return self._stroke_tolerance
+
+    def set_curve_error(self, max_error):
+        """Erreur max du lissage en courbes (0 / None = traits en polyligne)."""
+        self._curve_error = max_error
+
+    def curve_error(self):
+        return self._curve_error
+
+    def set_eraser_radius(self, radius):
+        """Rayon de la gomme (px de scène)."""
+        self._eraser_radius = radius
+
+    def eraser_radius(self):
+        return self._eraser_radius
+
+    def add_items(self, items, text="Add items", already_in_scene=False, select=False):
+        """
+        Insertion groupée (coller, dupliquer, génération, assistant) : le lot
+        entier est ajouté d'un bloc et enregistré comme UNE commande undo.
+
+        - items : dans l'ordre d'empilement voulu (bas -> haut)
+        - already_in_scene=True : items déjà affichés (ex : ghost accepté), on
+          ne fait qu'enregistrer l'ajout dans l'historique
+        - select=True : la sélection devient le lot inséré
+
+        Retourne la liste des items insérés.
+        """
+        items = [it for it in items if it is not None]
+        if not items:
+            return items
+        self.undo_stack.push(
+            AddItemsCommand(self, items, text=text, already_in_scene=already_in_scene)
+        )
+        if select:
+            self.clearSelection()
+            for it in items:
+                it.setSelected(True)
+        return items
+
+    def selected_items_ordered(self):
+        """
+        Items sélectionnés dans l'ordre d'empilement (bas -> haut), comme
+        items(AscendingOrder) filtré par la sélection, mais en O(k log k) pour k
+        items sélectionnés au lieu d'un tri de toute la scène.
+
+        Le tri est gardé jusqu'au prochain changement de sélection ; un
+        changement de zValue d'un item sélectionné est détecté à la lecture.
+        """
+        cached = self._selection_order
+        if cached is not None and all(it.zValue() == z for it, z in cached):
+            return [it for it, _z in cached]
+
+        selected = self.selectedItems()
+        if any(it.parentItem() is not None for it in selected):
+            # Enfants d'un groupe : l'ordre dépend du parent, on laisse Qt trier
+            wanted = set(selected)
+            ordered = [
+                it for it in self.items(Qt.SortOrder.AscendingOrder) if it in wanted
+            ]
+        else:
+            ordered = sorted(selected, key=self.stacking_key)
+        self._selection_order = [(it, it.zValue()) for it in ordered]
+        return ordered
+
+    def stacking_key(self, item):
+        """
+        Clé d'empilement d'un item de premier niveau : trier par cette clé donne
+        l'ordre de items(AscendingOrder) ; max(..., key=stacking_key) = le plus
+        haut.
+        """
+        return (item.zValue(), self._insert_seq.get(item, 0))
+
+    def _invalidate_selection_order(self):
+        self._selection_order = None
+
+    # ---------
+    # Requêtes (assistant, placement, analyses)
+    #
+    # - par type / tag : index SceneFeatureIndex (self.features)
+    # - spatiales : index BSP de Qt (scene.items(rect)), puis test exact
+    # Les résultats "par type / tag" sont dans l'ordre de scene.items() : le
+    # plus haut dans l'empilement d'abord.
+    # ---------
+
+    def _matches(self, item, type_name, tag):
+        if type_name is not None and self.features.type_of(item) != type_name:
+            return False
+        return tag is None or self.features.tag_of(item) == tag
+
+    def items_of_type(self, type_name):
+        """Items d'un type Qt ("QGraphicsEllipseItem"...), le plus haut d'abord."""
+        items = self.features.items_of_type(type_name)
+        items.sort(key=self.stacking_key, reverse=True)
+        return items
+
+    def items_with_tag(self, tag):
+        """Items portant un tag Qt.UserRole (ex : TAG_CAT_EAR), le plus haut d'abord."""
+        items = self.features.items_with_tag(tag)
+        items.sort(key=self.stacking_key, reverse=True)
+        return items
+
+    def last_created_item(self, type_name=None):
+        """
+        Dernier item créé à la souris (de ce type si `type_name`) encore présent
+        dans la scène, sinon None.
+        """
+        item = self._last_created.get(type_name)
+        if item is not None and item.scene() is self:
+            return item
+        return None
+
+    def items_in_rect(
+        self,
+        rect: QRectF,
+        type_name=None,
+        tag=None,
+        mode=Qt.ItemSelectionMode.IntersectsItemShape,
+    ):
+        """Items qui touchent `rect` (coordonnées de scène), le plus haut d'abord."""
+        return [
+            it for it in self.items(rect, mode) if self._matches(it, type_name, tag)
+        ]
+
+    def items_in_radius(self, center: QPointF, radius, type_name=None, tag=None):
+        """Items dont la forme touche le disque (center, radius)."""
+        disc = capsule_path(center, center, radius)
+        x, y, r2 = center.x(), center.y(), radius * radius
+        out = []
+        for it in self.items(
+            disc.boundingRect(), Qt.ItemSelectionMode.IntersectsItemBoundingRect
+        ):
+            if not self._matches(it, type_name, tag):
+                continue
+            # Rejet rapide : bounding rect hors du disque (coins du carré)
+            b = it.sceneBoundingRect()
+            dx = max(b.left() - x, 0.0, x - b.right())
+            dy = max(b.top() - y, 0.0, y - b.bottom())
+            if dx * dx + dy * dy > r2:
+                continue
+            # Acceptation rapide : bounding rect entièrement dans le disque
+            fx = max(x - b.left(), b.right() - x)
+            fy = max(y - b.top(), b.bottom() - y)
+            if fx * fx + fy * fy <= r2 or it.collidesWithPath(
+                it.mapFromScene(disc), Qt.ItemSelectionMode.IntersectsItemShape
+            ):
+                out.append(it)
+        return out
+
+    def nearest_items(self, point: QPointF, k=1, type_name=None, tag=None):
+        """
+        Les `k` items les plus proches de `point`, du plus proche au plus loin.
+        Distance = distance au sceneBoundingRect (0 si le point est dedans).
+
+        Recherche par carrés croissants dans l'index BSP : un item à distance
+        <= r touche forcément le carré de demi-côté r, donc dès que k items sont
+        à moins de r, ce sont les k plus proches.
+        """
+        if k <= 0:
+            return []
+        x, y = point.x(), point.y()
+
+        def dist(it):
+            r = it.sceneBoundingRect()
+            dx = max(r.left() - x, 0.0, x - r.right())
+            dy = max(r.top() - y, 0.0, y - r.bottom())
+            return (dx * dx + dy * dy) ** 0.5
+
+        # Peu de candidats de ce type / tag : calcul direct, sans requête spatiale
+        if type_name is not None or tag is not None:
+            group = (
+                self.features.items_of_type(type_name)
+                if type_name is not None
+                else self.features.items_with_tag(tag)
+            )
+            if len(group) <= 64:
+                found = [(dist(it), it) for it in group if self._matches(it, None, tag)]
+                found.sort(key=lambda p: p[0])
+                return [it for _d, it in found[:k]]
+
+        limit = None  # zone couvrant tous les items (calculée une seule fois)
+        r = _KNN_START_RADIUS
+        while True:
+            square = QRectF(x - r, y - r, 2 * r, 2 * r)
+            found = []
+            for it in self.items(
+                square, Qt.ItemSelectionMode.IntersectsItemBoundingRect
+            ):
+                if self._matches(it, type_name, tag):
+                    found.append((dist(it), it))
+            found.sort(key=lambda p: p[0])
+            if sum(1 for d, _it in found if d <= r) >= k:
+                return [it for _d, it in found[:k]]
+
+            if _covers(square, self.sceneRect()):
+                if limit is None:
+                    limit = self.itemsBoundingRect()
+                if _covers(square, limit):
+                    return [it for _d, it in found[:k]]
+            r *= 2
+
     def history(self) -> QUndoStack:
         """Expose la pile undo/redo au EditorWindow (pour créer les QAction Undo/Redo)."""
         return self.undo_stack
@@ -275,9 +769,7 @@ class DrawingScene(QGraphicsScene):
         Copie la sélection dans le clipboard sous forme JSON.
         (On choisit du texte JSON pour rester simple et portable.)
         """
-        selected = set(self.selectedItems())
-        ordered = self.items(Qt.SortOrder.AscendingOrder)  # bas -> haut
-        items = [it for it in ordered if it in selected]
+        items = self.selected_items_ordered()  # bas -> haut
 
         # Sérialise uniquement les types supportés (les None sont filtrés)
         payload = [self._serialize_item(it) for it in items]
@@ -288,18 +780,19 @@ class DrawingScene(QGraphicsScene):
 
         if self.logger:
             self.logger.log(
-                event_type="copy", tool=self._tool.name, notes=f"n={len(payload)}"
+                event_type="copy", tool=self._tool.name, n_items=len(payload)
             )
 
     def cut_selection(self):
         """
-        Couper = copier puis supprimer la sélection via des commandes undoables.
+        Couper = copier puis supprimer la sélection, en une seule commande
+        undoable (retrait groupé).
         """
         self.copy_selection()
 
-        # Supprime chaque item via une commande RemoveItemCommand => undo possible
-        for it in list(self.selectedItems()):
-            self.undo_stack.push(RemoveItemCommand(self, it, text="Cut item"))
+        items = self.selected_items_ordered()  # bas -> haut : rétabli à l'undo
+        if items:
+            self.undo_stack.push(RemoveItemsCommand(self, items, text="Cut"))
 
         if self.logger:
             self.logger.log(event_type="cut", tool=self._tool.name)
@@ -336,41 +829,27 @@ class DrawingScene(QGraphicsScene):
 
             # Décale l'item collé (évite QPointF + QPointF)
             it.moveBy(offset.x(), offset.y())
-
-            # Ajoute l'item à la scène immédiatement
-            self.addItem(it)
-
-            # Enregistre l'ajout dans la pile undo (already_in_scene=True car déjà ajouté)
-            self.undo_stack.push(
-                AddItemCommand(self, it, text="Paste item", already_in_scene=True)
-            )
             new_items.append(it)
 
-        # UX : après collage, sélectionner les nouveaux items
-        self.clearSelection()
-        for it in new_items:
-            it.setSelected(True)
+        # Un seul ajout groupé (un seul undo) ; UX : les items collés sont
+        # sélectionnés
+        self.add_items(new_items, text="Paste", select=True)
 
         if self.logger:
             self.logger.log(
-                event_type="paste", tool=self._tool.name, notes=f"n={len(new_items)}"
+                event_type="paste", tool=self._tool.name, n_items=len(new_items)
             )
 
     def duplicate_selection(self):
-        selected = set(self.selectedItems())
-        if not selected:
+        items_to_dup = self.selected_items_ordered()  # bas -> haut
+        if not items_to_dup:
             return
 
-        ordered = self.items(Qt.SortOrder.AscendingOrder)  # bas -> haut
-        items_to_dup = [it for it in ordered if it in selected]
-
         payload = [self._serialize_item(it) for it in items_to_dup]
         payload = [p for p in payload if p is not None]
         if not payload:
             return
 
-        self.undo_stack.beginMacro("Duplicate selection")
-
         new_items = []
         for d in payload:
             it = self._deserialize_item(d)
@@ -378,17 +857,59 @@ class DrawingScene(QGraphicsScene):
                 continue
 
             it.moveBy(10, 10)
-            self.addItem(it)
-            self.undo_stack.push(
-                AddItemCommand(self, it, text="Duplicate item", already_in_scene=True)
-            )
             new_items.append(it)
 
-        self.undo_stack.endMacro()
+        self.add_items(new_items, text="Duplicate selection", select=True)
 
-        self.clearSelection()
-        for it in new_items:
-            it.setSelected(True)
+    # ------------------------------------------------------------------
+    # Clavier : déplacement de la sélection aux flèches
+    # ------------------------------------------------------------------
+
+    def nudge_selection(self, dx, dy):
+        """
+        Décale les items sélectionnés de (dx, dy). Même commande que le
+        déplacement à la souris : une rafale de flèches (touche maintenue,
+        appuis rapprochés) fusionne en une seule entrée d'annulation.
+        """
+        items = [
+            it
+            for it in self.selected_items_ordered()
+            if it.flags() & it.GraphicsItemFlag.ItemIsMovable
+        ]
+        if not items:
+            return False
+        delta = QPointF(dx, dy)
+        old_positions = {it: it.pos() for it in items}
+        new_positions = {it: pos + delta for it, pos in old_positions.items()}
+        self.undo_stack.push(
+            MoveItemsCommand(
+                items,
+                old_positions,
+                new_positions,
+                text="Nudge selection",
+                already_applied=False,
+            )
+        )
+        self._include_items(items)
+        return True
+
+    def keyPressEvent(self, event):
+        step = _NUDGE_KEYS.get(event.key())
+        if step is not None:
+            mods = event.modifiers()
+            size = (
+                NUDGE_STEP_LARGE
+                if mods & Qt.KeyboardModifier.ShiftModifier
+                else NUDGE_STEP
+            )
+            if self.nudge_selection(step[0] * size, step[1] * size):
+                # Un appui (hors répétition auto) = un déplacement dans les logs
+                if self.logger and not event.isAutoRepeat():
+                    self.logger.log(event_type="item_moved", tool=self._tool.name)
+                event.accept()
+                return
+        # Sinon : comportement Qt (la vue fait défiler si la scène refuse)
+        super().keyPressEvent(event)
 
     # ------------------------------------------------------------------
     # Mouse events (interaction directe)
@@ -399,41 +920,29 @@ class DrawingScene(QGraphicsScene):
         Début d'interaction souris.
 
         Selon l'outil courant :
-        - ERASER : supprime l'item sous la souris via une commande undoable
-        - PEN : crée un QPainterPath et un QGraphicsPathItem (preview)
+        - ERASER : commence un glissé de gomme (items sous le disque retirés)
+        - PEN : crée un LiveStrokeItem (preview, points ajoutés en O(1))
         - LINE/RECT/ELLIPSE : crée l'item de forme (preview)
         - SELECT : laisse Qt gérer la sélection et capture l'état pour un éventuel move
         """
         p = event.scenePos()
 
         # ---------------- ERASER ----------------
-        if self._tool == Tool.ERASER and event.button():
-            item = self._item_at_scene_pos(p)
-            if item is not None:
-                # Suppression undoable
-                self.undo_stack.push(RemoveItemCommand(self, item, text="Erase item"))
-                if self.logger:
-                    self.logger.log(
-                        event_type="erase", tool="ERASER", item_type=type(item).__name__
-                    )
-                event.accept()
-                return
-
-            # Rien à gommer : laisse Qt propager (pas grave)
-            super().mousePressEvent(event)
+        if self._tool == Tool.ERASER and event.button() == Qt.MouseButton.LeftButton:
+            self._eraser = SweptEraser(self, p, self._eraser_radius)
+            self._eraser.sweep_to(p)
+            event.accept()
             return
 
         # ---------------- PEN ----------------
         if self._tool == Tool.PEN and event.button():
-            # Initialise un path au point de départ
-            self._current_path = QPainterPath(p)
             self._points_count = 1
 
             # Item “preview” : ajouté immédiatement pour dessiner en temps réel
-            self._current_item = QGraphicsPathItem(self._current_path)
-            self._current_item.setPen(self._make_pen(width=2))
-            self._enable_interaction_flags(self._current_item)
+            self._current_item = LiveStrokeItem(p, self._make_pen(width=2))
             self.addItem(self._current_item)
+            if self._stroke_tolerance:
+                self._decimator = StrokeDecimator(p, self._stroke_tolerance)
 
             if self.logger:
                 self.logger.log(event_type="pen_start", tool="PEN")
@@ -524,43 +1033,31 @@ class DrawingScene(QGraphicsScene):
                     event_type="select_press",
                     tool="SELECT",
                     item_type=(
-                        type(self._press_item).__name__ if self._press_item else "None"
+                        item_type_name(self._press_item) if self._press_item else "None"
                     ),
                 )
 
     def mouseMoveEvent(self, event):
         """
         Mouvement de souris avec bouton pressé :
-        - ERASER : gomme en continu (supprime des items au passage)
-        - PEN : ajoute des segments au QPainterPath en cours
+        - ERASER : gomme toute la zone balayée depuis l'échantillon précédent
+        - PEN : ajoute un point au trait en cours (seul le segment est redessiné)
         - LINE/RECT/ELLIPSE : met à jour la forme preview
         - SELECT : Qt gère le déplacement (ItemIsMovable) si applicable
         """
         p = event.scenePos()
 
         # ---------------- ERASER (gomme “continue”) ----------------
-        if self._tool == Tool.ERASER:
-            item = self._item_at_scene_pos(p)
-            if item is not None:
-                self.undo_stack.push(RemoveItemCommand(self, item, text="Erase item"))
-                if self.logger:
-                    self.logger.log(
-                        event_type="erase",
-                        tool="ERASER",
-                        item_type=type(item).__name__,
-                        notes="move",
-                    )
-                event.accept()
-                return
-
-            super().mouseMoveEvent(event)
+        if self._tool == Tool.ERASER and self._eraser is not None:
+            self._eraser.sweep_to(p)
+            event.accept()
             return
 
         # ---------------- PEN ----------------
-        if self._tool == Tool.PEN and self._current_path is not None:
-            self._current_path.lineTo(p)
+        if self._tool == Tool.PEN and self._current_item is not None:
             self._points_count += 1
-            self._current_item.setPath(self._current_path)
+            if self._decimator is None or self._decimator.push(p) == KEEP:
+                self._current_item.add_point(p)
             event.accept()
             return
 
@@ -590,35 +1087,72 @@ class DrawingScene(QGraphicsScene):
     def mouseReleaseEvent(self, event):
         """
         Fin d'interaction souris :
+        - ERASER : une seule commande undo + un seul log pour tout le glissé
         - PEN : finalize + push AddItemCommand (undoable)
         - LINE/RECT/ELLIPSE : finalize + push AddItemCommand (undoable)
         - SELECT : si déplacement => push MoveItemsCommand (undoable)
         """
         p = event.scenePos()
 
+        # ---------------- ERASER ----------------
+        if self._tool == Tool.ERASER and self._eraser is not None:
+            eraser = self._eraser
+            self._eraser = None
+            eraser.sweep_to(p)
+            if eraser.erased:
+                self._commit_erase(eraser)
+            event.accept()
+            return
+
         # ---------------- PEN ----------------
-        if self._tool == Tool.PEN and self._current_path is not None:
+        if self._tool == Tool.PEN and self._current_item is not None:
+            # Conversion du trait en cours en StrokeItem (QGraphicsPathItem)
+            # (chemin construit une seule fois, à la fin du trait)
+            live = self._current_item
+            # Dernier échantillon ignoré par la décimation : c'est la fin du trait
+            if self._decimator is not None and self._decimator.pending is not None:
+                live.add_point(self._decimator.pending)
+
+            # Polyligne retenue par la simplification (décimation, puis RDP si
+            # pas d'ajustement de courbes) : n_points_simplified = sa longueur
+            points = live.points()
+            n_segments = None
+            if self._curve_error:
+                segments = fit_beziers(points, self._curve_error)
+                path = path_from_beziers(segments) if segments else live.to_path()
+                n_segments = len(segments)
+            elif self._decimator is not None:
+                points = rdp(points, self._stroke_tolerance)
+                path = live.to_path(points)
+            else:
+                path = live.to_path()
+            item = StrokeItem(path)
+            item.setPen(live.pen())
+            self._enable_interaction_flags(item)
+            self.removeItem(live)
+            self.addItem(item)
+
             if self.logger:
                 self.logger.log(
                     event_type="pen_end",
                     tool="PEN",
                     item_type="QGraphicsPathItem",
                     n_points=str(self._points_count),
+                    n_points_simplified=len(points),
+                    n_segments=n_segments,
                 )
 
-            # L'item est déjà dans la scène (preview), on “enregistre” l’action dans l’historique.
+            # L'item est déjà dans la scène, on “enregistre” l’action dans l’historique.
             self.undo_stack.push(
-                AddItemCommand(
-                    self, self._current_item, text="Pen stroke", already_in_scene=True
-                )
+                AddItemCommand(self, item, text="Pen stroke", already_in_scene=True)
             )
 
             # Signal pour le nouvel item créé
-            self._finalize_created_item(self._current_item)
+            self._finalize_created_item(item)
 
             # Reset état interne
-            self._current_path = None
             self._current_item = None
+            self._decimator = None
             self._points_count = 0
 
             event.accept()
@@ -637,7 +1171,10 @@ class DrawingScene(QGraphicsScene):
                         event_type="line_end",
                         tool="LINE",
                         item_type="QGraphicsLineItem",
-                        notes=f"({line.x1():.1f},{line.y1():.1f})->({line.x2():.1f},{line.y2():.1f})",
+                        x1=line.x1(),
+                        y1=line.y1(),
+                        x2=line.x2(),
+                        y2=line.y2(),
                     )
                 elif self._tool == Tool.RECT:
                     r = self._shape_item.rect()
@@ -645,7 +1182,10 @@ class DrawingScene(QGraphicsScene):
                         event_type="rect_end",
                         tool="RECT",
                         item_type="QGraphicsRectItem",
-                        notes=f"x={r.x():.1f},y={r.y():.1f},w={r.width():.1f},h={r.height():.1f}",
+                        x=r.x(),
+                        y=r.y(),
+                        w=r.width(),
+                        h=r.height(),
                     )
                 elif self._tool == Tool.ELLIPSE:
                     r = self._shape_item.rect()
@@ -653,14 +1193,17 @@ class DrawingScene(QGraphicsScene):
                         event_type="ellipse_end",
                         tool="ELLIPSE",
                         item_type="QGraphicsEllipseItem",
-                        notes=f"x={r.x():.1f},y={r.y():.1f},w={r.width():.1f},h={r.height():.1f}",
+                        x=r.x(),
+                        y=r.y(),
+                        w=r.width(),
+                        h=r.height(),
                     )
                 elif self._tool == Tool.TRIANGLE:
                     self.logger.log(
                         event_type="triangle_end",
                         tool="TRIANGLE",
                         item_type="QGraphicsPolygonItem",
-                        notes=f"n_points={self._shape_item.polygon().count()}",
+                        n_vertices=self._shape_item.polygon().count(),
                     )
 
             # Enregistre l’ajout de la forme dans l’historique (undoable)
@@ -671,6 +1214,7 @@ class DrawingScene(QGraphicsScene):
             )
 
             # Signal pour le nouvel item créé
+            self._include_items([self._shape_item])
             self._finalize_created_item(self._shape_item)
 
             # Reset état interne shapes
@@ -707,6 +1251,7 @@ class DrawingScene(QGraphicsScene):
                     )
 
                     if changed:
+                        self._include_items(list(new_positions))
                         # Enregistre le déplacement comme commande undoable
                         self.undo_stack.push(
                             MoveItemsCommand(
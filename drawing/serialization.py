@@ -24,6 +24,56 @@ from PySide6.QtWidgets import (
 from PySide6.QtGui import QPainterPath, QPen, QColor, QBrush, QPolygonF
 from PySide6.QtCore import QPointF, QRectF, Qt
 
+from drawing.stroke_item import StrokeItem
+
+
+# Types d'éléments d'un QPainterPath <-> libellés du format sérialisé.
+# Une cubique = "CurveTo" (1er point de contrôle) + 2 "CurveToData"
+# (2e point de contrôle, puis point d'arrivée).
+_ELEMENT_NAMES = {
+    QPainterPath.ElementType.MoveToElement: "MoveTo",
+    QPainterPath.ElementType.LineToElement: "LineTo",
+    QPainterPath.ElementType.CurveToElement: "CurveTo",
+    QPainterPath.ElementType.CurveToDataElement: "CurveToData",
+}
+
+
+def path_from_elements(elems) -> QPainterPath:
+    """
+    Reconstruit un QPainterPath depuis une liste [x, y, type].
+    Le premier élément est toujours un MoveTo (anciens fichiers : le type
+    n'était pas fiable, seuls MoveTo / LineTo existaient).
+    """
+    path = QPainterPath()
+    n = len(elems)
+    i = 0
+    while i < n:
+        x, y, etype = elems[i]
+        if i == 0 or etype == "MoveTo":
+            path.moveTo(float(x), float(y))
+        elif etype == "CurveTo" and i + 2 < n:
+            (x2, y2, _), (x3, y3, _) = elems[i + 1], elems[i + 2]
+            path.cubicTo(
+                float(x), float(y), float(x2), float(y2), float(x3), float(y3)
+            )
+            i += 3
+            continue
+        else:
+            path.lineTo(float(x), float(y))
+        i += 1
+    return path
+
+
+def item_type_name(item) -> str:
+    """
+    Nom du type Qt de l'item ("QGraphicsPathItem" pour un StrokeItem) : c'est
+    ce nom qui figure dans le format sérialisé et dans les logs (item_type).
+    """
+    for cls in type(item).__mro__:
+        if cls.__module__.startswith("PySide6."):
+            return cls.__name__
+    return type(item).__name__
+
 
 def make_pen_from(stroke_hex: str, stroke_width: int) -> QPen:
     pen = QPen(QColor(stroke_hex))
@@ -61,7 +111,7 @@ def serialize_item(item) -> Optional[Dict[str, Any]]:
                 fill = c.name()
 
     base: Dict[str, Any] = {
-        "type": type(item).__name__,
+        "type": item_type_name(item),
         "pos": [float(item.pos().x()), float(item.pos().y())],
         "stroke": stroke,
         "stroke_width": int(width),
@@ -91,8 +141,7 @@ def serialize_item(item) -> Optional[Dict[str, Any]]:
         elems = []
         for i in range(path.elementCount()):
             e = path.elementAt(i)
-            etype = "MoveTo" if i == 0 else "LineTo"
-            elems.append([float(e.x), float(e.y), etype])
+            elems.append([float(e.x), float(e.y), _ELEMENT_NAMES[e.type]])
         base["path_elems"] = elems
 
     elif isinstance(item, QGraphicsPolygonItem):
@@ -146,12 +195,7 @@ def deserialize_item(data: Dict[str, Any]):
         elems = data.get("path_elems", [])
         if not elems:
             return None
-        path = QPainterPath()
-        x0, y0, _ = elems[0]
-        path.moveTo(float(x0), float(y0))
-        for x, y, _etype in elems[1:]:
-            path.lineTo(float(x), float(y))
-        item = QGraphicsPathItem(path)
+        item = StrokeItem(path_from_elements(elems))
         item.setPen(pen)
 
     elif t == "QGraphicsPolygonItem":
@@ -0,0 +1,123 @@
+"""
+simplify.py
+
+Simplification des traits au stylo.
+
+Deux étapes :
+1) pendant le tracé (StrokeDecimator) : un échantillon souris trop proche du
+   dernier point gardé (< tolerance) est ignoré, sauf s'il forme un angle vif
+   (coin) ; coût O(1) par échantillon, le trait affiché reste fidèle au geste
+2) au relâchement (rdp) : Ramer–Douglas–Peucker avec la même tolérance,
+   qui retire les points alignés restants
+
+L'erreur maximale par rapport au geste brut reste de l'ordre de `tolerance`
+(en px de scène). tolerance = 0 / None => pas de simplification.
+"""
+
+import math
+
+from PySide6.QtCore import QPointF
+
+# Tolérance par défaut (px de scène)
+DEFAULT_TOLERANCE = 1.0
+
+# Changement de direction au-delà duquel un point proche est gardé quand même
+DEFAULT_CORNER_ANGLE_DEG = 60.0
+
+# Résultats de StrokeDecimator.push()
+SKIP = 0
+KEEP = 1
+
+
+class StrokeDecimator:
+    """Décimation distance / angle, en ligne (un appel par échantillon souris)."""
+
+    def __init__(
+        self,
+        start,
+        tolerance=DEFAULT_TOLERANCE,
+        corner_angle_deg=DEFAULT_CORNER_ANGLE_DEG,
+    ):
+        self.tolerance = tolerance
+        self._cos_corner = math.cos(math.radians(corner_angle_deg))
+        self._prev = None  # avant-dernier point gardé (x, y)
+        self._last = (start.x(), start.y())  # dernier point gardé
+        self.pending = None  # dernier échantillon ignoré (QPointF), gardé à la fin
+
+    def push(self, p):
+        """SKIP : échantillon ignoré ; KEEP : à ajouter au trait."""
+        x, y = p.x(), p.y()
+        lx, ly = self._last
+        dx, dy = x - lx, y - ly
+        dist = math.hypot(dx, dy)
+
+        if dist < self.tolerance and not self._is_corner(dx, dy, dist):
+            self.pending = QPointF(p)
+            return SKIP
+
+        self._prev = self._last
+        self._last = (x, y)
+        self.pending = None
+        return KEEP
+
+    def _is_corner(self, dx, dy, dist):
+        if self._prev is None or dist == 0.0:
+            return False
+        ux = self._last[0] - self._prev[0]
+        uy = self._last[1] - self._prev[1]
+        norm = math.hypot(ux, uy)
+        if norm == 0.0:
+            return False
+        return (ux * dx + uy * dy) / (norm * dist) < self._cos_corner
+
+
+def rdp_indices(xy, tolerance):
+    """
+    Ramer–Douglas–Peucker (itératif, sans récursion) sur une séquence de
+    tuples (x, y). Retourne les indices conservés (premier et dernier inclus).
+    """
+    n = len(xy)
+    if n < 3 or not tolerance:
+        return list(range(n))
+
+    keep = bytearray(n)
+    keep[0] = keep[n - 1] = 1
+    tol2 = tolerance * tolerance
+
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        ax, ay = xy[first]
+        bx, by = xy[last][0] - ax, xy[last][1] - ay
+        seg2 = bx * bx + by * by
+
+        best, best_d2 = -1, tol2
+        for i in range(first + 1, last):
+            px, py = xy[i][0] - ax, xy[i][1] - ay
+            if seg2 == 0.0:
+                d2 = px * px + py * py
+            else:
+                # Distance au carré du point au segment (projection bornée)
+                t = max(0.0, min(1.0, (px * bx + py * by) / seg2))
+                ex, ey = px - t * bx, py - t * by
+                d2 = ex * ex + ey * ey
+            if d2 > best_d2:
+                best, best_d2 = i, d2
+
+        if best >= 0:
+            keep[best] = 1
+            stack.append((first, best))
+            stack.append((best, last))
+
+    return [i for i in range(n) if keep[i]]
+
+
+def rdp(points, tolerance=DEFAULT_TOLERANCE):
+    """
+    RDP sur une séquence de QPointF ; retourne une liste de QPointF
+    (premier et dernier points toujours conservés).
+    """
+    xy = [(p.x(), p.y()) for p in points]
+    return [points[i] for i in rdp_indices(xy, tolerance)]
@@ -0,0 +1,148 @@
+"""
+stroke_item.py
+
+Item "trait au stylo" finalisé : QGraphicsPathItem avec hit-test mis en cache.
+
+Problème : QGraphicsPathItem.shape() repasse tout le chemin dans un
+QPainterPathStroker à chaque appel. itemAt() (clic de sélection), la gomme et la
+sélection au lasso refont ce calcul pour chaque long trait, à chaque requête.
+
+StrokeItem :
+- calcule le contour épaissi (shape) une seule fois, invalidé seulement par
+  setPath() / setPen() (épaisseur, bouts, jointures)
+- découpe le trait aplati (courbes -> polyligne) en tronçons de CHUNK segments,
+  chacun avec sa bbox (épaisseur du trait incluse) : hiérarchie à 2 niveaux
+  (bbox de l'item, puis bbox des tronçons)
+- contains() / collidesWithPath() ne testent précisément que les tronçons dont
+  la bbox touche la requête (contour du tronçon calculé à la demande, gardé)
+- sans remplissage, seule "l'encre" compte : un clic dans le creux d'un "C"
+  ne sélectionne plus le trait
+
+Pour la sérialisation et les logs, le type reste "QGraphicsPathItem"
+(voir serialization.item_type_name).
+"""
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QPainterPath, QPainterPathStroker, QPolygonF
+from PySide6.QtWidgets import QGraphicsPathItem
+
+# Nombre de segments par tronçon (unité de test précis)
+CHUNK = 32
+
+
+class _Chunk:
+    __slots__ = ("polyline", "rect", "shape")
+
+    def __init__(self, polyline, rect):
+        self.polyline = polyline  # QPolygonF (CHUNK + 1 points au plus)
+        self.rect = rect  # bbox, épaisseur du trait incluse
+        self.shape = None  # contour épaissi, calculé au premier test précis
+
+
+class StrokeItem(QGraphicsPathItem):
+    def __init__(self, path=None, parent=None):
+        if path is None:
+            super().__init__(parent)
+        else:
+            super().__init__(path, parent)
+        self._shape = None
+        self._chunks = None
+
+    # ------------------------------------------------------------------
+    # Invalidation du cache
+    # ------------------------------------------------------------------
+    def setPath(self, path):
+        super().setPath(path)
+        self._invalidate()
+
+    def setPen(self, pen):
+        super().setPen(pen)
+        self._invalidate()
+
+    def setBrush(self, brush):
+        super().setBrush(brush)
+        self._shape = None  # le remplissage fait partie de shape()
+
+    def _invalidate(self):
+        self._shape = None
+        self._chunks = None
+
+    # ------------------------------------------------------------------
+    # Construction du cache
+    # ------------------------------------------------------------------
+    def _stroker(self):
+        pen = self.pen()
+        stroker = QPainterPathStroker()
+        # Stylo cosmétique (largeur 0) : 1 px, comme à l'affichage
+        stroker.setWidth(pen.widthF() or 1.0)
+        stroker.setCapStyle(pen.capStyle())
+        stroker.setJoinStyle(pen.joinStyle())
+        stroker.setMiterLimit(pen.miterLimit())
+        return stroker
+
+    def _filled(self):
+        return self.brush().style() != Qt.BrushStyle.NoBrush
+
+    def _build_chunks(self):
+        # Demi-épaisseur + marge (bouts carrés / jointures en onglet)
+        pen = self.pen()
+        m = (pen.widthF() or 1.0) / 2 * max(1.5, pen.miterLimit()) + 1.0
+        chunks = []
+        for poly in self.path().toSubpathPolygons():
+            n = poly.size()
+            if n == 1:
+                r = poly.boundingRect().adjusted(-m, -m, m, m)
+                chunks.append(_Chunk(poly, r))
+            for start in range(0, n - 1, CHUNK):
+                part = QPolygonF(poly.mid(start, CHUNK + 1))
+                chunks.append(_Chunk(part, part.boundingRect().adjusted(-m, -m, m, m)))
+        self._chunks = chunks
+        return chunks
+
+    def _chunk_shape(self, chunk):
+        if chunk.shape is None:
+            path = QPainterPath()
+            path.addPolygon(chunk.polyline)
+            chunk.shape = self._stroker().createStroke(path)
+        return chunk.shape
+
+    def _candidates(self, rect):
+        chunks = self._chunks if self._chunks is not None else self._build_chunks()
+        return [c for c in chunks if c.rect.intersects(rect)]
+
+    # ------------------------------------------------------------------
+    # QGraphicsItem
+    # ------------------------------------------------------------------
+    def shape(self) -> QPainterPath:
+        if self._shape is None:
+            shape = self._stroker().createStroke(self.path())
+            if self._filled():
+                shape.addPath(self.path())
+            self._shape = shape
+        return QPainterPath(self._shape)
+
+    def contains(self, point) -> bool:
+        if not self.boundingRect().contains(point):
+            return False
+        if self._filled() and self.path().contains(point):
+            return True
+        chunks = self._chunks if self._chunks is not None else self._build_chunks()
+        for c in chunks:
+            if c.rect.contains(point) and self._chunk_shape(c).contains(point):
+                return True
+        return False
+
+    def collidesWithPath(
+        self, path, mode=Qt.ItemSelectionMode.IntersectsItemShape
+    ) -> bool:
+        if mode != Qt.ItemSelectionMode.IntersectsItemShape:
+            return super().collidesWithPath(path, mode)
+        rect = path.boundingRect()
+        if not self.boundingRect().intersects(rect):
+            return False
+        if self._filled() and path.intersects(self.path()):
+            return True
+        for c in self._candidates(rect):
+            if path.intersects(self._chunk_shape(c)):
+                return True
+        return False
@@ -0,0 +1,382 @@
+"""
+logs/analytics.py
+
+Calcul des métriques par essai (et par session) en un seul passage sur les logs,
+sans pandas ni Jupyter. Reproduit le tableau `trials` du notebook d'analyse :
+- n_actions, n_corrections, n_ia_events, n_gen_add, ai_used, correction_ratio
+- duration_s (colonne typée de trial_end, ou notes pour les anciens fichiers)
+- similarity (auto-évaluation, self_eval)
+
+Les lignes agrégées par EventLogger (rafales d'erase, select_press...) comptent
+pour `count` événements : les métriques sont identiques à celles d'un log
+non agrégé.
+
+Fonctionnement :
+- chaque fichier est lu en streaming ; on ne garde en mémoire qu'un petit
+  agrégat par essai (pas les lignes)
+- plusieurs fichiers => un processus par fichier, puis fusion des agrégats
+  (une session répartie sur plusieurs fichiers est correctement recombinée)
+- seules les sessions complètes (3 trial_start et 3 trial_end) sont conservées
+
+Attention : les fichiers fournis doivent être disjoints (ex : les segments OU
+events_all.csv fusionné, pas les deux), sinon les événements sont comptés deux fois.
+
+Usage (depuis la racine du projet) :
+    python -m logs.analytics logs/segments -o trials.csv --sessions sessions.csv
+"""
+
+import argparse
+import csv
+import os
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from logs import binlog
+from logs.merge import expand_inputs
+
+# --- Typologie des événements (identique au notebook) ---
+ACTION_EVENTS = frozenset(
+    {"pen_end", "line_end", "rect_end", "ellipse_end", "triangle_end", "item_moved"}
+)
+CORRECTION_EVENTS = frozenset({"erase", "undo", "redo"})
+IA_EVENTS = frozenset(
+    {
+        "gen_add",
+        "assistant_accept",
+        "autosuggest_accept",
+        "autosuggest_shown",
+        "invoke_help",
+        "ai_output",
+    }
+)
+GENERATION_EVENTS = frozenset({"gen_add"})
+
+EXPECTED_TRIALS = 3
+
+TRIAL_COLUMNS = [
+    "session_id",
+    "condition",
+    "task_id",
+    "trial_index",
+    "n_actions",
+    "n_corrections",
+    "n_ia_events",
+    "n_gen_add",
+    "ai_used",
+    "correction_ratio",
+    "duration_s",
+    "similarity",
+]
+
+SESSION_COLUMNS = [
+    "session_id",
+    "condition",
+    "mean_duration_s",
+    "median_duration_s",
+    "mean_corrections",
+    "total_corrections",
+    "mean_correction_ratio",
+    "total_ia_events",
+    "total_gen_add",
+    "ai_used_any",
+]
+
+# Indices dans la liste d'agrégats d'un essai
+_ACTIONS, _CORRECTIONS, _IA, _GEN, _DURATION, _SIMILARITY = range(6)
+
+
+def _note_value(notes: str, key: str):
+    """Extrait un float de notes du type 'a=1;key=12.3' (None si absent)."""
+    for part in notes.split(";"):
+        name, sep, value = part.partition("=")
+        if sep and name.strip() == key:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def _iter_file(path):
+    """
+    Produit (session_id, condition, task_id, trial_index, event_type, notes,
+    duration_s, similarity, count).
+
+    duration_s / similarity viennent des colonnes typées (logs/schema.py) quand
+    elles existent ; sinon "" et on retombe sur les notes (anciens fichiers).
+    """
+    if path.endswith(".sklog"):
+        for row in binlog.iter_rows(path, iso_timestamps=False):
+            yield (
+                row["session_id"],
+                row["condition"],
+                row["task_id"],
+                row["trial_index"],
+                row["event_type"],
+                row["notes"],
+                row.get("duration_s", ""),
+                row.get("similarity", ""),
+                row.get("count", ""),
+            )
+        return
+
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        # Colonnes absentes des anciens schémas (ex : events_v1.csv n'a ni
+        # condition, ni tâche, ni essai) : valeur ""
+        cols = [
+            header.index(c) if c in header else None
+            for c in (
+                "session_id",
+                "condition",
+                "task_id",
+                "trial_index",
+                "event_type",
+                "notes",
+                "duration_s",
+                "similarity",
+                "count",
+            )
+        ]
+        if cols[0] is None or cols[4] is None:
+            print(f"{path} : colonne session_id ou event_type absente, ignoré", file=sys.stderr)
+            return
+        width = max(c for c in cols[:5] if c is not None) + 1
+        for row in reader:
+            if len(row) < width:
+                continue
+            yield tuple(
+                row[c] if c is not None and c < len(row) else "" for c in cols
+            )
+
+
+def _typed_or_note(value, notes, key):
+    if value != "" and value is not None:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return _note_value(notes, key)
+
+
+def scan_file(path):
+    """
+    Passe unique sur un fichier.
+
+    Retourne (trials, sessions) :
+    - trials   : {(session_id, task_id, trial_index): [actions, corrections, ia, gen,
+                                                       duration_s, similarity]}
+    - sessions : {session_id: [n_trial_start, n_trial_end, condition]}
+    """
+    trials = {}
+    sessions = {}
+
+    for (
+        sid,
+        condition,
+        task_id,
+        trial_index,
+        event_type,
+        notes,
+        duration_s,
+        similarity,
+        count,
+    ) in _iter_file(path):
+        sess = sessions.get(sid)
+        if sess is None:
+            sess = sessions[sid] = [0, 0, ""]
+        if condition and not sess[2]:
+            sess[2] = condition
+
+        if event_type == "trial_start":
+            sess[0] += 1
+        elif event_type == "trial_end":
+            sess[1] += 1
+
+        # Seuls les événements rattachés à un essai comptent dans les métriques
+        if not task_id or not trial_index:
+            continue
+
+        key = (sid, task_id, trial_index)
+        agg = trials.get(key)
+        if agg is None:
+            agg = trials[key] = [0, 0, 0, 0, None, None]
+
+        # Ligne agrégée : vaut `count` événements
+        n = int(count) if count not in ("", None) else 1
+
+        if event_type in ACTION_EVENTS:
+            agg[_ACTIONS] += n
+        elif event_type in CORRECTION_EVENTS:
+            agg[_CORRECTIONS] += n
+        if event_type in IA_EVENTS:
+            agg[_IA] += n
+        if event_type in GENERATION_EVENTS:
+            agg[_GEN] += n
+
+        if event_type == "trial_end" and agg[_DURATION] is None:
+            agg[_DURATION] = _typed_or_note(duration_s, notes, "duration_s")
+        elif event_type == "self_eval" and agg[_SIMILARITY] is None:
+            agg[_SIMILARITY] = _typed_or_note(similarity, notes, "similarity")
+
+    return trials, sessions
+
+
+def _merge_into(trials, sessions, part_trials, part_sessions):
+    for key, agg in part_trials.items():
+        cur = trials.get(key)
+        if cur is None:
+            trials[key] = agg
+            continue
+        for k in (_ACTIONS, _CORRECTIONS, _IA, _GEN):
+            cur[k] += agg[k]
+        for k in (_DURATION, _SIMILARITY):
+            if cur[k] is None:
+                cur[k] = agg[k]
+
+    for sid, sess in part_sessions.items():
+        cur = sessions.get(sid)
+        if cur is None:
+            sessions[sid] = sess
+            continue
+        cur[0] += sess[0]
+        cur[1] += sess[1]
+        if not cur[2]:
+            cur[2] = sess[2]
+
+
+def compute_trials(paths, jobs=None, complete_only=True):
+    """
+    Calcule la table par essai sur un ou plusieurs fichiers.
+    Retourne une liste de dicts (colonnes TRIAL_COLUMNS), triée par session puis essai.
+    """
+    paths = list(paths)
+    trials, sessions = {}, {}
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+            for part in pool.map(scan_file, paths):
+                _merge_into(trials, sessions, *part)
+    else:
+        for p in paths:
+            _merge_into(trials, sessions, *scan_file(p))
+
+    out = []
+    for (sid, task_id, trial_index), agg in trials.items():
+        n_start, n_end, condition = sessions[sid]
+        if complete_only and not (
+            n_start == EXPECTED_TRIALS and n_end == EXPECTED_TRIALS
+        ):
+            continue
+
+        n_actions = agg[_ACTIONS]
+        out.append(
+            {
+                "session_id": sid,
+                "condition": condition,
+                "task_id": task_id,
+                "trial_index": trial_index,
+                "n_actions": n_actions,
+                "n_corrections": agg[_CORRECTIONS],
+                "n_ia_events": agg[_IA],
+                "n_gen_add": agg[_GEN],
+                "ai_used": int(agg[_IA] > 0),
+                "correction_ratio": (
+                    agg[_CORRECTIONS] / n_actions if n_actions > 0 else None
+                ),
+                "duration_s": agg[_DURATION],
+                "similarity": agg[_SIMILARITY],
+            }
+        )
+
+    out.sort(key=lambda r: (r["session_id"], r["trial_index"]))
+    return out
+
+
+def _mean(values):
+    values = [v for v in values if v is not None]
+    return statistics.fmean(values) if values else None
+
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+
+def compute_sessions(trial_rows):
+    """Agrège la table par essai en une ligne par session (comme le notebook)."""
+    by_session = {}
+    for r in trial_rows:
+        by_session.setdefault((r["session_id"], r["condition"]), []).append(r)
+
+    out = []
+    for (sid, condition), rows in by_session.items():
+        corrections = [r["n_corrections"] for r in rows]
+        out.append(
+            {
+                "session_id": sid,
+                "condition": condition,
+                "mean_duration_s": _mean(r["duration_s"] for r in rows),
+                "median_duration_s": _median(r["duration_s"] for r in rows),
+                "mean_corrections": _mean(corrections),
+                "total_corrections": sum(corrections),
+                "mean_correction_ratio": _mean(r["correction_ratio"] for r in rows),
+                "total_ia_events": sum(r["n_ia_events"] for r in rows),
+                "total_gen_add": sum(r["n_gen_add"] for r in rows),
+                "ai_used_any": max(r["ai_used"] for r in rows),
+            }
+        )
+    return out
+
+
+def _write_csv(rows, columns, path):
+    def write(f):
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for r in rows:
+            writer.writerow({k: ("" if v is None else v) for k, v in r.items()})
+
+    if path in (None, "-"):
+        write(sys.stdout)
+    else:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            write(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Métriques par essai (streaming)")
+    parser.add_argument("inputs", nargs="+", help="fichiers .csv/.sklog ou dossiers")
+    parser.add_argument("-o", "--output", help="table par essai (défaut : stdout)")
+    parser.add_argument("--sessions", help="table par session (optionnel)")
+    parser.add_argument("-j", "--jobs", type=int, default=None)
+    parser.add_argument(
+        "--all-sessions",
+        action="store_true",
+        help="garder aussi les sessions incomplètes",
+    )
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("aucun fichier de log trouvé")
+
+    trials = compute_trials(
+        paths, jobs=args.jobs, complete_only=not args.all_sessions
+    )
+    _write_csv(trials, TRIAL_COLUMNS, args.output)
+    if args.sessions:
+        _write_csv(compute_sessions(trials), SESSION_COLUMNS, args.sessions)
+
+    n_sessions = len({r["session_id"] for r in trials})
+    print(f"{len(trials)} essais, {n_sessions} sessions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,529 @@
+"""
+logs/binlog.py
+
+Format de log binaire compact (alternative au CSV) + export CSV à la demande.
+
+Pourquoi ?
+- En CSV, chaque ligne répète le timestamp ISO, le session_id (36 caractères),
+  la condition, la tâche...
+- Ici, toutes les chaînes sont "internées" dans un dictionnaire propre au fichier
+  (chaque chaîne n'est écrite qu'une fois), les timestamps sont des int64 (ns)
+  et le contexte (session/condition/tâche/essai) n'est réécrit que lorsqu'il change.
+
+Deux dictionnaires de chaînes :
+- "symboles" (u16) : valeurs peu variées (session, condition, event_type, tool, ...)
+- "textes"   (u32) : valeurs libres (notes, champs additionnels texte)
+
+Structure du fichier (little-endian) :
+- en-tête : MAGIC + u16 longueur + noms de colonnes (utf-8, séparés par des virgules)
+- puis une suite d'enregistrements, identifiés par leur premier octet :
+  - b"S" : nouveau symbole  (u32 longueur + utf-8) -> id = prochain id libre
+  - b"T" : nouveau texte    (u32 longueur + utf-8) -> id = prochain id libre
+  - b"C" : contexte courant (4 x u16 : session, condition, task_id, trial_index)
+  - b"E" : événement        (i64 ts_ns, u16 event_type, u8 masque)
+           puis, selon le masque : u16 tool, u16 item_type, u32 notes,
+           i32 n_points, u8 n_extra + n_extra champs typés (u16 clé, u8 type, valeur)
+
+L'id 0 est réservé à la chaîne vide dans les deux dictionnaires.
+
+Usage (depuis la racine du projet) :
+    python -m logs.binlog export logs/events.sklog -o logs/events.csv
+    python -m logs.binlog pack logs/events_all.csv -o logs/events_all.sklog
+"""
+
+import argparse
+import csv
+import mmap
+import os
+import struct
+import sys
+
+from logs.schema import column_type
+from logs.timeutil import iso_from_ns, parse_timestamp
+
+MAGIC = b"SKLOG\x01"
+
+_HEADER_LEN = struct.Struct("<H")
+_STRING = struct.Struct("<BI")
+_CONTEXT = struct.Struct("<BHHHH")
+_EVENT = struct.Struct("<BqHB")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_I32 = struct.Struct("<i")
+_EXTRA_KEY = struct.Struct("<HB")
+
+_TAG_SYMBOL = ord("S")
+_TAG_TEXT = ord("T")
+_TAG_CONTEXT = ord("C")
+_TAG_EVENT = ord("E")
+
+# Bits du masque d'un événement (champs présents)
+_HAS_TOOL = 1
+_HAS_ITEM_TYPE = 2
+_HAS_NOTES = 4
+_HAS_N_POINTS = 8
+_HAS_EXTRAS = 16
+
+# Types des champs additionnels
+_T_STR = 0
+_T_INT = 1
+_T_FLOAT = 2
+
+_VALUE_STRUCTS = {
+    _T_STR: _U32,
+    _T_INT: struct.Struct("<q"),
+    _T_FLOAT: struct.Struct("<d"),
+}
+
+# Colonnes stockées directement dans les enregistrements C / E
+_CONTEXT_FIELDS = ("session_id", "condition", "task_id", "trial_index")
+_EVENT_FIELDS = ("timestamp", "event_type", "tool", "item_type", "notes", "n_points")
+_BASE_FIELDS = set(_CONTEXT_FIELDS) | set(_EVENT_FIELDS)
+
+
+class BinaryLogError(ValueError):
+    """Fichier illisible (en-tête, tag inconnu) ou limite du format atteinte."""
+
+
+class _StringTable:
+    def __init__(self, max_id=None):
+        self.ids = {"": 0}
+        self.strings = [""]
+        self.max_id = max_id
+
+    def add(self, s: str) -> int:
+        sid = len(self.strings)
+        if self.max_id is not None and sid > self.max_id:
+            raise BinaryLogError(
+                f"dictionnaire plein ({self.max_id + 1} chaînes distinctes) : {s!r}"
+            )
+        self.ids[s] = sid
+        self.strings.append(s)
+        return sid
+
+    def truncate(self, n):
+        """Oublie les chaînes ajoutées après les `n` premières."""
+        for s in self.strings[n:]:
+            del self.ids[s]
+        del self.strings[n:]
+
+
+def _read_header(buf):
+    """Retourne (fieldnames, offset du premier enregistrement)."""
+    if bytes(buf[: len(MAGIC)]) != MAGIC:
+        raise BinaryLogError("en-tête binaire invalide")
+    pos = len(MAGIC)
+    (hlen,) = _HEADER_LEN.unpack_from(buf, pos)
+    pos += _HEADER_LEN.size
+    fieldnames = bytes(buf[pos : pos + hlen]).decode("utf-8").split(",")
+    return fieldnames, pos + hlen
+
+
+def _scan(buf, symbols, texts, pos, ctx=(0, 0, 0, 0), end=None, tail=None):
+    """
+    Parcourt un buffer binaire (bytes / mmap) de `pos` à `end` et produit des tuples
+    (ts_ns, ctx, event_type, tool, item_type, notes, n_points, extras, offset) d'ids,
+    en complétant les dictionnaires `symbols` / `texts` au passage (None : tables
+    déjà complètes, reprise au milieu du fichier). `offset` = début de
+    l'enregistrement ; `ctx` = contexte courant à `pos`.
+
+    `tail` (dict) : reçoit en fin de parcours "end", la fin du dernier
+    enregistrement complet (avant une fin tronquée), et "ctx", le contexte à
+    cet offset.
+    """
+    end = len(buf) if end is None else end
+    unpack_event = _EVENT.unpack_from
+    u16 = _U16.unpack_from
+    u32 = _U32.unpack_from
+
+    start = pos
+    try:
+        while pos < end:
+            start = pos
+            tag = buf[pos]
+
+            if tag == _TAG_EVENT:
+                _, ts, ev, mask = unpack_event(buf, pos)
+                pos += _EVENT.size
+                tool = itype = notes = 0
+                npts = -1
+                extras = None
+                if mask:
+                    if mask & _HAS_TOOL:
+                        (tool,) = u16(buf, pos)
+                        pos += 2
+                    if mask & _HAS_ITEM_TYPE:
+                        (itype,) = u16(buf, pos)
+                        pos += 2
+                    if mask & _HAS_NOTES:
+                        (notes,) = u32(buf, pos)
+                        pos += 4
+                    if mask & _HAS_N_POINTS:
+                        (npts,) = _I32.unpack_from(buf, pos)
+                        pos += 4
+                    if mask & _HAS_EXTRAS:
+                        n_extra = buf[pos]
+                        pos += 1
+                        extras = []
+                        for _ in range(n_extra):
+                            key, vtype = _EXTRA_KEY.unpack_from(buf, pos)
+                            pos += _EXTRA_KEY.size
+                            vs = _VALUE_STRUCTS[vtype]
+                            (val,) = vs.unpack_from(buf, pos)
+                            pos += vs.size
+                            extras.append((key, vtype, val))
+                yield ts, ctx, ev, tool, itype, notes, npts, extras, start
+
+            elif tag == _TAG_SYMBOL or tag == _TAG_TEXT:
+                _, n = _STRING.unpack_from(buf, pos)
+                pos += _STRING.size
+                if pos + n > end:
+                    break  # chaîne tronquée (crash pendant l'écriture)
+                table = symbols if tag == _TAG_SYMBOL else texts
+                if table is not None:
+                    table.add(bytes(buf[pos : pos + n]).decode("utf-8"))
+                pos += n
+
+            elif tag == _TAG_CONTEXT:
+                ctx = _CONTEXT.unpack_from(buf, pos)[1:]
+                pos += _CONTEXT.size
+
+            else:
+                raise BinaryLogError(f"tag inconnu {tag!r} à l'offset {pos}")
+        else:
+            start = pos
+    except struct.error:
+        # Fin de fichier tronquée (crash pendant l'écriture) : on s'arrête proprement
+        pass
+    if tail is not None:
+        tail["end"] = start
+        tail["ctx"] = ctx
+
+
+class BinarySink:
+    """
+    Destination binaire pour EventLogger (même interface que CsvSink).
+
+    Les lignes reçues sont des dicts {colonne: valeur} avec `timestamp` en ns.
+    """
+
+    def __init__(self, path, fieldnames):
+        self.path = path
+        self.fieldnames = fieldnames
+        self._symbols = _StringTable(max_id=0xFFFF)  # ids écrits en u16
+        self._texts = _StringTable(max_id=0xFFFFFFFF)
+        self._ctx = None
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            self._f = self._resume()
+        else:
+            self._f = open(self.path, "wb")
+            names = ",".join(self.fieldnames).encode("utf-8")
+            self._f.write(MAGIC + _HEADER_LEN.pack(len(names)) + names)
+            self._f.flush()
+
+    def _resume(self):
+        """
+        Reprise d'un fichier existant : reconstruit les dictionnaires de chaînes
+        et coupe un éventuel enregistrement partiel en fin de fichier (crash),
+        sinon les enregistrements ajoutés derrière seraient illisibles.
+        """
+        with open(self.path, "rb") as f:
+            data = f.read()
+        fieldnames, pos = _read_header(data)
+        if fieldnames != list(self.fieldnames):
+            raise BinaryLogError(
+                f"{self.path} : colonnes de l'en-tête différentes du schéma courant"
+            )
+        tail = {}
+        for _rec in _scan(data, self._symbols, self._texts, pos, tail=tail):
+            pass
+        self._ctx = tail["ctx"]
+
+        f = open(self.path, "r+b")
+        f.truncate(tail["end"])
+        f.seek(tail["end"])
+        return f
+
+    @staticmethod
+    def _intern(table, tag, value, out) -> int:
+        s = "" if value is None else str(value)
+        sid = table.ids.get(s)
+        if sid is None:
+            sid = table.add(s)
+            data = s.encode("utf-8")
+            out.append(_STRING.pack(tag, len(data)))
+            out.append(data)
+        return sid
+
+    def _symbol(self, value, out) -> int:
+        return self._intern(self._symbols, _TAG_SYMBOL, value, out)
+
+    def _text(self, value, out) -> int:
+        return self._intern(self._texts, _TAG_TEXT, value, out)
+
+    def _encode(self, row, out):
+        symbol = self._symbol
+
+        ctx = tuple(symbol(row.get(k, ""), out) for k in _CONTEXT_FIELDS)
+        if ctx != self._ctx:
+            out.append(_CONTEXT.pack(_TAG_CONTEXT, *ctx))
+            self._ctx = ctx
+
+        mask = 0
+        tail = []
+
+        tool = row.get("tool", "")
+        if tool not in ("", None):
+            mask |= _HAS_TOOL
+            tail.append(_U16.pack(symbol(tool, out)))
+
+        itype = row.get("item_type", "")
+        if itype not in ("", None):
+            mask |= _HAS_ITEM_TYPE
+            tail.append(_U16.pack(symbol(itype, out)))
+
+        notes = row.get("notes", "")
+        if notes not in ("", None):
+            mask |= _HAS_NOTES
+            tail.append(_U32.pack(self._text(notes, out)))
+
+        extras = []
+
+        npts = row.get("n_points", "")
+        if npts not in ("", None):
+            try:
+                tail.append(_I32.pack(int(npts)))
+                mask |= _HAS_N_POINTS
+            except (TypeError, ValueError):
+                # Valeur non entière : conservée telle quelle en champ additionnel
+                extras.append((symbol("n_points", out), _T_STR, self._text(npts, out)))
+
+        for key, value in row.items():
+            if key in _BASE_FIELDS or value == "" or value is None:
+                continue
+            if isinstance(value, bool):
+                value = str(value)
+            if isinstance(value, int):
+                extras.append((symbol(key, out), _T_INT, value))
+            elif isinstance(value, float):
+                extras.append((symbol(key, out), _T_FLOAT, value))
+            else:
+                extras.append((symbol(key, out), _T_STR, self._text(value, out)))
+
+        if extras:
+            mask |= _HAS_EXTRAS
+            tail.append(_U8.pack(len(extras)))
+            for key, vtype, val in extras:
+                tail.append(_EXTRA_KEY.pack(key, vtype))
+                tail.append(_VALUE_STRUCTS[vtype].pack(val))
+
+        out.append(
+            _EVENT.pack(
+                _TAG_EVENT,
+                int(row["timestamp"]),
+                symbol(row.get("event_type", ""), out),
+                mask,
+            )
+        )
+        out.extend(tail)
+
+    def write_rows(self, rows):
+        out = []
+        error = None
+        for row in rows:
+            mark = (len(out), len(self._symbols.strings), len(self._texts.strings))
+            ctx = self._ctx
+            try:
+                self._encode(row, out)
+            except (BinaryLogError, TypeError, ValueError) as exc:
+                # Ligne refusée : on revient à l'état d'avant la ligne (chaînes
+                # non écrites oubliées), les autres lignes sont écrites
+                del out[mark[0] :]
+                self._symbols.truncate(mark[1])
+                self._texts.truncate(mark[2])
+                self._ctx = ctx
+                error = error or exc
+        self._f.write(b"".join(out))
+        if error is not None:
+            raise error
+
+    def flush(self):
+        self._f.flush()
+
+    def close(self):
+        if not self._f.closed:
+            self._f.flush()
+            self._f.close()
+
+
+def _make_row(fieldnames, sym, txt, rec, iso_timestamps):
+    ts, ctx, ev, tool, itype, notes, npts, extras, _offset = rec
+    row = dict.fromkeys(fieldnames, "")
+    row["timestamp"] = iso_from_ns(ts) if iso_timestamps else ts
+    row["session_id"] = sym[ctx[0]]
+    row["condition"] = sym[ctx[1]]
+    row["task_id"] = sym[ctx[2]]
+    row["trial_index"] = sym[ctx[3]]
+    row["event_type"] = sym[ev]
+    row["tool"] = sym[tool]
+    row["item_type"] = sym[itype]
+    row["notes"] = txt[notes]
+    if npts >= 0:
+        row["n_points"] = str(npts)
+    if extras:
+        for key, vtype, val in extras:
+            row[sym[key]] = txt[val] if vtype == _T_STR else val
+    return row
+
+
+def iter_rows(path, iso_timestamps=True):
+    """
+    Relit un fichier binaire et produit des dicts au schéma CSV historique.
+
+    iso_timestamps=False => `timestamp` reste un entier (ns), plus rapide pour l'analyse.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    fieldnames, pos = _read_header(data)
+    symbols, texts = _StringTable(), _StringTable()
+    sym, txt = symbols.strings, texts.strings
+
+    for rec in _scan(data, symbols, texts, pos):
+        yield _make_row(fieldnames, sym, txt, rec, iso_timestamps)
+
+
+class BinaryLogReader:
+    """
+    Fichier binaire projeté en mémoire, relu par plages : scan() le parcourt
+    une fois (dictionnaires de chaînes complets, offset et contexte de chaque
+    événement) ; rows(start, end, ctx) décode ensuite une plage sans repartir
+    du début du fichier.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, "rb")
+        try:
+            self._buf = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # fichier vide
+            self._f.close()
+            raise BinaryLogError(f"{path} : fichier vide")
+        self.fieldnames, self.data_start = _read_header(self._buf)
+        self.size = len(self._buf)
+        self._symbols, self._texts = _StringTable(), _StringTable()
+
+    def scan(self):
+        """(offset, ctx, ts_ns) de chaque événement, dans l'ordre du fichier."""
+        for rec in _scan(self._buf, self._symbols, self._texts, self.data_start):
+            yield rec[8], rec[1], rec[0]
+
+    def rows(self, start, end, ctx, iso_timestamps=True):
+        """
+        Lignes des événements de [start, end) ; `ctx` : contexte à `start`.
+        Suppose scan() déjà parcouru en entier (dictionnaires complets).
+        """
+        sym, txt = self._symbols.strings, self._texts.strings
+        for rec in _scan(self._buf, None, None, start, ctx, end):
+            yield _make_row(self.fieldnames, sym, txt, rec, iso_timestamps)
+
+    def close(self):
+        if not self._buf.closed:
+            self._buf.close()
+            self._f.close()
+
+
+def read_fieldnames(path):
+    """Colonnes déclarées dans l'en-tête d'un fichier binaire."""
+    with open(path, "rb") as f:
+        head = f.read(len(MAGIC) + _HEADER_LEN.size)
+        if head[: len(MAGIC)] != MAGIC:
+            raise BinaryLogError("en-tête binaire invalide")
+        (hlen,) = _HEADER_LEN.unpack_from(head, len(MAGIC))
+        return f.read(hlen).decode("utf-8").split(",")
+
+
+def export_csv(src, out):
+    """Écrit le contenu d'un fichier binaire au format CSV dans le flux `out`."""
+    fieldnames = read_fieldnames(src)
+    writer = csv.DictWriter(out, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    n = 0
+    for row in iter_rows(src):
+        writer.writerow(row)
+        n += 1
+    return n
+
+
+def pack_csv(src, dst):
+    """Convertit un CSV existant (schéma EventLogger) en fichier binaire (écrasé)."""
+    if os.path.exists(dst):
+        os.remove(dst)
+    with open(src, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        sink = BinarySink(dst, reader.fieldnames)
+        # Colonnes numériques du schéma : stockées typées plutôt qu'en texte
+        numeric = [
+            (k, column_type(k))
+            for k in reader.fieldnames
+            if column_type(k) in (int, float)
+        ]
+        n = 0
+        batch = []
+        for row in reader:
+            row["timestamp"] = parse_timestamp(row["timestamp"])
+            for key, ftype in numeric:
+                if row[key] != "":
+                    try:
+                        row[key] = ftype(row[key])
+                    except ValueError:
+                        pass
+            batch.append(row)
+            if len(batch) >= 1024:
+                sink.write_rows(batch)
+                n += len(batch)
+                batch.clear()
+        sink.write_rows(batch)
+        n += len(batch)
+        sink.close()
+    return n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Logs binaires Sketch Helper")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_exp = sub.add_parser("export", help="binaire -> CSV (schéma historique)")
+    p_exp.add_argument("src")
+    p_exp.add_argument("-o", "--output", help="fichier CSV (défaut : stdout)")
+
+    p_pack = sub.add_parser("pack", help="CSV -> binaire")
+    p_pack.add_argument("src")
+    p_pack.add_argument("-o", "--output", required=True)
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "export":
+        if args.output:
+            with open(args.output, "w", newline="", encoding="utf-8") as out:
+                n = export_csv(args.src, out)
+        else:
+            n = export_csv(args.src, sys.stdout)
+        print(f"{n} événements exportés", file=sys.stderr)
+
+    elif args.cmd == "pack":
+        n = pack_csv(args.src, args.output)
+        before = os.path.getsize(args.src)
+        after = os.path.getsize(args.output)
+        print(
+            f"{n} événements : {before} -> {after} octets ({before / max(after, 1):.1f}x)",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
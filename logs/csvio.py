@@ -0,0 +1,76 @@
+"""
+logs/csvio.py
+
+Lecture CSV "bas niveau" avec positions en octets.
+
+csv.DictReader ne permet pas de savoir où commence chaque ligne dans le fichier.
+Ici on lit le fichier en binaire, ligne par ligne, et on produit pour chaque
+enregistrement son offset de début : utile pour reprendre une lecture
+(merge par segments, index, suivi en direct d'un fichier qui grossit).
+
+Les champs entre guillemets contenant des retours à la ligne sont gérés
+(on accumule les lignes tant que le nombre de guillemets est impair).
+"""
+
+import csv
+
+
+def parse_record(raw: bytes):
+    """Décode un enregistrement CSV brut (une ou plusieurs lignes physiques)."""
+    return next(csv.reader([raw.decode("utf-8").rstrip("\r\n")]), [])
+
+
+def iter_raw_records(f, start=0, end=None, complete_only=False):
+    """
+    Parcourt un fichier ouvert en binaire et produit (offset, octets bruts)
+    pour chaque enregistrement CSV entre `start` et `end`.
+
+    complete_only=True : ignore un dernier enregistrement sans fin de ligne
+    (fichier en cours d'écriture par un autre processus).
+    """
+    f.seek(start)
+    pos = start
+    rec_start = None
+    parts = []
+    quotes = 0
+
+    for line in f:
+        if rec_start is None:
+            rec_start = pos
+        pos += len(line)
+
+        parts.append(line)
+        quotes += line.count(b'"')
+        if quotes % 2:
+            # Champ entre guillemets encore ouvert : la ligne physique suivante
+            # fait partie du même enregistrement
+            if end is not None and pos >= end:
+                break
+            continue
+
+        raw = b"".join(parts) if len(parts) > 1 else line
+        offset = rec_start
+        parts = []
+        quotes = 0
+        rec_start = None
+
+        if complete_only and not raw.endswith(b"\n"):
+            return
+        if raw.strip():
+            yield offset, raw
+        if end is not None and pos >= end:
+            return
+
+
+def iter_records(f, start=0, end=None, complete_only=False):
+    """Comme iter_raw_records, mais produit (offset, liste de champs)."""
+    for offset, raw in iter_raw_records(f, start, end, complete_only):
+        yield offset, parse_record(raw)
+
+
+def read_header(path):
+    """Retourne (fieldnames, offset de la première ligne de données)."""
+    with open(path, "rb") as f:
+        for offset, raw in iter_raw_records(f):
+            return parse_record(raw), offset + len(raw)
+    return [], 0
@@ -0,0 +1,292 @@
+"""
+logs/dashboard.py
+
+Tableau de bord "en direct" pendant les sessions d'étude (vue terminal).
+
+Suit les fichiers de logs CSV (segments de logs/segments/ ou un fichier unique)
+comme `tail -f` : pour chaque fichier on retient l'offset déjà lu et on ne lit
+que les octets ajoutés depuis, sans jamais relire ce qui a été consommé.
+Les agrégats sont mis à jour incrémentalement :
+- essais terminés par condition et durée moyenne (trial_end)
+- acceptations / refus de suggestions (assistant_*, autosuggest_*)
+- undo par essai et ratio undo / actions
+
+Coût : un os.stat par fichier et par rafraîchissement ; les nouveaux octets sont
+découpés en lignes complètes puis décodés d'un bloc par le module csv (C).
+
+Seuls les CSV sont suivis (un .sklog ne se relit pas par morceaux sans ses
+tables de chaînes) ; les lignes agrégées (colonne `count`) comptent pour
+`count` événements.
+
+Usage (depuis la racine du projet) :
+    python -m logs.dashboard logs/segments
+    python -m logs.dashboard logs/segments --once
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+import time
+from datetime import datetime
+
+from logs.analytics import ACTION_EVENTS
+
+ACCEPT_EVENTS = frozenset({"assistant_accept", "autosuggest_accept"})
+REJECT_EVENTS = frozenset({"assistant_reject", "autosuggest_reject"})
+UNDO_EVENTS = frozenset({"undo"})
+
+_COLUMNS = ("condition", "event_type", "duration_s", "notes", "count")
+
+
+def _complete_prefix(data: bytes) -> int:
+    """
+    Longueur du plus long préfixe de `data` fait d'enregistrements CSV complets
+    (se terminant par un retour à la ligne hors guillemets).
+    """
+    end = data.rfind(b"\n") + 1
+    # Un "\n" est hors guillemets si le nombre de guillemets avant lui est pair
+    quotes = data.count(b'"', 0, end)
+    while end > 0 and quotes % 2:
+        prev = data.rfind(b"\n", 0, end - 1) + 1
+        quotes -= data.count(b'"', prev, end)
+        end = prev
+    return end
+
+
+class ConditionStats:
+    """Agrégats additifs d'une condition expérimentale."""
+
+    __slots__ = (
+        "events",
+        "trials",
+        "duration_sum",
+        "duration_n",
+        "accepts",
+        "rejects",
+        "undos",
+        "actions",
+    )
+
+    def __init__(self):
+        self.events = 0
+        self.trials = 0
+        self.duration_sum = 0.0
+        self.duration_n = 0
+        self.accepts = 0
+        self.rejects = 0
+        self.undos = 0
+        self.actions = 0
+
+    def add(self, other):
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+def _duration(value, notes):
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    # Anciens fichiers : notes "duration_s=12.345"
+    name, sep, rest = notes.partition("=")
+    if sep and name == "duration_s":
+        try:
+            return float(rest)
+        except ValueError:
+            pass
+    return None
+
+
+class _TailedFile:
+    """Un fichier suivi : offset lu + agrégats par condition de ce fichier."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.ino = None
+        self.cols = None
+        self.ignored = False
+        self.stats = {}
+
+    def _reset(self):
+        self.offset = 0
+        self.cols = None
+        self.ignored = False
+        self.stats = {}
+
+    def poll(self):
+        """Consomme les lignes complètes ajoutées. Retourne le nb de lignes lues."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return 0
+        size = st.st_size
+        if st.st_ino != self.ino or size < self.offset:
+            # Fichier tronqué ou remplacé (rotation, même plus gros) : on repart
+            # de zéro pour ce fichier
+            self._reset()
+            self.ino = st.st_ino
+        if self.ignored or size == self.offset:
+            return 0
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        end = _complete_prefix(data)
+        if end == 0:
+            return 0
+        self.offset += end
+
+        reader = csv.reader(io.StringIO(data[:end].decode("utf-8"), newline=""))
+        if self.cols is None:
+            header = next(reader, None)
+            if header is None:
+                return 0
+            self.cols = [header.index(c) if c in header else None for c in _COLUMNS]
+            if self.cols[1] is None:
+                msg = f"{self.path} : colonne event_type absente, ignoré"
+                print(msg, file=sys.stderr)
+                self.ignored = True
+                return 0
+        return self._consume(reader)
+
+    def _consume(self, reader):
+        c_cond, c_ev, c_dur, c_notes, c_count = self.cols
+        width = max(c for c in self.cols if c is not None) + 1
+        stats = self.stats
+        n_rows = 0
+
+        for row in reader:
+            if len(row) < width:
+                continue
+            n_rows += 1
+            cond = row[c_cond] if c_cond is not None else ""
+            st = stats.get(cond)
+            if st is None:
+                st = stats[cond] = ConditionStats()
+
+            n = 1
+            if c_count is not None and row[c_count]:
+                n = int(row[c_count])
+            st.events += n
+
+            ev = row[c_ev]
+            if ev == "trial_end":
+                st.trials += 1
+                d = _duration(
+                    row[c_dur] if c_dur is not None else "",
+                    row[c_notes] if c_notes is not None else "",
+                )
+                if d is not None:
+                    st.duration_sum += d
+                    st.duration_n += 1
+            elif ev in ACTION_EVENTS:
+                st.actions += n
+            elif ev in UNDO_EVENTS:
+                st.undos += n
+            elif ev in ACCEPT_EVENTS:
+                st.accepts += n
+            elif ev in REJECT_EVENTS:
+                st.rejects += n
+        return n_rows
+
+
+class Dashboard:
+    """Suit des fichiers / dossiers de logs et agrège par condition."""
+
+    def __init__(self, inputs):
+        self.inputs = list(inputs)
+        self.files = {}
+        self.total_rows = 0
+
+    def _discover(self):
+        # Les nouveaux segments (nouvelle session sur un poste) sont pris en compte
+        for p in self.inputs:
+            if os.path.isdir(p):
+                for name in os.listdir(p):
+                    if name.endswith(".csv"):
+                        path = os.path.join(p, name)
+                        if path not in self.files:
+                            self.files[path] = _TailedFile(path)
+            elif p not in self.files and p.endswith(".csv"):
+                self.files[p] = _TailedFile(p)
+
+    def poll(self):
+        self._discover()
+        n = 0
+        for tailed in self.files.values():
+            n += tailed.poll()
+        self.total_rows += n
+        return n
+
+    def totals(self):
+        """{condition: ConditionStats} toutes sources confondues."""
+        out = {}
+        for tailed in self.files.values():
+            for cond, st in tailed.stats.items():
+                out.setdefault(cond, ConditionStats()).add(st)
+        return out
+
+
+def _fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def render(dashboard, rate=None):
+    lines = [
+        f"Sketch Helper - suivi en direct   {datetime.now():%H:%M:%S}   "
+        f"{len(dashboard.files)} fichier(s), {dashboard.total_rows} lignes"
+        + (f" (+{rate:.0f}/s)" if rate is not None else ""),
+        "",
+        f"{'condition':<14}{'essais':>8}{'durée moy':>11}{'undo/essai':>12}"
+        f"{'undo/action':>13}{'acceptées':>11}{'refusées':>10}{'taux acc.':>11}",
+    ]
+    for cond, st in sorted(dashboard.totals().items()):
+        if not cond:
+            continue  # événements hors test (session_start, menus...)
+        decided = st.accepts + st.rejects
+        lines.append(
+            f"{cond or '(aucune)':<14}{st.trials:>8}"
+            f"{_fmt(st.duration_sum / st.duration_n if st.duration_n else None, '.1f'):>11}"
+            f"{_fmt(st.undos / st.trials if st.trials else None, '.2f'):>12}"
+            f"{_fmt(st.undos / st.actions if st.actions else None, '.2f'):>13}"
+            f"{st.accepts:>11}{st.rejects:>10}"
+            f"{_fmt(st.accepts / decided if decided else None, '.0%'):>11}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suivi en direct des logs CSV")
+    parser.add_argument("inputs", nargs="+", help="fichiers .csv ou dossiers")
+    parser.add_argument("--interval", type=float, default=1.0, help="secondes")
+    parser.add_argument("--once", action="store_true", help="un seul affichage")
+    args = parser.parse_args(argv)
+
+    dash = Dashboard(args.inputs)
+    dash.poll()
+    if args.once:
+        print(render(dash))
+        return
+
+    last = time.monotonic()
+    rate = None
+    try:
+        while True:
+            # Efface l'écran (séquence ANSI) puis réaffiche
+            sys.stdout.write("\x1b[H\x1b[2J" + render(dash, rate) + "\n")
+            sys.stdout.flush()
+            time.sleep(args.interval)
+            n = dash.poll()
+            now = time.monotonic()
+            rate = n / (now - last)
+            last = now
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
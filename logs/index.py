@@ -0,0 +1,281 @@
+"""
+logs/index.py
+
+Index "sidecar" d'un fichier de logs CSV : (session_id, task_id, trial_index)
+-> plages d'octets dans le fichier.
+
+Principe :
+- l'index est un petit fichier texte à côté du log (`events_all.csv.idx`), une
+  ligne par plage contiguë de lignes ayant la même clé
+- mise à jour incrémentale : update() ne lit que les octets ajoutés depuis la
+  dernière mise à jour (les plages adjacentes d'une même clé sont fusionnées
+  au chargement)
+- lecture : read_rows() ouvre le log en mmap et ne décode que les plages
+  demandées (une session, un essai) au lieu de tout le fichier
+
+L'index ne concerne que les CSV : un enregistrement binaire (.sklog) dépend des
+tables de chaînes qui le précèdent, il ne peut pas être relu isolément.
+
+Usage (depuis la racine du projet) :
+    python -m logs.index build logs/events_all.csv
+    python -m logs.index show logs/events_all.csv <session_id> [task_id trial_index]
+"""
+
+import argparse
+import csv
+import io
+import mmap
+import os
+import sys
+
+from logs.csvio import iter_raw_records, parse_record, read_header
+
+INDEX_SUFFIX = ".idx"
+
+# Première ligne du fichier d'index : identifie le log indexé (un fichier
+# remplacé, ex : par logs.merge, a un autre inode => index reconstruit)
+_MAGIC = "#sklog-index 1"
+
+
+def index_path(log_path):
+    return log_path + INDEX_SUFFIX
+
+
+class SessionIndex:
+    """
+    Index d'un log CSV.
+
+    - ranges(session_id, task_id=None, trial_index=None) : plages (début, fin)
+    - read_rows(...) : lignes (dicts) de la session / de l'essai, via mmap
+    - update() : indexe les lignes ajoutées depuis le dernier appel
+    """
+
+    def __init__(self, log_path):
+        self.log_path = log_path
+        self.path = index_path(log_path)
+        self.fieldnames = []
+        self.indexed_end = 0  # octets du log déjà indexés
+
+        self._by_key = {}  # (session, task, trial) -> [[début, fin], ...]
+        self._by_session = {}  # session -> [[début, fin], ...]
+        self._last = None  # (clé, plage) de la dernière ligne indexée
+        self._fingerprint = None
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Construction / mise à jour
+    # ------------------------------------------------------------------
+    def _current_fingerprint(self):
+        st = os.stat(self.log_path)
+        return f"{st.st_dev}:{st.st_ino}"
+
+    def _reset(self):
+        self.fieldnames = []
+        self.indexed_end = 0
+        self._by_key.clear()
+        self._by_session.clear()
+        self._last = None
+        self._fingerprint = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _load(self):
+        if not os.path.exists(self.log_path) or not os.path.exists(self.path):
+            return
+        with open(self.path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            first = next(reader, None)
+            if not first or first[0] != _MAGIC or len(first) < 3:
+                return self._reset()
+            fingerprint, data_start = first[1], int(first[2])
+            if fingerprint != self._current_fingerprint():
+                return self._reset()
+            self._fingerprint = fingerprint
+            self.fieldnames, _ = read_header(self.log_path)
+            self.indexed_end = data_start
+            for sid, task_id, trial_index, start, end in reader:
+                self._add((sid, task_id, trial_index), int(start), int(end))
+
+        # Fichier tronqué / réécrit sur place : l'index ne correspond plus
+        if os.path.getsize(self.log_path) < self.indexed_end:
+            self._reset()
+
+    def _add(self, key, start, end):
+        """Ajoute une plage, en prolongeant la précédente si elle est contiguë."""
+        last = self._last
+        if last is not None and last[0] == key and last[1][1] == start:
+            last[1][1] = end
+            session_ranges = self._by_session[key[0]]
+            if session_ranges[-1][1] == start:
+                session_ranges[-1][1] = end
+            else:
+                session_ranges.append([start, end])
+        else:
+            span = [start, end]
+            self._by_key.setdefault(key, []).append(span)
+            session_ranges = self._by_session.setdefault(key[0], [])
+            if session_ranges and session_ranges[-1][1] == start:
+                session_ranges[-1][1] = end
+            else:
+                session_ranges.append([start, end])
+            self._last = (key, span)
+        self.indexed_end = max(self.indexed_end, end)
+
+    def update(self):
+        """
+        Indexe les lignes complètes ajoutées au log depuis le dernier appel.
+        Retourne le nombre de plages ajoutées au fichier d'index.
+        """
+        if not os.path.exists(self.log_path):
+            return 0
+        if (
+            self._fingerprint is not None
+            and self._fingerprint != self._current_fingerprint()
+        ) or os.path.getsize(self.log_path) < self.indexed_end:
+            self._reset()
+
+        new_entries = []
+        with open(self.log_path, "rb") as f:
+            if self._fingerprint is None:
+                self.fieldnames, data_start = read_header(self.log_path)
+                if not self.fieldnames:
+                    return 0
+                self.indexed_end = data_start
+            # Ancien schéma sans task_id / trial_index : index par session seule
+            header = self.fieldnames
+            cols = [
+                header.index(c) if c in header else None
+                for c in ("session_id", "task_id", "trial_index")
+            ]
+            if cols[0] is None:
+                print(f"{self.log_path} : colonne session_id absente", file=sys.stderr)
+                return 0
+            width = max(c for c in cols if c is not None) + 1
+
+            for offset, raw in iter_raw_records(
+                f, self.indexed_end, complete_only=True
+            ):
+                fields = parse_record(raw)
+                end = offset + len(raw)
+                if len(fields) < width:
+                    self.indexed_end = end
+                    continue
+                key = tuple(fields[c] if c is not None else "" for c in cols)
+                # Lignes contiguës d'une même clé : une seule entrée
+                prev = new_entries[-1] if new_entries else None
+                if prev is not None and prev[0] == key and prev[2] == offset:
+                    prev[2] = end
+                else:
+                    new_entries.append([key, offset, end])
+                self._add(key, offset, end)
+
+        if not new_entries:
+            return 0
+
+        header_needed = self._fingerprint is None
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if header_needed:
+                self._fingerprint = self._current_fingerprint()
+                _, data_start = read_header(self.log_path)
+                writer.writerow([_MAGIC, self._fingerprint, data_start])
+            for key, start, end in new_entries:
+                writer.writerow([*key, start, end])
+        return len(new_entries)
+
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+    def sessions(self):
+        return list(self._by_session)
+
+    def trials(self, session_id):
+        """(task_id, trial_index) des essais d'une session, dans l'ordre du fichier."""
+        return [
+            (task_id, trial_index)
+            for (sid, task_id, trial_index) in self._by_key
+            if sid == session_id and trial_index
+        ]
+
+    def ranges(self, session_id, task_id=None, trial_index=None):
+        """Plages (début, fin) triées ; None = toutes les valeurs."""
+        if task_id is None and trial_index is None:
+            return [tuple(r) for r in self._by_session.get(session_id, ())]
+        if task_id is not None and trial_index is not None:
+            key = (session_id, task_id, str(trial_index))
+            return [tuple(r) for r in self._by_key.get(key, ())]
+        spans = []
+        for (sid, t, i), key_spans in self._by_key.items():
+            if (
+                sid == session_id
+                and (task_id is None or t == task_id)
+                and (trial_index is None or i == str(trial_index))
+            ):
+                spans.extend(tuple(r) for r in key_spans)
+        return sorted(spans)
+
+    def read_rows(self, session_id, task_id=None, trial_index=None):
+        """Lignes (dicts) d'une session ou d'un essai, lues en mmap."""
+        spans = self.ranges(session_id, task_id, trial_index)
+        if not spans:
+            return []
+        rows = []
+        with open(self.log_path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            for start, end in spans:
+                text = mm[start:end].decode("utf-8")
+                for fields in csv.reader(io.StringIO(text, newline="")):
+                    if fields:
+                        rows.append(dict(zip(self.fieldnames, fields)))
+        return rows
+
+
+def open_index(log_path):
+    """Charge l'index du log (s'il existe) et le met à jour."""
+    index = SessionIndex(log_path)
+    index.update()
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index sessions/essais d'un log CSV")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_build = sub.add_parser("build", help="crée / met à jour l'index")
+    p_build.add_argument("log")
+
+    p_show = sub.add_parser("show", help="extrait une session ou un essai en CSV")
+    p_show.add_argument("log")
+    p_show.add_argument("session_id")
+    p_show.add_argument("task_id", nargs="?")
+    p_show.add_argument("trial_index", nargs="?")
+    p_show.add_argument("-o", "--output", help="défaut : stdout")
+
+    args = parser.parse_args(argv)
+    index = open_index(args.log)
+
+    if args.cmd == "build":
+        print(
+            f"{len(index.sessions())} sessions indexées -> {index.path}",
+            file=sys.stderr,
+        )
+        return
+
+    rows = index.read_rows(args.session_id, args.task_id, args.trial_index)
+    out = sys.stdout if args.output in (None, "-") else open(
+        args.output, "w", newline="", encoding="utf-8"
+    )
+    try:
+        writer = csv.DictWriter(out, fieldnames=index.fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{len(rows)} événements", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,358 @@
+import atexit
 import csv
 import os
-from datetime import datetime
+import queue
+import sys
+import threading
+import time
 import uuid
+import warnings
+from datetime import datetime
 
+from logs.binlog import BinarySink
+from logs.index import SessionIndex
+from logs.ring import EventRing
+from logs.schema import EVENT_SCHEMA, all_fieldnames
+from logs.timeutil import iso_from_ns
 
-class EventLogger:
-    def __init__(self, path="events.csv"):
+
+# Événements qui marquent une frontière d'essai : en mode bufferisé, on force
+# l'écriture sur disque juste après eux (aucune perte si l'app crashe ensuite).
+FLUSH_EVENTS = {"test_start", "test_end", "trial_start", "trial_end"}
+
+# Extension de fichier par type de sink
+SINK_EXTENSIONS = {"csv": ".csv", "binary": ".sklog"}
+
+# Messages de contrôle pour le thread d'écriture
+_STOP = object()
+
+
+class _FlushRequest:
+    """Demande de flush ; `done` est signalé quand les lignes sont sur disque."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class CsvSink:
+    """
+    Destination CSV : un seul handle de fichier ouvert pour toute la session
+    (au lieu d'open/append/close à chaque événement).
+
+    Les lignes reçues ont un `timestamp` en ns ; il est formaté en ISO ici
+    (format historique), sauf si iso_timestamps=False : l'entier est alors écrit
+    tel quel, et l'ISO n'est produit qu'à la fusion (python -m logs.merge).
+
+    Si le fichier existe déjà, on réutilise son en-tête (les colonnes absentes
+    de cet en-tête ne sont pas écrites) pour ne jamais désaligner les lignes.
+
+    index=True : l'index sidecar (logs/index.py) est mis à jour à chaque flush.
+    """
+
+    def __init__(self, path, fieldnames, iso_timestamps=True, index=False):
         self.path = path
+        self.fieldnames = fieldnames
+        self.iso_timestamps = iso_timestamps
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                self.fieldnames = next(csv.reader(f), None) or fieldnames
+
+        self._f = open(self.path, "a", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._f)
+
+        # En-tête uniquement si le fichier est vide
+        if self._f.tell() == 0:
+            self._writer.writerow(self.fieldnames)
+            self._f.flush()
+
+        self._index = SessionIndex(self.path) if index else None
+
+    def write_rows(self, rows):
+        out = []
+        for row in rows:
+            values = [row.get(k, "") for k in self.fieldnames]
+            if self.iso_timestamps:
+                values[0] = iso_from_ns(values[0])
+            out.append(values)
+        self._writer.writerows(out)
+
+    def flush(self):
+        self._f.flush()
+        if self._index is not None:
+            self._index.update()
+
+    def close(self):
+        if not self._f.closed:
+            self.flush()
+            self._f.close()
+
+
+class _BackgroundWriter:
+    """
+    Thread d'écriture dédié.
+
+    Le thread GUI ne fait qu'un `put()` dans une file ; ce thread regroupe les
+    lignes et les écrit par lots dans le sink :
+    - dès que `flush_every` lignes sont en attente
+    - ou au plus tard `flush_interval_s` secondes après la première ligne du lot
+    - ou sur demande explicite (flush / close)
+    """
+
+    def __init__(self, sink, build_row, flush_interval_s=0.5, flush_every=64):
+        self._sink = sink
+        self._build_row = build_row
+        self._flush_interval_s = flush_interval_s
+        self._flush_every = flush_every
+
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._run, name="EventLoggerWriter", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, record):
+        self._queue.put(record)
+
+    def flush(self, timeout=2.0):
+        req = _FlushRequest()
+        self._queue.put(req)
+        req.done.wait(timeout)
+
+    def close(self, timeout=2.0):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _write(self, pending):
+        # Aucune exception ne doit tuer ce thread : les événements suivants
+        # seraient perdus et chaque flush() attendrait son délai
+        rows = []
+        for rec in pending:
+            try:
+                rows.append(self._build_row(rec))
+            except Exception as exc:
+                msg = f"EventLogger : événement non écrit ({exc!r})"
+                print(msg, file=sys.stderr)
+        pending.clear()
+        try:
+            if rows:
+                self._sink.write_rows(rows)
+            self._sink.flush()
+        except Exception as exc:
+            print(
+                f"EventLogger : {len(rows)} événement(s) non écrit(s) ({exc!r})",
+                file=sys.stderr,
+            )
+
+    def _run(self):
+        pending = []
+        deadline = None
+
+        while True:
+            timeout = None
+            if deadline is not None:
+                timeout = max(0.0, deadline - time.monotonic())
+
+            try:
+                msg = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # Délai écoulé : on vide le lot courant
+                self._write(pending)
+                deadline = None
+                continue
+
+            if msg is _STOP:
+                self._write(pending)
+                self._sink.close()
+                return
+
+            if isinstance(msg, _FlushRequest):
+                self._write(pending)
+                deadline = None
+                msg.done.set()
+                continue
+
+            pending.append(msg)
+            if deadline is None:
+                deadline = time.monotonic() + self._flush_interval_s
+            if len(pending) >= self._flush_every:
+                self._write(pending)
+                deadline = None
+
+
+class _Burst:
+    """
+    Rafale en cours d'événements identiques (même type, outil et contexte),
+    repliée en une seule ligne : count, t_mono_ns du premier et du dernier,
+    décompte par item_type.
+    """
+
+    def __init__(self, key, record):
+        self.key = key
+        self.record = record
+        self.last_ns = record[0]
+        self.count = 1
+        self.item_types = {}
+        self._add_type(record[5])
+
+    def _add_type(self, fields):
+        itype = fields.get("item_type") or ""
+        self.item_types[itype] = self.item_types.get(itype, 0) + 1
+
+    def accepts(self, key, mono_ns, gap_ns):
+        return key == self.key and mono_ns - self.last_ns <= gap_ns
+
+    def add(self, record):
+        self.last_ns = record[0]
+        self.count += 1
+        self._add_type(record[5])
+
+    def to_record(self):
+        """Événement seul : inchangé. Sinon : ligne de synthèse."""
+        if self.count == 1:
+            return self.record
+
+        mono_ns, condition, task_id, trial_index, event_type, fields = self.record
+        fields = {k: v for k, v in fields.items() if k != "notes"}
+        types = [t for t in self.item_types if t]
+        fields["item_type"] = types[0] if len(types) == 1 else "mixed"
+        fields["item_types"] = ";".join(f"{t}:{n}" for t, n in self.item_types.items())
+        fields["count"] = self.count
+        fields["t_last_mono_ns"] = self.last_ns
+        return (mono_ns, condition, task_id, trial_index, event_type, fields)
+
+
+def segment_path(segment_dir, session_id, sink="csv"):
+    """
+    Chemin du segment d'une session : events_<date>_<session_id>_<pid>.<ext>
+    (le préfixe date rend l'ordre alphabétique ~ chronologique).
+    """
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    name = f"events_{stamp}_{session_id}_{os.getpid()}{SINK_EXTENSIONS[sink]}"
+    return os.path.join(segment_dir, name)
+
+
+class EventLogger:
+    def __init__(
+        self,
+        path="events.csv",
+        buffered=False,
+        flush_interval_s=0.5,
+        flush_every=64,
+        sink="csv",
+        segment_dir=None,
+        iso_timestamps=True,
+        aggregate=(),
+        aggregate_gap_s=1.0,
+        index=False,
+        recent_capacity=4096,
+    ):
+        """
+        Parameters
+        ----------
+        path : str
+            Fichier de destination (ignoré si segment_dir est fourni).
+        buffered : bool
+            False => chaque log() écrit immédiatement (comportement historique).
+            True  => log() se contente d'empiler l'événement ; un thread dédié
+            écrit par lots (voir _BackgroundWriter).
+        flush_interval_s, flush_every :
+            Politique de flush du mode bufferisé (temps / nombre de lignes).
+        sink : str
+            "csv" (défaut, lisible par le notebook) ou "binary" (format compact
+            de logs/binlog.py, exportable en CSV à la demande).
+        segment_dir : str | None
+            Si fourni, chaque session écrit son propre segment dans ce dossier
+            (voir segment_path) : plusieurs instances de l'app peuvent tourner
+            sur la même machine sans écrire dans le même fichier.
+            Les segments se fusionnent ensuite avec `python -m logs.merge`.
+        iso_timestamps : bool
+            Sink CSV uniquement : False => colonne `timestamp` écrite en ns
+            (entier), sans formatage ISO à chaque ligne.
+        aggregate : iterable[str]
+            Types d'événements à haute fréquence (ex : "erase", "select_press")
+            dont les rafales sont repliées en une ligne de synthèse (colonnes
+            count / t_last_mono_ns / item_types, voir logs/schema.py).
+            Une rafale se termine au premier événement différent (type, outil
+            ou contexte), après `aggregate_gap_s` secondes sans répétition,
+            ou à flush() / close(). Les comptes restent exacts pour l'analyse
+            (logs.analytics pondère par `count`).
+        index : bool
+            Sink CSV uniquement : maintient à chaque flush l'index sidecar
+            `<fichier>.idx` (session / essai -> plages d'octets, voir
+            logs/index.py) pour relire un essai sans parcourir tout le fichier.
+        recent_capacity : int
+            Taille de `self.recent` (logs/ring.py) : les derniers événements,
+            avant repli des rafales, interrogeables en mémoire par l'assistant.
+
+        Horodatage : chaque événement porte `t_mono_ns` (time.perf_counter_ns,
+        monotone). L'heure murale n'est lue qu'une fois, à la création du
+        logger (événement session_start) ; le `timestamp` des événements
+        suivants en est dérivé : ancre + écart monotone.
+        """
+        if sink not in SINK_EXTENSIONS:
+            raise ValueError(f"sink inconnu : {sink!r}")
+        if index and sink != "csv":
+            raise ValueError("index : disponible uniquement avec le sink CSV")
 
         # Identifiant de session (déjà présent)
         self.session_id = str(uuid.uuid4())
 
+        if segment_dir is not None:
+            path = segment_path(segment_dir, self.session_id, sink)
+        self.path = path
+
         # --- Contexte expérimental (Solution A) ---
         # Remplis par l'app (une fois pour condition, à chaque essai pour task/trial)
         self.condition = ""  # ex: "H_ONLY" ou "H_PLUS_IA"
         self.task_id = ""  # ex: "cat", "castle", "car"
         self.trial_index = ""  # "1", "2", "3"
 
-        self.fieldnames = [
-            "timestamp",
-            "session_id",
-            "condition",
-            "task_id",
-            "trial_index",
-            "event_type",
-            "tool",
-            "item_type",
-            "n_points",
-            "notes",
-        ]
-
-        self._ensure_header()
+        # Colonnes historiques + colonnes typées déclarées dans logs/schema.py
+        self.fieldnames = all_fieldnames()
+        self._known_fields = frozenset(self.fieldnames)
+
+        # Champs inconnus déjà signalés (un seul avertissement par nom)
+        self._unknown_fields = set()
+
+        # Mémoire courte des événements (lue par l'assistant)
+        self.recent = EventRing(recent_capacity)
+
+        # Repli des rafales (voir _Burst)
+        self._aggregate = frozenset(aggregate)
+        self._aggregate_gap_ns = int(aggregate_gap_s * 1e9)
+        self._burst = None
+
+        # Ancre de la session : seule lecture de l'horloge murale
+        self._anchor_wall_ns = time.time_ns()
+        self._anchor_mono_ns = time.perf_counter_ns()
+
+        if sink == "csv":
+            self._sink = CsvSink(
+                self.path, self.fieldnames, iso_timestamps=iso_timestamps, index=index
+            )
+        else:
+            self._sink = BinarySink(self.path, self.fieldnames)
+
+        self._writer = None
+        if buffered:
+            self._writer = _BackgroundWriter(
+                self._sink,
+                self._build_row,
+                flush_interval_s=flush_interval_s,
+                flush_every=flush_every,
+            )
+
+        # Garantit l'écriture des derniers événements à la fermeture de l'app
+        # (désinscrit par close() : le logger n'est pas retenu jusqu'à la sortie)
+        self._closed = False
+        atexit.register(self.close)
+
+        self._emit(
+            (self._anchor_mono_ns, "", "", "", "session_start", {"pid": os.getpid()})
+        )
 
     def set_context(self, *, condition=None, task_id=None, trial_index=None):
         """Met à jour le contexte utilisé automatiquement sur les prochains logs."""
@@ -41,29 +363,136 @@ class EventLogger:
         if trial_index is not None:
             self.trial_index = str(trial_index)
 
-    def _ensure_header(self):
-        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
-        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
-            with open(self.path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=self.fieldnames)
-                writer.writeheader()
+    def _build_row(self, record):
+        """Construit la ligne CSV (dict) depuis un événement empilé par log()."""
+        mono_ns, condition, task_id, trial_index, event_type, fields = record
 
-    def log(self, event_type: str, **fields):
         row = {k: "" for k in self.fieldnames}
 
-        # Champs obligatoires
-        row["timestamp"] = datetime.now().isoformat()
+        # Champs obligatoires (timestamp en ns, formaté par le sink)
+        row["timestamp"] = self._anchor_wall_ns + (mono_ns - self._anchor_mono_ns)
+        row["t_mono_ns"] = mono_ns
         row["session_id"] = self.session_id
-        row["condition"] = self.condition
-        row["task_id"] = self.task_id
-        row["trial_index"] = self.trial_index
+        row["condition"] = condition
+        row["task_id"] = task_id
+        row["trial_index"] = trial_index
         row["event_type"] = event_type
 
-        # Champs optionnels
+        # Champs optionnels (déjà filtrés et convertis par _check_fields)
+        row.update(fields)
+
+        # Notes au format historique, reconstruites depuis les champs typés
+        spec = EVENT_SCHEMA.get(event_type)
+        if spec is not None and not row["notes"]:
+            row["notes"] = spec.format_notes(row)
+
+        return row
+
+    def _check_fields(self, event_type, fields):
+        """
+        Champs de log() convertis dans le type déclaré par le schéma, sur le
+        thread appelant. Champ non déclaré ou valeur non convertible : ignoré,
+        avec un avertissement qui désigne l'appel à log().
+        """
+        spec = EVENT_SCHEMA.get(event_type)
+        checked = {}
         for key, value in fields.items():
-            if key in row:
-                row[key] = value
+            if key not in self._known_fields:
+                if key not in self._unknown_fields:
+                    self._unknown_fields.add(key)
+                    warnings.warn(
+                        f"champ de log {key!r} non déclaré dans logs/schema.py",
+                        stacklevel=3,
+                    )
+                continue
+            if spec is not None:
+                try:
+                    value = spec.coerce(key, value)
+                except (TypeError, ValueError) as exc:
+                    warnings.warn(
+                        f"champ de log {key!r} de {event_type!r} ignoré : {exc}",
+                        stacklevel=3,
+                    )
+                    continue
+            checked[key] = value
+        return checked
+
+    def log(self, event_type: str, **fields) -> int:
+        """
+        Journalise un événement et retourne son `t_mono_ns` : l'appelant peut
+        s'en servir pour mesurer une durée sur la même horloge que les logs.
+
+        Après close(), l'événement est ignoré (avertissement) : le fichier est
+        fermé.
+        """
+        if self._closed:
+            warnings.warn(
+                f"EventLogger fermé : événement {event_type!r} ignoré", stacklevel=2
+            )
+            return time.perf_counter_ns()
+        fields = self._check_fields(event_type, fields)
+        # Le contexte est capturé maintenant (il peut changer avant l'écriture)
+        record = (
+            time.perf_counter_ns(),
+            self.condition,
+            self.task_id,
+            self.trial_index,
+            event_type,
+            fields,
+        )
+        mono_ns = record[0]
+        self.recent.append(mono_ns, event_type, fields.get("item_type"))
+
+        burst = self._burst
+        if burst is not None or event_type in self._aggregate:
+            key = (record[1:5], fields.get("tool"))
+            if burst is not None and burst.accepts(
+                key, mono_ns, self._aggregate_gap_ns
+            ):
+                burst.add(record)
+                return mono_ns
+            self._end_burst()
+            if event_type in self._aggregate:
+                self._burst = _Burst(key, record)
+                return mono_ns
+
+        self._emit(record)
+        return mono_ns
+
+    def _end_burst(self):
+        if self._burst is not None:
+            record = self._burst.to_record()
+            self._burst = None
+            self._emit(record)
+
+    def _emit(self, record):
+        if self._writer is None:
+            self._sink.write_rows([self._build_row(record)])
+            self._sink.flush()
+            return
+
+        self._writer.put(record)
+        if record[4] in FLUSH_EVENTS:
+            self._writer.flush()
+
+    def flush(self):
+        """Force l'écriture sur disque des événements en attente."""
+        if self._closed:
+            return
+        self._end_burst()
+        if self._writer is not None:
+            self._writer.flush()
+        else:
+            self._sink.flush()
 
-        with open(self.path, "a", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=self.fieldnames)
-            writer.writerow(row)
+    def close(self):
+        """Vide la file et ferme le fichier (idempotent)."""
+        if self._closed:
+            return
+        self._end_burst()
+        self._closed = True
+        atexit.unregister(self.close)
+        if self._writer is not None:
+            self._writer.close()
+        else:
+            self._sink.close()
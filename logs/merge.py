@@ -0,0 +1,236 @@
+"""
+logs/merge.py
+
+Fusion de segments de logs (un fichier par session / processus) en un seul
+fichier trié par temps et dédoublonné (ex : logs/events_all.csv).
+
+Principe :
+- chaque instance de l'app écrit son propre segment (aucun verrou nécessaire)
+- la fusion est un merge k-voies (heapq) : mémoire bornée par le nombre de flux,
+  pas par le nombre de lignes
+- un fichier non trié (ex : concaténation manuelle) est découpé en "runs" triés,
+  chacun devenant un flux du merge
+- dédoublonnage sur (session_id, timestamp, event_type), timestamp ramené à la
+  précision de la sortie (µs, ISO) : re-fusionner un events_all existant avec
+  les segments donne le même résultat (idempotent)
+- le fichier de sortie est écrit à côté puis renommé (os.replace) : les lecteurs
+  ne voient jamais un fichier à moitié écrit
+
+Usage (depuis la racine du projet) :
+    python -m logs.merge logs/segments logs/events_all.csv -o logs/events_all.csv
+    (--index : construit aussi l'index sessions/essais, voir logs/index.py)
+"""
+
+import argparse
+import csv
+import heapq
+import os
+import sys
+import tempfile
+
+from logs import binlog
+from logs.csvio import iter_records, read_header
+from logs.index import SessionIndex
+from logs.timeutil import iso_from_ns, parse_timestamp
+
+SEGMENT_EXTENSIONS = (".csv", ".sklog")
+
+
+def expand_inputs(paths):
+    """Fichiers et dossiers -> liste de fichiers de logs (dossiers : non récursif)."""
+    out = []
+    for p in paths:
+        if os.path.isdir(p):
+            for name in sorted(os.listdir(p)):
+                if name.endswith(SEGMENT_EXTENSIONS):
+                    out.append(os.path.join(p, name))
+        else:
+            out.append(p)
+    return out
+
+
+def _to_output_precision(ts):
+    """ns -> ns tronqué à la µs : la précision des timestamps ISO écrits."""
+    return ts - ts % 1000
+
+
+def _ts_key(value):
+    try:
+        return _to_output_precision(parse_timestamp(value))
+    except (AttributeError, TypeError, ValueError):
+        return -1
+
+
+class _CsvSource:
+    def __init__(self, path):
+        self.path = path
+        self.fieldnames, self.data_start = read_header(path)
+        self._ts_col = self.fieldnames.index("timestamp")
+
+    def _rows(self, f, start, end):
+        n = len(self.fieldnames)
+        ts_col = self._ts_col
+        for offset, fields in iter_records(f, start, end):
+            if len(fields) != n:
+                continue  # ligne incomplète / corrompue
+            ts = _ts_key(fields[ts_col])
+            if fields[ts_col].isdigit():
+                # Segment écrit sans ISO (iso_timestamps=False) : converti ici
+                fields[ts_col] = iso_from_ns(ts)
+            yield offset, ts, dict(zip(self.fieldnames, fields))
+
+    def runs(self):
+        """Offsets [début, fin) des séquences triées par timestamp."""
+        bounds = [self.data_start]
+        last = None
+        end = self.data_start
+        with open(self.path, "rb") as f:
+            for offset, ts, _ in self._rows(f, self.data_start, None):
+                if last is not None and ts < last:
+                    bounds.append(offset)
+                last = ts
+            end = f.seek(0, os.SEEK_END)
+        bounds.append(end)
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def iter_run(self, run):
+        start, end = run
+        with open(self.path, "rb") as f:
+            for _, ts, row in self._rows(f, start, end):
+                yield ts, row
+
+    def close(self):
+        pass
+
+
+class _BinarySource:
+    """
+    Fichier .sklog : un seul décodage complet (runs), puis chaque run est relu
+    depuis son offset (BinaryLogReader), pas depuis le début du fichier.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._reader = binlog.BinaryLogReader(path)
+        self.fieldnames = self._reader.fieldnames
+
+    def runs(self):
+        """[(offset de début, offset de fin, contexte au début)] des runs triés."""
+        bounds = []
+        last = None
+        for offset, ctx, ts in self._reader.scan():
+            ts = _to_output_precision(ts)
+            if last is None or ts < last:
+                bounds.append((offset, ctx))
+            last = ts
+        ends = [offset for offset, _ctx in bounds[1:]] + [self._reader.size]
+        return [(start, end, ctx) for (start, ctx), end in zip(bounds, ends)]
+
+    def iter_run(self, run):
+        start, end, ctx = run
+        for row in self._reader.rows(start, end, ctx, iso_timestamps=False):
+            ts = _to_output_precision(row["timestamp"])
+            row["timestamp"] = iso_from_ns(ts)
+            yield ts, row
+
+    def close(self):
+        self._reader.close()
+
+
+def open_source(path):
+    if path.endswith(".sklog"):
+        return _BinarySource(path)
+    return _CsvSource(path)
+
+
+def merge_rows(paths):
+    """
+    Itère sur les lignes fusionnées, triées par timestamp et dédoublonnées.
+    Retourne (fieldnames, itérateur de dicts).
+    """
+    sources = [open_source(p) for p in paths]
+
+    # Union des colonnes, dans l'ordre d'apparition
+    fieldnames = []
+    for src in sources:
+        for name in src.fieldnames:
+            if name not in fieldnames:
+                fieldnames.append(name)
+
+    streams = []
+    for src in sources:
+        for run in src.runs():
+            # (ts, n° de flux) : départage stable entre fichiers
+            k = len(streams)
+            streams.append(((ts, k, row) for ts, row in src.iter_run(run)))
+
+    def rows():
+        current_ts = None
+        seen = set()
+        try:
+            for ts, _, row in heapq.merge(*streams, key=lambda t: (t[0], t[1])):
+                # Les doublons ont le même timestamp : on ne garde en mémoire
+                # que les clés du timestamp courant
+                if ts != current_ts:
+                    current_ts = ts
+                    seen.clear()
+                key = (row.get("session_id", ""), ts, row.get("event_type", ""))
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield row
+        finally:
+            for src in sources:
+                src.close()
+
+    return fieldnames, rows()
+
+
+def merge_files(paths, output):
+    """Fusionne `paths` dans `output` (remplacement atomique). Retourne le nb de lignes."""
+    fieldnames, rows = merge_rows(paths)
+
+    out_dir = os.path.dirname(os.path.abspath(output))
+    os.makedirs(out_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".merge_", suffix=".csv", dir=out_dir)
+    n = 0
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, restval="")
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                n += 1
+        os.replace(tmp, output)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fusionne des segments de logs en un CSV trié et dédoublonné"
+    )
+    parser.add_argument("inputs", nargs="+", help="fichiers .csv/.sklog ou dossiers")
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="construit aussi l'index sessions/essais (<sortie>.idx)",
+    )
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("aucun fichier de log trouvé")
+
+    n = merge_files(paths, args.output)
+    if args.index:
+        SessionIndex(args.output).update()
+    print(f"{len(paths)} fichier(s) -> {n} événements dans {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+logs/ring.py
+
+Mémoire courte des événements journalisés, interrogeable dans le processus.
+
+EventLogger écrit sur disque ; l'assistant, lui, a besoin de signaux récents
+("combien d'undo dans les 10 dernières secondes ?", "combien de refus depuis le
+début de l'essai ?") sans relire les CSV. EventRing garde les N derniers
+événements dans des tableaux de taille fixe (module array) :
+- append en O(1), aucune allocation par événement
+- requêtes par fenêtre : on remonte depuis le plus récent et on s'arrête dès
+  qu'on sort de la fenêtre (coût proportionnel à la fenêtre, pas à l'historique)
+- dernier instant de chaque type d'événement en O(1) (ex : trial_start)
+
+Les instants sont des t_mono_ns (time.perf_counter_ns), comme dans les logs.
+"""
+
+import time
+from array import array
+
+_NS_PER_S = 1_000_000_000
+
+
+class EventRing:
+    def __init__(self, capacity=4096):
+        if capacity <= 0:
+            raise ValueError("capacity doit être > 0")
+        self.capacity = capacity
+
+        # Colonnes du buffer circulaire
+        self._t = array("q", bytes(8 * capacity))  # t_mono_ns
+        self._type = array("H", bytes(2 * capacity))  # id du type d'événement
+        self._item = array("H", bytes(2 * capacity))  # id du type d'item
+
+        self._head = 0  # prochaine case écrite
+        self._size = 0
+
+        # Types d'événement / d'item internés (id 0 = "")
+        self._ids = {"": 0}
+        self._names = [""]
+
+        # Dernier t_mono_ns de chaque type d'événement (jamais écrasé)
+        self._last = {}
+
+    def _intern(self, name):
+        sid = self._ids.get(name)
+        if sid is None:
+            sid = self._ids[name] = len(self._names)
+            self._names.append(name)
+        return sid
+
+    def __len__(self):
+        return self._size
+
+    def append(self, t_mono_ns, event_type, item_type=""):
+        i = self._head
+        self._t[i] = t_mono_ns
+        self._type[i] = self._intern(event_type)
+        self._item[i] = self._intern(item_type or "")
+        self._head = (i + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        self._last[event_type] = t_mono_ns
+
+    def _iter_back(self, since_ns):
+        """Indices des événements de t >= since_ns, du plus récent au plus ancien."""
+        t = self._t
+        cap = self.capacity
+        i = self._head
+        for _ in range(self._size):
+            i = (i - 1) % cap
+            if t[i] < since_ns:
+                return
+            yield i
+
+    @staticmethod
+    def _since(window_s=None, since_ns=None):
+        if since_ns is not None:
+            return since_ns
+        if window_s is not None:
+            return time.perf_counter_ns() - int(window_s * _NS_PER_S)
+        return -1
+
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+    def last(self, event_type):
+        """t_mono_ns du dernier `event_type` (None si jamais vu)."""
+        return self._last.get(event_type)
+
+    def count(self, event_types, window_s=None, since_ns=None, item_type=None):
+        """
+        Nombre d'événements de `event_types` (str ou ensemble) dans la fenêtre :
+        les `window_s` dernières secondes, ou depuis `since_ns`, ou tout le buffer.
+        """
+        if isinstance(event_types, str):
+            event_types = (event_types,)
+        wanted = {self._ids[e] for e in event_types if e in self._ids}
+        if not wanted:
+            return 0
+        item_id = None
+        if item_type is not None:
+            item_id = self._ids.get(item_type)
+            if item_id is None:
+                return 0
+
+        types = self._type
+        items = self._item
+        n = 0
+        for i in self._iter_back(self._since(window_s, since_ns)):
+            if types[i] in wanted and (item_id is None or items[i] == item_id):
+                n += 1
+        return n
+
+    def count_since(self, anchor_type, event_types):
+        """Ex : count_since("trial_start", "undo") ; 0 si l'ancre n'a jamais eu lieu."""
+        since = self.last(anchor_type)
+        if since is None:
+            return 0
+        return self.count(event_types, since_ns=since)
+
+    def recent(self, n=None, window_s=None):
+        """Derniers événements (t_mono_ns, event_type, item_type), du plus récent."""
+        out = []
+        names = self._names
+        for i in self._iter_back(self._since(window_s)):
+            if n is not None and len(out) >= n:
+                break
+            out.append((self._t[i], names[self._type[i]], names[self._item[i]]))
+        return out
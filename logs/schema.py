@@ -0,0 +1,184 @@
+"""
+logs/schema.py
+
+Schéma typé des événements journalisés.
+
+Chaque type d'événement déclare ses champs (nom -> type). Ces champs sont écrits
+dans des colonnes dédiées (CSV) ou des champs typés (binaire), au lieu d'être
+noyés dans la colonne libre `notes` : l'analyse peut lire directement
+`duration_s`, `similarity`, `decision_ms`... sans regex.
+
+Pour rester compatible avec les analyses existantes, un événement peut aussi
+déclarer un gabarit `notes` (str.format) : si l'appelant ne fournit pas de notes,
+EventLogger les reconstruit à partir des champs typés, au format historique.
+
+Ajouter un événement :
+    register_event("mon_event", notes="a={a}", a=int, label=str)
+(à faire à l'import, avant la création de l'EventLogger : les colonnes CSV
+sont figées à l'ouverture du fichier)
+"""
+
+# Colonnes communes à tous les événements (format historique)
+BASE_FIELDS = [
+    "timestamp",
+    "session_id",
+    "condition",
+    "task_id",
+    "trial_index",
+    "event_type",
+    "tool",
+    "item_type",
+    "n_points",
+    "notes",
+]
+
+# Horloge monotone (time.perf_counter_ns) de chaque événement. Le premier
+# événement d'une session (session_start) sert d'ancre : son couple
+# (timestamp, t_mono_ns) relie l'horloge monotone à l'heure murale.
+CLOCK_FIELDS = ["t_mono_ns"]
+
+# Colonnes des lignes agrégées (rafales repliées par EventLogger, voir
+# `aggregate`) : nombre d'événements, t_mono_ns du dernier, et décompte par
+# type d'item ("QGraphicsPathItem:3;QGraphicsRectItem:1"). Vide = 1 événement.
+AGGREGATE_FIELDS = ["count", "t_last_mono_ns", "item_types"]
+_COMMON_TYPES = {"t_mono_ns": int, "count": int, "t_last_mono_ns": int}
+
+
+class EventSpec:
+    def __init__(self, fields=None, notes=None):
+        self.fields = dict(fields or {})  # nom -> type (str, int, float, bool)
+        self.notes = notes  # gabarit des notes historiques (ou None)
+
+    def coerce(self, key, value):
+        """Convertit `value` dans le type déclaré du champ (si déclaré)."""
+        ftype = self.fields.get(key)
+        if ftype is None or value is None or value == "":
+            return value
+        return ftype(value)
+
+    def format_notes(self, row):
+        if self.notes is None:
+            return ""
+        try:
+            return self.notes.format(**row)
+        except (KeyError, ValueError, TypeError):
+            # Champ manquant / non numérique : pas de notes plutôt qu'un crash
+            return ""
+
+
+EVENT_SCHEMA = {}
+
+# Type de chaque colonne typée (partagée entre événements : types identiques)
+_COLUMN_TYPES = {}
+
+
+def register_event(event_type, notes=None, **fields):
+    """Déclare (ou redéclare) les champs typés d'un type d'événement."""
+    for name, ftype in fields.items():
+        if name in BASE_FIELDS or name in CLOCK_FIELDS or name in AGGREGATE_FIELDS:
+            raise ValueError(f"{name!r} est une colonne de base")
+        known = _COLUMN_TYPES.setdefault(name, ftype)
+        if known is not ftype:
+            raise ValueError(
+                f"champ {name!r} déjà déclaré en {known.__name__}, pas {ftype.__name__}"
+            )
+    EVENT_SCHEMA[event_type] = EventSpec(fields, notes)
+    return EVENT_SCHEMA[event_type]
+
+
+def typed_columns():
+    """Colonnes typées, dans l'ordre de déclaration."""
+    return list(_COLUMN_TYPES)
+
+
+def column_type(name):
+    """Type d'une colonne (int pour t_mono_ns, None si colonne texte / inconnue)."""
+    if name in _COMMON_TYPES:
+        return _COMMON_TYPES[name]
+    return _COLUMN_TYPES.get(name)
+
+
+def all_fieldnames():
+    return BASE_FIELDS + CLOCK_FIELDS + AGGREGATE_FIELDS + typed_columns()
+
+
+# ---------------------------------------------------------------------------
+# Événements de l'application
+# ---------------------------------------------------------------------------
+
+# --- Session ---
+register_event("session_start", notes="pid={pid}", pid=int)
+
+# --- Protocole de test ---
+register_event("trial_end", notes="duration_s={duration_s:.3f}", duration_s=float)
+register_event("self_eval", notes="similarity={similarity:.3f}", similarity=float)
+register_event("test_end", notes="{status}", status=str)
+
+# --- Styles ---
+register_event("stroke_color_change", stroke_color=str)
+register_event("fill_color_change", fill_color=str)
+
+# --- Clipboard ---
+register_event("copy", notes="n={n_items}", n_items=int)
+register_event("paste", notes="n={n_items}", n_items=int)
+
+# --- Formes ---
+register_event("pen_end", n_points_simplified=int, n_segments=int)
+register_event(
+    "line_end",
+    notes="({x1:.1f},{y1:.1f})->({x2:.1f},{y2:.1f})",
+    x1=float,
+    y1=float,
+    x2=float,
+    y2=float,
+)
+_RECT_NOTES = "x={x:.1f},y={y:.1f},w={w:.1f},h={h:.1f}"
+register_event("rect_end", notes=_RECT_NOTES, x=float, y=float, w=float, h=float)
+register_event("ellipse_end", notes=_RECT_NOTES, x=float, y=float, w=float, h=float)
+register_event("triangle_end", notes="n_points={n_vertices}", n_vertices=int)
+
+# --- Gomme : une ligne par glissé (count / item_types = items retirés) ---
+register_event("erase", eraser_radius=float)
+
+# --- Projet (drawing/project.py) : dessin enregistré / rouvert, récupéré
+# après un arrêt brutal (drawing/autosave.py) ---
+register_event("project_saved", notes="{path}", path=str, n_items=int)
+register_event("project_opened", notes="{path}", path=str, n_items=int)
+register_event("autosave_recovered", notes="{session}", session=str, n_items=int)
+
+# --- Génération IA ---
+register_event(
+    "gen_add",
+    notes="{category}:{item_id}|prompt={prompt}",
+    category=str,
+    item_id=str,
+    prompt=str,
+)
+
+# --- Assistant ---
+register_event("assistant_auto_toggle", notes="{enabled}", enabled=bool)
+register_event("assistant_floating_toggle", notes="{enabled}", enabled=bool)
+register_event("ai_output", notes="none:{trigger}", trigger=str)
+register_event("assistant_suppress", notes="{sid}", sid=str)
+register_event("autosuggest_shown", notes="trigger={trigger};sid={sid}", trigger=str, sid=str)
+for _ev in (
+    "autosuggest_accept",
+    "autosuggest_reject",
+    "assistant_accept",
+    "assistant_reject",
+):
+    register_event(
+        _ev,
+        notes="trigger={trigger};sid={sid};ms={decision_ms}",
+        trigger=str,
+        sid=str,
+        decision_ms=int,
+    )
+register_event(
+    "user_action",
+    notes="{choice}:{trigger}:{sid}:ms={decision_ms}",
+    choice=str,
+    trigger=str,
+    sid=str,
+    decision_ms=int,
+)
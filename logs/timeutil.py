@@ -0,0 +1,44 @@
+"""
+logs/timeutil.py
+
+Conversions d'horodatage partagées par les sinks (CSV / binaire) et les lecteurs.
+
+Les événements sont horodatés en entier (nanosecondes depuis l'epoch, time.time_ns()).
+Le format ISO (heure locale, sans fuseau) n'est produit qu'à l'écriture CSV
+ou à l'export : c'est le format historique de la colonne `timestamp`.
+
+Horloges (voir EventLogger) :
+- `t_mono_ns` : time.perf_counter_ns(), monotone, pour les durées et latences
+- `timestamp` : ancre murale de la session + écart monotone ; il ne saute donc
+  pas si l'horloge système est recalée (NTP) pendant un essai
+"""
+
+from datetime import datetime
+
+_NS_PER_S = 1_000_000_000
+
+
+def iso_from_ns(ts_ns: int) -> str:
+    """ns epoch -> 'YYYY-MM-DDTHH:MM:SS[.ffffff]' (heure locale, comme datetime.now())."""
+    sec, rem = divmod(int(ts_ns), _NS_PER_S)
+    return datetime.fromtimestamp(sec).replace(microsecond=rem // 1000).isoformat()
+
+
+def ns_from_iso(text: str) -> int:
+    """Inverse de iso_from_ns (précision microseconde)."""
+    dt = datetime.fromisoformat(text)
+    whole = dt.replace(microsecond=0)
+    return int(whole.timestamp()) * _NS_PER_S + dt.microsecond * 1000
+
+
+def parse_timestamp(value) -> int:
+    """
+    Valeur de la colonne `timestamp` -> ns epoch.
+    Accepte un entier, un entier en texte (CSV écrit sans ISO) ou une date ISO.
+    """
+    if isinstance(value, int):
+        return value
+    text = value.strip()
+    if text.isdigit():
+        return int(text)
+    return ns_from_iso(text)
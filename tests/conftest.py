@@ -0,0 +1,16 @@
+"""
+Fixtures communes. Les tests Qt tournent sans affichage (QT_QPA_PLATFORM
+offscreen), comme les benchmarks.
+"""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,111 @@
+"""Métriques par essai (logs/analytics.py) sur un petit log de référence."""
+
+import csv
+
+import pytest
+
+from logs import binlog
+from logs.analytics import compute_sessions, compute_trials
+from logs.logger import EventLogger
+
+TASKS = ["cat", "castle", "car"]
+
+
+def _session(path, aggregate=(), sink="csv"):
+    """Session complète : 3 essais, actions, gommages, aide de l'IA."""
+    logger = EventLogger(path=str(path), sink=sink, aggregate=aggregate)
+    logger.set_context(condition="H_PLUS_IA")
+    for k, task in enumerate(TASKS, start=1):
+        logger.set_context(task_id=task, trial_index=k)
+        logger.log("trial_start", notes=f"task={task}")
+        for _ in range(2 * k):
+            logger.log("pen_end", tool="PEN", n_points=10)
+        logger.log("item_moved", tool="SELECT")
+        for _ in range(k):
+            logger.log("erase", tool="ERASER", item_type="QGraphicsPathItem")
+        logger.log("undo")
+        if k != 2:
+            logger.log("gen_add", tool="ASSISTANT")
+        logger.log("trial_end", duration_s=10.0 * k)
+        logger.log("self_eval", tool="TEST", similarity=k + 1)
+    logger.close()
+    return str(path)
+
+
+EXPECTED = {
+    # tâche : (actions, corrections, événements IA, durée, similarité)
+    "cat": (3, 2, 1, 10.0, 2.0),
+    "castle": (5, 3, 0, 20.0, 3.0),
+    "car": (7, 4, 1, 30.0, 4.0),
+}
+
+
+def _metrics(rows):
+    return {
+        r["task_id"]: (
+            r["n_actions"],
+            r["n_corrections"],
+            r["n_ia_events"],
+            r["duration_s"],
+            r["similarity"],
+        )
+        for r in rows
+    }
+
+
+def test_trial_metrics(tmp_path):
+    rows = compute_trials([_session(tmp_path / "e.csv")], jobs=1)
+    assert _metrics(rows) == EXPECTED
+    assert [r["ai_used"] for r in rows] == [1, 0, 1]
+    assert rows[0]["correction_ratio"] == pytest.approx(2 / 3)
+
+    (session,) = compute_sessions(rows)
+    assert session["condition"] == "H_PLUS_IA"
+    assert session["mean_duration_s"] == 20.0
+    assert session["total_corrections"] == 9
+    assert session["total_gen_add"] == 2
+
+
+def test_aggregated_log_gives_same_metrics(tmp_path):
+    plain = _session(tmp_path / "a.csv")
+    folded = _session(tmp_path / "b.csv", aggregate={"erase"})
+    with open(folded, newline="", encoding="utf-8") as f:
+        counts = [r["count"] for r in csv.DictReader(f) if r["event_type"] == "erase"]
+    assert counts == ["", "2", "3"]  # rafales repliées
+    assert _metrics(compute_trials([folded], jobs=1)) == _metrics(
+        compute_trials([plain], jobs=1)
+    )
+
+
+def test_binary_log_gives_same_metrics(tmp_path):
+    rows = compute_trials([_session(tmp_path / "e.sklog", sink="binary")], jobs=1)
+    assert _metrics(rows) == EXPECTED
+
+    packed = tmp_path / "packed.sklog"
+    binlog.pack_csv(_session(tmp_path / "e.csv"), str(packed))
+    assert _metrics(compute_trials([str(packed)], jobs=1)) == EXPECTED
+
+
+def test_split_session_is_recombined(tmp_path):
+    path = _session(tmp_path / "e.csv")
+    with open(path, newline="", encoding="utf-8") as f:
+        header, *rows = list(csv.reader(f))
+    half = len(rows) // 2
+    parts = []
+    for name, chunk in (("p1.csv", rows[:half]), ("p2.csv", rows[half:])):
+        with open(tmp_path / name, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(chunk)
+        parts.append(str(tmp_path / name))
+    assert _metrics(compute_trials(parts, jobs=2)) == EXPECTED
+
+
+def test_old_schema_file(tmp_path):
+    # Ancien format : ni colonnes de contexte, ni colonnes typées
+    path = tmp_path / "v1.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp", "session_id", "event_type", "notes"])
+        writer.writerow(["2025-10-09T10:00:00", "s", "trial_end", "duration_s=3"])
+    assert compute_trials([str(path)], jobs=1, complete_only=False) == []
@@ -0,0 +1,125 @@
+"""Journal de récupération (drawing/autosave.py) : rejeu après un crash."""
+
+import pytest
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QGraphicsRectItem
+
+from drawing.autosave import (
+    OP_POS,
+    Autosave,
+    discard_session,
+    find_recoverable,
+    load_state,
+    read_records,
+    recover,
+)
+from drawing.scene import DrawingScene
+from drawing.serialization import enable_interaction_flags, serialize_item
+
+
+def _content(scene):
+    return [
+        serialize_item(it)
+        for it in scene.items(Qt.SortOrder.AscendingOrder)
+        if it.parentItem() is None
+    ]
+
+
+def _rects(n):
+    items = []
+    for i in range(n):
+        it = QGraphicsRectItem(i * 30, 0, 20, 20)
+        enable_interaction_flags(it)
+        items.append(it)
+    return items
+
+
+@pytest.fixture
+def session(qapp, tmp_path):
+    """
+    Scène journalisée : 5 rectangles ajoutés, 2 coupés, puis déplacés.
+    Chaque test ferme l'Autosave (normalement ou en simulant un crash).
+    """
+    scene = DrawingScene()
+    autosave = Autosave(scene, "s1", directory=str(tmp_path))
+    items = _rects(5)
+    scene.add_items(items)
+    scene.clearSelection()
+    for it in items[:2]:
+        it.setSelected(True)
+    scene.cut_selection()
+    autosave.flush()
+    before_move = _content(scene)
+
+    for it in items[2:]:
+        it.setSelected(True)
+    scene.nudge_selection(10, 5)
+    autosave.flush()
+    return scene, autosave, before_move
+
+
+def _recover(directory):
+    (orphan,) = find_recoverable(str(directory))
+    target = DrawingScene()
+    recover(target, orphan.state)
+    orphan.release()
+    return target
+
+
+def test_live_session_is_not_offered(session, tmp_path):
+    _scene, autosave, _before = session
+    assert find_recoverable(str(tmp_path)) == []
+    autosave.close(discard=True)  # fermeture normale : rien à récupérer
+    assert find_recoverable(str(tmp_path)) == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_recover_after_crash(session, tmp_path):
+    scene, autosave, _before = session
+    autosave.close()  # « crash » : fichiers gardés, verrou libéré
+    assert _content(_recover(tmp_path)) == _content(scene)
+
+
+@pytest.mark.parametrize("damage", ["truncate", "corrupt"])
+def test_replay_stops_at_damaged_frame(session, tmp_path, damage):
+    scene, autosave, before_move = session
+    autosave.close()
+    journal = autosave.journal_path
+    records = read_records(journal)
+    assert records[-1][1] == OP_POS  # le déplacement
+
+    data = bytearray(open(journal, "rb").read())
+    if damage == "truncate":
+        data = data[:-3]  # crash pendant l'écriture du dernier enregistrement
+    else:
+        data[-1] ^= 0xFF  # crc32 invalide
+    with open(journal, "wb") as f:
+        f.write(data)
+
+    assert read_records(journal) == records[:-1]
+    assert _content(_recover(tmp_path)) == before_move
+
+
+def test_recover_then_discard(session, tmp_path):
+    _scene, autosave, _before = session
+    autosave.close()
+    (orphan,) = find_recoverable(str(tmp_path))
+    orphan.discard()
+    assert find_recoverable(str(tmp_path)) == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_recover_from_snapshot(qapp, tmp_path):
+    # Compaction à chaque écriture : tout est dans l'instantané
+    scene = DrawingScene()
+    autosave = Autosave(scene, "s2", directory=str(tmp_path), snapshot_interval_s=0.0)
+    scene.add_items(_rects(3))
+    autosave.flush()
+    scene.add_items(_rects(2))
+    autosave.flush()
+    autosave.close()
+    state = load_state(autosave.journal_path, autosave.snapshot_path)
+    assert len(state.items) == 5
+    assert _content(_recover(tmp_path)) == _content(scene)
+    discard_session("s2", str(tmp_path))
+
@@ -0,0 +1,143 @@
+"""Format binaire (logs/binlog.py) : écriture, reprise, export CSV."""
+
+import csv
+import io
+
+import pytest
+
+from logs import binlog
+
+FIELDS = [
+    "timestamp",
+    "session_id",
+    "condition",
+    "task_id",
+    "trial_index",
+    "event_type",
+    "tool",
+    "item_type",
+    "notes",
+    "n_points",
+    "duration_s",
+]
+
+T0 = 1_760_000_000_000_000_000
+
+
+def _row(i, **fields):
+    row = {
+        "timestamp": T0 + i * 1000,
+        "session_id": "s1",
+        "condition": "H_ONLY",
+        "task_id": "cat",
+        "trial_index": "1",
+        "event_type": "pen_end",
+    }
+    row.update(fields)
+    return row
+
+
+def _write(path, rows):
+    sink = binlog.BinarySink(str(path), FIELDS)
+    sink.write_rows(rows)
+    sink.close()
+
+
+def _export(path):
+    out = io.StringIO()
+    binlog.export_csv(str(path), out)
+    out.seek(0)
+    return list(csv.DictReader(out))
+
+
+def test_write_then_export(tmp_path):
+    path = tmp_path / "e.sklog"
+    _write(
+        path,
+        [
+            _row(0, tool="PEN", n_points=12, notes="a=1"),
+            _row(1, event_type="trial_end", duration_s=4.5),
+            _row(2, task_id="car", trial_index="2", item_type="QGraphicsRectItem"),
+        ],
+    )
+    rows = _export(path)
+    assert [r["event_type"] for r in rows] == ["pen_end", "trial_end", "pen_end"]
+    assert rows[0]["tool"] == "PEN"
+    assert rows[0]["n_points"] == "12"
+    assert rows[0]["notes"] == "a=1"
+    assert rows[1]["duration_s"] == "4.5"
+    assert (rows[2]["task_id"], rows[2]["trial_index"]) == ("car", "2")
+    assert rows[2]["item_type"] == "QGraphicsRectItem"
+
+
+def test_resume_reuses_string_tables(tmp_path):
+    path = tmp_path / "e.sklog"
+    _write(path, [_row(0, tool="PEN")])
+    size = path.stat().st_size
+    # Reprise : chaînes et contexte déjà connus, rien n'est réécrit
+    _write(path, [_row(1, tool="PEN")])
+    rows = list(binlog.iter_rows(str(path), iso_timestamps=False))
+    assert [r["timestamp"] for r in rows] == [T0, T0 + 1000]
+    assert rows[1]["tool"] == "PEN"
+    assert path.stat().st_size - size == binlog._EVENT.size + 2
+
+
+@pytest.mark.parametrize(
+    "torn",
+    [
+        binlog._STRING.pack(ord("S"), 10) + b"abc",  # chaîne tronquée
+        binlog._EVENT.pack(ord("E"), T0, 1, 0)[:7],  # événement tronqué
+    ],
+    ids=["string", "event"],
+)
+def test_resume_after_torn_tail(tmp_path, torn):
+    path = tmp_path / "e.sklog"
+    _write(path, [_row(0), _row(1, condition="H_PLUS_IA")])
+    with open(path, "ab") as f:
+        f.write(torn)
+
+    _write(path, [_row(2, condition="H_PLUS_IA", tool="ERASER"), _row(3)])
+    rows = _export(path)
+    assert len(rows) == 4
+    assert rows[2]["tool"] == "ERASER"
+    # Contexte courant repris de la fin du fichier, puis changé
+    assert [r["condition"] for r in rows[1:]] == ["H_PLUS_IA", "H_PLUS_IA", "H_ONLY"]
+
+
+def test_resume_with_other_columns_raises(tmp_path):
+    path = tmp_path / "e.sklog"
+    _write(path, [_row(0)])
+    with pytest.raises(binlog.BinaryLogError):
+        binlog.BinarySink(str(path), FIELDS + ["extra"])
+
+
+def test_full_symbol_table_rejects_row_only(tmp_path):
+    path = tmp_path / "e.sklog"
+    sink = binlog.BinarySink(str(path), FIELDS)
+    sink._symbols.max_id = len(sink._symbols.strings) + 5
+    with pytest.raises(binlog.BinaryLogError):
+        sink.write_rows([_row(i, tool=f"tool{i}") for i in range(10)])
+    sink.write_rows([_row(10, tool="tool0")])
+    sink.close()
+
+    rows = _export(path)
+    tools = [r["tool"] for r in rows]
+    assert tools[-1] == "tool0"
+    assert tools[:-1] == [f"tool{i}" for i in range(len(tools) - 1)]
+
+
+def test_pack_csv_roundtrip(tmp_path):
+    src = tmp_path / "e.csv"
+    with open(src, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        writer.writerow(
+            ["2025-10-09T10:00:00.000001", "s1", "H_ONLY", "cat", "1", "trial_end"]
+            + ["", "", "duration_s=3.2", "", "3.2"]
+        )
+    dst = tmp_path / "e.sklog"
+    assert binlog.pack_csv(str(src), str(dst)) == 1
+    (row,) = _export(dst)
+    assert row["timestamp"] == "2025-10-09T10:00:00.000001"
+    assert row["duration_s"] == "3.2"
+    assert row["notes"] == "duration_s=3.2"
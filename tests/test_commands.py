@@ -0,0 +1,93 @@
+"""Déplacements fusionnables (MoveItemsCommand) et signaux de l'historique."""
+
+import pytest
+from PySide6.QtCore import QPointF
+from PySide6.QtWidgets import QGraphicsRectItem
+
+from drawing import commands
+from drawing.commands import MoveItemsCommand
+from drawing.scene import DrawingScene
+from drawing.serialization import enable_interaction_flags
+
+
+@pytest.fixture
+def scene(qapp):
+    scene = DrawingScene()
+    items = []
+    for i in range(3):
+        it = QGraphicsRectItem(i * 30, 0, 20, 20)
+        enable_interaction_flags(it)
+        items.append(it)
+    scene.add_items(items, select=True)
+    scene.applied = []
+    scene.changed_refs = []
+    scene.undo_stack.command_applied.connect(
+        lambda cmd, redo: scene.applied.append((cmd.text(), redo))
+    )
+    scene.undo_stack.items_changed.connect(scene.changed_refs.append)
+    return scene
+
+
+def _positions(scene):
+    return sorted((it.x(), it.y()) for it in scene.items())
+
+
+def test_nudges_merge_into_one_command(scene):
+    stack = scene.undo_stack
+    for _ in range(3):
+        scene.nudge_selection(10, 0)
+    scene.nudge_selection(0, 5)
+    assert stack.count() == 2  # ajout + un seul déplacement
+    assert _positions(scene) == [(30, 5)] * 3
+    # Chaque déplacement fusionné est signalé via la commande qui l'absorbe
+    assert scene.applied == [("Nudge selection", True)] * 4
+
+    stack.undo()
+    assert _positions(scene) == [(0, 0)] * 3
+    stack.redo()
+    assert _positions(scene) == [(30, 5)] * 3
+
+
+def test_round_trip_removes_the_command(scene):
+    stack = scene.undo_stack
+    scene.nudge_selection(10, 0)
+    scene.nudge_selection(-10, 0)
+    # Aller-retour : Qt supprime la commande fusionnée (obsolète)
+    assert stack.count() == 1
+    assert _positions(scene) == [(0, 0)] * 3
+    assert scene.applied == [("Nudge selection", True)]
+    (refs,) = scene.changed_refs
+    assert set(refs) == set(scene.items())
+
+    stack.undo()
+    assert scene.items() == []
+
+
+def test_no_merge_outside_window_or_other_items(scene, monkeypatch):
+    stack = scene.undo_stack
+    scene.nudge_selection(10, 0)
+
+    now = commands.time.monotonic()
+    monkeypatch.setattr(
+        commands.time, "monotonic", lambda: now + 2 * commands.MERGE_WINDOW_S
+    )
+    scene.nudge_selection(10, 0)
+    assert stack.count() == 3
+
+    first = scene.selected_items_ordered()[0]
+    first.setSelected(False)
+    scene.nudge_selection(10, 0)
+    assert stack.count() == 4
+
+
+def test_non_rigid_move_keeps_positions(scene):
+    items = scene.selected_items_ordered()
+    old = {it: it.pos() for it in items}
+    new = {it: QPointF(k * 7, k) for k, it in enumerate(items)}
+    scene.undo_stack.push(MoveItemsCommand(items, old, new, already_applied=False))
+    assert [it.pos() for it in items] == list(new.values())
+    scene.nudge_selection(1, 1)  # rigide : pas de fusion avec un déplacement libre
+    assert scene.undo_stack.count() == 3
+    scene.undo_stack.undo()
+    scene.undo_stack.undo()
+    assert [it.pos() for it in items] == list(old.values())
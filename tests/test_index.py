@@ -0,0 +1,91 @@
+"""Index sessions / essais (logs/index.py) : construction, reprise, lecture."""
+
+import csv
+
+from logs.index import SessionIndex, open_index
+from logs.logger import EventLogger
+
+
+def _trial(logger, task, k, n=3):
+    logger.set_context(task_id=task, trial_index=k)
+    logger.log("trial_start")
+    for i in range(n):
+        logger.log("pen_end", tool="PEN", n_points=i)
+    logger.log("trial_end", duration_s=1.0)
+
+
+def _log(path, sessions=2):
+    ids = []
+    for _ in range(sessions):
+        logger = EventLogger(path=str(path))
+        logger.set_context(condition="H_ONLY")
+        _trial(logger, "cat", 1)
+        _trial(logger, "car", 2)
+        logger.close()
+        ids.append(logger.session_id)
+    return ids
+
+
+def _rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_build_and_lookup(tmp_path):
+    path = tmp_path / "e.csv"
+    ids = _log(path)
+    index = open_index(str(path))
+    assert index.sessions() == ids
+
+    all_rows = _rows(path)
+    for sid in ids:
+        expected = [r for r in all_rows if r["session_id"] == sid]
+        assert index.read_rows(sid) == expected
+        assert index.trials(sid) == [("cat", "1"), ("car", "2")]
+
+    trial = index.read_rows(ids[1], "car", 2)
+    assert [r["event_type"] for r in trial] == ["trial_start"] + 3 * ["pen_end"] + [
+        "trial_end"
+    ]
+    assert {(r["session_id"], r["task_id"]) for r in trial} == {(ids[1], "car")}
+
+
+def test_incremental_update_and_reload(tmp_path):
+    path = tmp_path / "e.csv"
+    (first,) = _log(path, sessions=1)
+    index = open_index(str(path))
+    (second,) = _log(path, sessions=1)
+    assert index.update() > 0
+    assert index.sessions() == [first, second]
+
+    # Index rechargé depuis le fichier .idx : mêmes plages
+    reloaded = SessionIndex(str(path))
+    assert reloaded.update() == 0
+    for sid in (first, second):
+        assert reloaded.ranges(sid) == index.ranges(sid)
+
+
+def test_replaced_log_is_reindexed(tmp_path):
+    path = tmp_path / "e.csv"
+    _log(path, sessions=1)
+    open_index(str(path))
+    other = tmp_path / "other.csv"
+    ids = _log(other, sessions=1)
+    other.replace(path)  # ex : events_all.csv réécrit par logs.merge
+    assert open_index(str(path)).sessions() == ids
+
+
+def test_old_schema_indexed_by_session(tmp_path):
+    # Ancien format (logs/events_v1.csv) : pas de task_id / trial_index
+    path = tmp_path / "v1.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp", "session_id", "event_type", "notes"])
+        writer.writerow(["2025-10-09T10:00:00", "a", "pen_end", ""])
+        writer.writerow(["2025-10-09T10:00:01", "a", "undo", ""])
+        writer.writerow(["2025-10-09T10:00:02", "b", "pen_end", ""])
+
+    index = open_index(str(path))
+    assert index.sessions() == ["a", "b"]
+    assert [r["event_type"] for r in index.read_rows("a")] == ["pen_end", "undo"]
+    assert index.trials("a") == []
@@ -0,0 +1,114 @@
+"""Fichier projet .skproj (drawing/project.py) : sauvegarde, chargement."""
+
+from PySide6.QtCore import QRectF, Qt
+
+from drawing import project
+from drawing.project import open_project, save_project
+from drawing.scene import DrawingScene
+from drawing.serialization import deserialize_item, serialize_item
+
+TAG_ROLE = int(Qt.UserRole)
+
+# Valeurs exactes en float32 : la géométrie relue est identique
+SHAPES = [
+    {"type": "QGraphicsLineItem", "line": [0, 0, 40, 10], "stroke": "#ff0000"},
+    {"type": "QGraphicsRectItem", "rect": [5, 5, 20, 10], "fill": "#00ff00"},
+    {"type": "QGraphicsEllipseItem", "ellipse": [0, 0, 8, 8], "stroke_width": 3},
+    {
+        "type": "QGraphicsPathItem",
+        "path_elems": [
+            [0, 0, "MoveTo"],
+            [10, 0, "LineTo"],
+            [12, 4, "CurveTo"],
+            [16, 4, "CurveToData"],
+            [20, 0, "CurveToData"],
+        ],
+    },
+    {"type": "QGraphicsPolygonItem", "polygon": [[0, 0], [10, 0], [5, 8]]},
+]
+
+
+def _items(n, spacing=50):
+    items = []
+    for i in range(n):
+        data = dict(SHAPES[i % len(SHAPES)], pos=[(i % 40) * spacing, i // 40 * 50])
+        data["z"] = float(i % 3)
+        item = deserialize_item(data)
+        if i % 7 == 0:
+            item.setData(TAG_ROLE, f"tag{i % 2}")
+        items.append(item)
+    return items
+
+
+def _content(scene):
+    """Items (sérialisés + tag) dans l'ordre d'empilement."""
+    return [
+        (serialize_item(it), it.data(TAG_ROLE))
+        for it in scene.items(Qt.SortOrder.AscendingOrder)
+    ]
+
+
+def test_save_then_full_load(qapp, tmp_path):
+    scene = DrawingScene()
+    scene.insert_items(_items(50))
+    path = str(tmp_path / "d.skproj")
+    assert save_project(scene, path) == 50
+
+    other = DrawingScene()
+    loader = open_project(other, path)
+    assert loader.done  # petit projet : tout est chargé à l'ouverture
+    assert _content(other) == _content(scene)
+    assert other.undo_stack.count() == 0
+
+
+def test_lazy_load_by_area(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(project, "CHUNK_ITEMS", 16)
+    monkeypatch.setattr(project, "LAZY_MIN_ITEMS", 0)
+    scene = DrawingScene(infinite=True)
+    scene.insert_items(_items(1200))
+    path = str(tmp_path / "d.skproj")
+    save_project(scene, path)
+    expected = sorted(map(str, _content(scene)))
+
+    other = DrawingScene(infinite=True)
+    loader = open_project(other, path)
+    assert not loader.done
+    assert other.items() == []
+    assert other.sceneRect().contains(loader.bounds)
+
+    # Zone visible : seuls les tronçons qui la touchent sont créés
+    other.ensure_loaded(QRectF(0, 0, 200, 200))
+    partial = len(other.items())
+    assert 0 < partial < 1200
+    assert loader.pending_count() == 1200 - partial
+
+    loader.load_all()
+    assert loader.done
+    assert sorted(map(str, _content(other))) == expected
+
+
+def test_save_with_pending_items(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(project, "LAZY_MIN_ITEMS", 0)
+    scene = DrawingScene()
+    scene.insert_items(_items(300))
+    first = str(tmp_path / "a.skproj")
+    save_project(scene, first)
+    expected = sorted(map(str, _content(scene)))
+
+    # Projet à moitié chargé, un item retiré, un ajouté : la sauvegarde
+    # contient les items non chargés, sans l'item retiré
+    other = DrawingScene()
+    loader = open_project(other, first)
+    loader.load_rect(QRectF(0, 0, 300, 100))
+    removed = other.items()[0]
+    other.remove_items([removed])
+    added = _items(1)[0]
+    other.insert_items([added])
+    second = str(tmp_path / "b.skproj")
+    assert save_project(other, second) == 300
+
+    final = DrawingScene()
+    open_project(final, second).load_all()
+    expected.remove(str((serialize_item(removed), removed.data(TAG_ROLE))))
+    expected.append(str((serialize_item(added), added.data(TAG_ROLE))))
+    assert sorted(map(str, _content(final))) == sorted(expected)
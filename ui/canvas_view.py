@@ -0,0 +1,214 @@
+"""
+Vue de la zone de dessin : zoom, déplacement (pan) et défilement fluide.
+
+- Ctrl + molette : zoom centré sous la souris (borné MIN_ZOOM..MAX_ZOOM)
+- molette seule : défilement vertical animé (Maj + molette : horizontal) ;
+  pavé tactile (pixelDelta) : défilement direct, sans animation
+- bouton du milieu (ou Espace + clic gauche) : déplacement de la vue
+- sur un canvas infini (DrawingScene(infinite=True)), la scène est agrandie
+  dès que la zone visible approche de ses bords : on peut se déplacer sans fin
+- projet ouvert (drawing/project.py) : les items sont créés à mesure que la
+  zone visible les atteint (scene.ensure_loaded)
+
+Réglages de rendu pour les grosses scènes (~100k items) : pas de sauvegarde /
+restauration de l'état du QPainter par item, pas de marge d'antialiasing sur les
+zones invalidées.
+"""
+
+from PySide6.QtCore import QEasingCurve, QPointF, Qt, QVariantAnimation, Signal
+from PySide6.QtWidgets import QGraphicsView
+
+# Facteur de zoom par cran de molette (120 unités d'angleDelta)
+ZOOM_STEP = 1.15
+MIN_ZOOM = 0.02
+MAX_ZOOM = 32.0
+
+# Défilement fluide : pixels par cran de molette, durée de l'animation
+SCROLL_STEP_PX = 120
+SCROLL_ANIMATION_MS = 140
+
+
+class CanvasView(QGraphicsView):
+    zoom_changed = Signal(float)
+
+    def __init__(self, scene, parent=None):
+        super().__init__(scene, parent)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorViewCenter)
+        self.setOptimizationFlag(
+            QGraphicsView.OptimizationFlag.DontSavePainterState, True
+        )
+        self.setOptimizationFlag(
+            QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing, True
+        )
+
+        # Pan : dernière position souris (None = pas de pan en cours)
+        self._pan_last = None
+        self._space_down = False
+
+        # Une animation par barre de défilement (cible cumulée si on enchaîne)
+        self._scroll_anims = {}
+        self._extending = False
+
+    # ------------------------------------------------------------------
+    # Zoom
+    # ------------------------------------------------------------------
+    def zoom(self) -> float:
+        return self.transform().m11()
+
+    def zoom_by(self, factor):
+        """Multiplie le zoom par `factor` (borné), ancré sous la souris."""
+        current = self.zoom()
+        target = min(MAX_ZOOM, max(MIN_ZOOM, current * factor))
+        if target == current:
+            return
+        self.scale(target / current, target / current)
+        self._extend_canvas()
+        self.zoom_changed.emit(target)
+
+    def reset_view(self):
+        """Zoom 100 %, vue centrée sur la zone de dessin initiale."""
+        self.resetTransform()
+        scene = self.scene()
+        if scene is not None:
+            self.centerOn(scene.sceneRect().center())
+        self._extend_canvas()
+        self.zoom_changed.emit(1.0)
+
+    # ------------------------------------------------------------------
+    # Défilement
+    # ------------------------------------------------------------------
+    def _smooth_scroll(self, bar, delta):
+        anim = self._scroll_anims.get(bar)
+        if anim is None:
+            anim = QVariantAnimation(self)
+            anim.setDuration(SCROLL_ANIMATION_MS)
+            anim.setEasingCurve(QEasingCurve.Type.OutCubic)
+            anim.valueChanged.connect(lambda v, b=bar: b.setValue(int(v)))
+            self._scroll_anims[bar] = anim
+
+        # Enchaînement de crans : on repart de la cible restante
+        start = bar.value()
+        if anim.state() == QVariantAnimation.State.Running:
+            target = anim.endValue() + delta
+            anim.stop()
+        else:
+            target = start + delta
+        anim.setStartValue(start)
+        anim.setEndValue(max(bar.minimum(), min(bar.maximum(), target)))
+        anim.start()
+
+    def wheelEvent(self, event):
+        mods = event.modifiers()
+        angle = event.angleDelta()
+
+        if mods & Qt.KeyboardModifier.ControlModifier:
+            steps = angle.y() / 120 if angle.y() else angle.x() / 120
+            if steps:
+                self.zoom_by(ZOOM_STEP**steps)
+            event.accept()
+            return
+
+        pixels = event.pixelDelta()
+        horizontal = bool(mods & Qt.KeyboardModifier.ShiftModifier)
+        if not pixels.isNull():
+            # Pavé tactile : déjà fluide, on suit le doigt
+            dx, dy = pixels.x(), pixels.y()
+            if horizontal:
+                dx, dy = dy, 0
+            hbar, vbar = self.horizontalScrollBar(), self.verticalScrollBar()
+            hbar.setValue(hbar.value() - dx)
+            vbar.setValue(vbar.value() - dy)
+        else:
+            dy = angle.y() or angle.x()
+            bar = (
+                self.horizontalScrollBar()
+                if horizontal or not angle.y()
+                else self.verticalScrollBar()
+            )
+            self._smooth_scroll(bar, -dy * SCROLL_STEP_PX // 120)
+        event.accept()
+
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self._extend_canvas()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._extend_canvas()
+
+    def _extend_canvas(self):
+        """
+        Appelée à chaque changement de la zone visible (défilement, zoom,
+        redimensionnement), avec une marge d'une largeur / hauteur de vue :
+        - canvas infini : la scène est agrandie si la zone approche d'un bord
+        - projet ouvert en chargement paresseux : les items de la zone sont créés
+        """
+        scene = self.scene()
+        if self._extending or scene is None:
+            return
+        visible = self.mapToScene(self.viewport().rect()).boundingRect()
+        w, h = visible.width(), visible.height()
+        around = visible.adjusted(-w, -h, w, h)
+        self._extending = True
+        try:
+            infinite = getattr(scene, "is_infinite", None)
+            if infinite is not None and infinite():
+                scene.include_rect(around)
+            ensure_loaded = getattr(scene, "ensure_loaded", None)
+            if ensure_loaded is not None:
+                ensure_loaded(around)
+        finally:
+            self._extending = False
+
+    # ------------------------------------------------------------------
+    # Pan (bouton du milieu, ou Espace + clic gauche)
+    # ------------------------------------------------------------------
+    def _starts_pan(self, event):
+        return event.button() == Qt.MouseButton.MiddleButton or (
+            self._space_down and event.button() == Qt.MouseButton.LeftButton
+        )
+
+    def mousePressEvent(self, event):
+        if self._starts_pan(event):
+            self._pan_last = QPointF(event.position())
+            self.viewport().setCursor(Qt.CursorShape.ClosedHandCursor)
+            event.accept()
+            return
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._pan_last is not None:
+            pos = QPointF(event.position())
+            delta = pos - self._pan_last
+            self._pan_last = pos
+            hbar, vbar = self.horizontalScrollBar(), self.verticalScrollBar()
+            hbar.setValue(hbar.value() - round(delta.x()))
+            vbar.setValue(vbar.value() - round(delta.y()))
+            event.accept()
+            return
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if self._pan_last is not None:
+            self._pan_last = None
+            self.viewport().unsetCursor()
+            event.accept()
+            return
+        super().mouseReleaseEvent(event)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key.Key_Space and not event.isAutoRepeat():
+            self._space_down = True
+            self.viewport().setCursor(Qt.CursorShape.OpenHandCursor)
+            event.accept()
+            return
+        super().keyPressEvent(event)
+
+    def keyReleaseEvent(self, event):
+        if event.key() == Qt.Key.Key_Space and not event.isAutoRepeat():
+            self._space_down = False
+            self.viewport().unsetCursor()
+            event.accept()
+            return
+        super().keyReleaseEvent(event)
@@ -7,8 +7,8 @@ Responsabilité :
 - afficher un panneau assistant sous forme de DockWidget
 """
 
+from datetime import datetime
 from pathlib import Path
-import time
 
 from PySide6.QtWidgets import (
     QMainWindow,
@@ -26,18 +26,22 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QSlider,
     QDialogButtonBox,
+    QFileDialog,
+    QMessageBox,
 )
 from PySide6.QtGui import QAction, QColor, QPainter, QPen, QPixmap
 from PySide6.QtCore import Qt, QTimer, Signal
 
+from drawing.autosave import Autosave, find_recoverable, recover
 from drawing.scene import DrawingScene
+from drawing.project import PROJECT_SUFFIX, ProjectError, open_project, save_project
+from ui.canvas_view import ZOOM_STEP, CanvasView
 from ui.assistant_panel import GenerationPanel
 from drawing.tools import Tool
 from logs.logger import EventLogger
 from ui.assistant_floating import FloatingAssistantButton
 from assistant.controller import AssistantController
 from assistant.generation_catalog import create_generation_item
-from drawing.commands import AddItemCommand
 from ui.template_builder import TemplateBuilderWindow
 
 
@@ -46,7 +50,17 @@ class EditorWindow(QMainWindow):
         super().__init__()
         self.setWindowTitle("Éditeur - Prototype HAII")
 
-        self.logger = EventLogger("logs/events.csv")
+        # Mode bufferisé : le thread GUI ne fait qu'empiler, l'écriture disque
+        # se fait dans un thread dédié (voir logs/logger.py).
+        # Un segment par session (logs/segments/), fusionnés avec logs/merge.py.
+        # Les rafales de clics de sélection sont repliées en une ligne de
+        # synthèse (colonne `count`) ; la gomme écrit déjà une ligne par glissé.
+        self.logger = EventLogger(
+            segment_dir="logs/segments",
+            buffered=True,
+            aggregate=("select_press",),
+            index=True,
+        )
 
         # --- Condition between-subjects (simple) ---
         self.condition = None  # choisie au moment du test
@@ -56,12 +70,23 @@ class EditorWindow(QMainWindow):
 
         # --- Protocole test ---
         self._test_running = False
-        self._trial_started_at = None  # time.time()
+        self._trial_started_at = None  # t_mono_ns de trial_start (logger.log)
         self._tasks = [("cat", "Chat"), ("castle", "Château"), ("car", "Voiture")]
         self._trial_index = -1
 
-        self.scene = DrawingScene(logger=self.logger)
-        self.view = QGraphicsView(self.scene)
+        # Canvas infini : la scène grandit avec le contenu ; la vue gère zoom
+        # (Ctrl + molette), pan (bouton du milieu / Espace) et défilement fluide
+        self.scene = DrawingScene(logger=self.logger, infinite=True)
+        self.view = CanvasView(self.scene)
+
+        # Sauvegarde automatique : journal des opérations de la scène, écrit
+        # dans un thread dédié (voir drawing/autosave.py). Les journaux laissés
+        # par un arrêt brutal sont proposés à la récupération une fois la
+        # fenêtre affichée.
+        self._recoverable = find_recoverable(exclude=self.logger.session_id)
+        self.autosave = Autosave(self.scene, self.logger.session_id)
+        if self._recoverable:
+            QTimer.singleShot(0, self._offer_recovery)
 
         # Par défaut, sélection
         self.view.setDragMode(QGraphicsView.RubberBandDrag)
@@ -339,6 +364,29 @@ class EditorWindow(QMainWindow):
         toolbar.addAction(undo_action)
         toolbar.addAction(redo_action)
 
+        # Zoom au clavier (raccourcis seuls, sans bouton dans la toolbar)
+        for text, shortcut, on_trigger in (
+            ("Zoom avant", "Ctrl++", lambda: self.view.zoom_by(ZOOM_STEP)),
+            ("Zoom arrière", "Ctrl+-", lambda: self.view.zoom_by(1 / ZOOM_STEP)),
+            ("Zoom 100 %", "Ctrl+0", self.view.reset_view),
+        ):
+            act = QAction(text, self)
+            act.setShortcut(shortcut)
+            act.triggered.connect(on_trigger)
+            self.addAction(act)
+
+        # Projet : enregistrer / rouvrir le dessin (drawing/project.py)
+        toolbar.addSeparator()
+        self.act_open = QAction("Ouvrir…", self)
+        self.act_open.setShortcut("Ctrl+O")
+        self.act_open.triggered.connect(self._open_project)
+        toolbar.addAction(self.act_open)
+
+        act_save = QAction("Enregistrer…", self)
+        act_save.setShortcut("Ctrl+S")
+        act_save.triggered.connect(self._save_project)
+        toolbar.addAction(act_save)
+
         # Options de l'assistant
         toolbar.addSeparator()
 
@@ -403,29 +451,21 @@ class EditorWindow(QMainWindow):
             # 2) positionner intelligemment : proche du centre de la vue
             center = self.view.mapToScene(self.view.viewport().rect().center())
 
-            # Macro = un seul undo pour l'ensemble
-            self.scene.undo_stack.beginMacro(f"Generate {category}:{item_id}")
-
             for it in items:
                 it.setPos(center)
 
-                # ajouter à la scène
-                self.scene.addItem(it)
-
-                # 2) Commande undoable (already_in_scene=True car déjà ajouté)
-                self.scene.undo_stack.push(
-                    AddItemCommand(
-                        self.scene, it, text="Generated item", already_in_scene=True
-                    )
-                )
-
-            self.scene.undo_stack.endMacro()
+            # Ajout groupé = un seul undo pour l'ensemble
+            self.scene.add_items(items, text=f"Generate {category}:{item_id}")
 
             # 3) log (si tu as self.logger)
             if hasattr(self, "logger") and self.logger:
                 prompt = self.gen_panel.get_prompt_text()
                 self.logger.log(
-                    "gen_add", tool="GEN", notes=f"{category}:{item_id}|prompt={prompt}"
+                    "gen_add",
+                    tool="GEN",
+                    category=category,
+                    item_id=item_id,
+                    prompt=prompt,
                 )
 
         self.gen_panel.suggestion_chosen.connect(on_suggestion)
@@ -454,6 +494,13 @@ class EditorWindow(QMainWindow):
         super().resizeEvent(event)
         self._place_assistant_btn()
 
+    def closeEvent(self, event):
+        # Fermeture normale : le journal de récupération n'a plus lieu d'être
+        self.autosave.close(discard=True)
+        # Vide le buffer du logger avant de quitter
+        self.logger.close()
+        super().closeEvent(event)
+
     def _open_template_builder(self):
         if not hasattr(self, "_tpl_builder") or self._tpl_builder is None:
             self._tpl_builder = TemplateBuilderWindow(parent=self)
@@ -494,6 +541,7 @@ class EditorWindow(QMainWindow):
         # Lancer protocole
         self._test_running = True
         self.act_test.setEnabled(False)
+        self.act_open.setEnabled(False)  # pas de changement de dessin en essai
         self._trial_index = -1
         self._trial_started_at = None
 
@@ -546,21 +594,23 @@ class EditorWindow(QMainWindow):
         # Reset scène (prototype)
         self.scene.clear()
         self.scene.undo_stack.clear()
+        self.view.reset_view()
 
         # Démarrer l’essai immédiatement (puisque la fenêtre ne “valide” plus)
-        self._trial_started_at = time.time()
-        self.logger.log("trial_start", notes=f"task={task_id}")
+        # Horloge monotone du logger : la durée correspond exactement à l'écart
+        # entre les t_mono_ns de trial_start et done_clicked
+        self._trial_started_at = self.logger.log(
+            "trial_start", notes=f"task={task_id}"
+        )
 
     def on_done_clicked(self):
         if not self._test_running or self._trial_started_at is None:
             return
 
-        now = time.time()
-        duration_s = now - self._trial_started_at
-
         # Logs haut niveau
-        self.logger.log("done_clicked")
-        self.logger.log("trial_end", notes=f"duration_s={duration_s:.3f}")
+        now = self.logger.log("done_clicked")
+        duration_s = (now - self._trial_started_at) / 1e9
+        self.logger.log("trial_end", duration_s=duration_s)
 
         # --- Mesure subjective ---
         # On demande juste après la fin perçue de la tâche.
@@ -572,7 +622,7 @@ class EditorWindow(QMainWindow):
             # l'utilisateur a annulé : on log quand même pour tracer l'absence
             self.logger.log("self_eval_missing", tool="TEST", notes="cancelled")
         else:
-            self.logger.log("self_eval", tool="TEST", notes=f"similarity={score:.3f}")
+            self.logger.log("self_eval", tool="TEST", similarity=score)
 
         # Préparer essai suivant
         self._trial_started_at = None
@@ -583,6 +633,7 @@ class EditorWindow(QMainWindow):
     def _end_test(self, cancelled: bool = False):
         self._test_running = False
         self.act_test.setEnabled(True)
+        self.act_open.setEnabled(True)
         self.task_window.set_done_enabled(False)
         self.task_window.close()
 
@@ -590,7 +641,7 @@ class EditorWindow(QMainWindow):
         if self.condition == "H_ONLY":
             self._apply_h_only_lock(False)
 
-        self.logger.log("test_end", notes=("cancelled" if cancelled else "completed"))
+        self.logger.log("test_end", status=("cancelled" if cancelled else "completed"))
 
         # Nettoyer contexte essai (optionnel)
         self.logger.set_context(task_id="", trial_index="")
@@ -634,6 +685,92 @@ class EditorWindow(QMainWindow):
             self.act_float.setEnabled(True)
             self.assistant_btn.setEnabled(True)
 
+    # ------------------------------------------------------------------
+    # Projet
+    # ------------------------------------------------------------------
+    def _open_project(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Ouvrir un dessin", "", f"Dessin (*{PROJECT_SUFFIX})"
+        )
+        if not path:
+            return
+        try:
+            loader = open_project(self.scene, path)
+        except (OSError, ProjectError) as e:
+            QMessageBox.warning(self, "Ouvrir", f"Impossible d'ouvrir le dessin :\n{e}")
+            return
+        self.view.reset_view()
+        self.logger.log("project_opened", path=path, n_items=loader.item_count)
+
+    def _save_project(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Enregistrer le dessin", "", f"Dessin (*{PROJECT_SUFFIX})"
+        )
+        if not path:
+            return
+        if not path.endswith(PROJECT_SUFFIX):
+            path += PROJECT_SUFFIX
+        try:
+            n = save_project(self.scene, path)
+        except OSError as e:
+            QMessageBox.warning(
+                self, "Enregistrer", f"Échec de l'enregistrement :\n{e}"
+            )
+            return
+        self.logger.log("project_saved", path=path, n_items=n)
+
+    def _offer_recovery(self):
+        """
+        Propose, session par session (la plus récente d'abord), de reprendre le
+        dessin d'une session arrêtée brutalement. Un seul dessin peut être
+        récupéré dans la scène : les sessions suivantes sont gardées pour le
+        prochain démarrage.
+        """
+        sessions, self._recoverable = self._recoverable, []
+        recovered = False
+        for session in sessions:
+            if recovered:
+                session.release()
+                continue
+            when = datetime.fromtimestamp(session.mtime).strftime("%d/%m/%Y %H:%M")
+            box = QMessageBox(self)
+            box.setWindowTitle("Récupération")
+            box.setIcon(QMessageBox.Icon.Question)
+            box.setText(
+                "L'application ne s'est pas fermée correctement "
+                f"(session du {when}).\nRécupérer son dessin ?"
+            )
+            btn_recover = box.addButton("Récupérer", QMessageBox.ButtonRole.AcceptRole)
+            btn_discard = box.addButton(
+                "Supprimer", QMessageBox.ButtonRole.DestructiveRole
+            )
+            box.addButton("Plus tard", QMessageBox.ButtonRole.RejectRole)
+            box.exec()
+
+            clicked = box.clickedButton()
+            if clicked is btn_discard:
+                session.discard()
+                continue
+            if clicked is not btn_recover:
+                session.release()  # reproposée au prochain démarrage
+                continue
+            try:
+                n = recover(self.scene, session.state)
+            except (OSError, ProjectError) as e:
+                # Fichiers conservés : la récupération sera reproposée
+                session.release()
+                QMessageBox.warning(
+                    self, "Récupération", f"Impossible de récupérer le dessin :\n{e}"
+                )
+                continue
+            self.autosave.resync()
+            session.discard()
+            self.view.reset_view()
+            self.logger.log(
+                "autosave_recovered", session=session.session_id, n_items=n
+            )
+            recovered = True
+
     def _log_undo(self):
         if self.logger:
             self.logger.log(
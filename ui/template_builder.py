@@ -17,7 +17,6 @@ from PySide6.QtCore import QPointF, Qt
 from drawing.scene import DrawingScene
 from drawing.tools import Tool
 from drawing.serialization import serialize_item, deserialize_item
-from drawing.commands import AddItemCommand
 
 
 class TemplateBuilderWindow(QMainWindow):
@@ -162,17 +161,13 @@ class TemplateBuilderWindow(QMainWindow):
         - léger décalage
         - undo/redo supporté
         """
-        selected = set(self.scene.selectedItems())
-        if not selected:
-            return
-
         # Ordre bas -> haut (pour préserver l'empilement)
-        ordered = self.scene.items(Qt.SortOrder.AscendingOrder)
-        items_to_dup = [it for it in ordered if it in selected]
+        items_to_dup = self.scene.selected_items_ordered()
+        if not items_to_dup:
+            return
 
         OFFSET = QPointF(20, 20)
 
-        self.scene.undo_stack.beginMacro("Duplicate items")
         new_items = []
 
         for it in items_to_dup:
@@ -185,21 +180,10 @@ class TemplateBuilderWindow(QMainWindow):
 
             # Décalage visuel
             new_it.setPos(it.pos() + OFFSET)
-
-            self.scene.addItem(new_it)
-            self.scene.undo_stack.push(
-                AddItemCommand(
-                    self.scene, new_it, text="Duplicate item", already_in_scene=True
-                )
-            )
             new_items.append(new_it)
 
-        self.scene.undo_stack.endMacro()
-
-        # UX : sélectionner les nouveaux items
-        self.scene.clearSelection()
-        for it in new_items:
-            it.setSelected(True)
+        # Ajout groupé (un seul undo) ; UX : sélectionner les nouveaux items
+        self.scene.add_items(new_items, text="Duplicate items", select=True)
 
     def _make_color_swatch(self, hex_color: str, on_click):
         """
@@ -237,13 +221,11 @@ class TemplateBuilderWindow(QMainWindow):
 
     def _export(self, selection_only: bool):
         if selection_only:
-            selected = set(self.scene.selectedItems())
-            if not selected:
+            # Ordre bas -> haut, sélection seule
+            items = self.scene.selected_items_ordered()
+            if not items:
                 QMessageBox.information(self, "Export", "Aucun item sélectionné.")
                 return
-            # Ordre bas -> haut, filtré par sélection
-            ordered = self.scene.items(Qt.SortOrder.AscendingOrder)
-            items = [it for it in ordered if it in selected]
         else:
             # Ordre bas -> haut
             items = self.scene.items(Qt.SortOrder.AscendingOrder)